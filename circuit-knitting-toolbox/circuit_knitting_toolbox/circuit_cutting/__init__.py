@@ -19,10 +19,17 @@ Circuit Cutting (:mod:`circuit_knitting_toolbox.circuit_cutting`).
    :nosignatures:
 
     wire_cutting.run_subcircuit_instances
+    wire_cutting.run_subcircuit_instances_async
     wire_cutting.generate_summation_terms
+    wire_cutting.generate_summation_arrays
     wire_cutting.build
     wire_cutting.verify
     wire_cutting.cut_circuit_wires
     wire_cutting.evaluate_subcircuits
+    wire_cutting.plan_shots
+    wire_cutting.evaluate_subcircuits_async
     wire_cutting.reconstruct_full_distribution
+    wire_cutting.reconstruct_dynamic_definition
+    wire_cutting.reconstruct_probabilities
+    wire_cutting.reconstruct_expectation_values
 """
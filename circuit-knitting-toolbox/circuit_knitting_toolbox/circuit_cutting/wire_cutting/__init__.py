@@ -11,21 +11,40 @@
 
 """Code to initialize the wire cutting imports."""
 
-from .wire_cutting_evaluation import run_subcircuit_instances
-from .wire_cutting_post_processing import generate_summation_terms, build
+from .wire_cutting_evaluation import (
+    run_subcircuit_instances,
+    run_subcircuit_instances_async,
+)
+from .wire_cutting_post_processing import (
+    generate_summation_terms,
+    generate_summation_arrays,
+    build,
+)
 from .wire_cutting_verification import verify
 from .wire_cutting import (
     cut_circuit_wires,
     evaluate_subcircuits,
+    plan_shots,
+    evaluate_subcircuits_async,
     reconstruct_full_distribution,
+    reconstruct_dynamic_definition,
+    reconstruct_probabilities,
+    reconstruct_expectation_values,
 )
 
 __all__ = [
     "run_subcircuit_instances",
+    "run_subcircuit_instances_async",
     "generate_summation_terms",
+    "generate_summation_arrays",
     "build",
     "verify",
     "cut_circuit_wires",
     "evaluate_subcircuits",
+    "plan_shots",
+    "evaluate_subcircuits_async",
     "reconstruct_full_distribution",
+    "reconstruct_dynamic_definition",
+    "reconstruct_probabilities",
+    "reconstruct_expectation_values",
 ]
@@ -0,0 +1,444 @@
+# This code is a Qiskit project.
+
+# (C) Copyright IBM 2022.
+
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""File containing a heuristic to find the cuts of circuits too large for the MIP."""
+import time
+from typing import Sequence, Dict, Tuple, List, Optional
+
+import numpy as np
+from nptyping import NDArray
+
+
+class HeuristicModel(object):
+    """
+    Class to find wire cuts with a graph partitioning heuristic.
+
+    This class takes the same circuit DAG and constraints as MIPModel, but instead of
+    solving the MIP it partitions the DAG heuristically, in milliseconds to seconds even
+    for circuits with thousands of gates. The solutions are not provably optimal.
+
+    Partitions are seeded by greedy growth along the topological order and by bands of
+    qubits, then refined by Kernighan-Lin style passes moving single vertices into
+    neighboring subcircuits while it lowers the constraint violations, then the
+    estimated classical postprocessing cost (_cost_estimate). The best partition is
+    then repeatedly perturbed, by moving a connected group of vertices to another
+    subcircuit, and refined again, until the perturbations stop improving it.
+
+    Attributes:
+        - n_vertices (int): the number of vertices in the circuit DAG
+        - edges (list): the list of edges of the circuit DAG
+        - n_edges (int): the number of edges
+        - vertex_ids (dict): dictionary mapping vertices (i.e. two qubit gates) to the vertex
+            id (i.e. a number)
+        - id_vertices (dict): the inverse dictionary of vertex_ids, which has keys of vertex ids
+            and values of the vertices
+        - num_subcircuit (int): the number of subcircuits
+        - max_subcircuit_width (int): maximum number of qubits per subcircuit
+        - max_subcircuit_cuts (int): maximum number of cuts in each subcircuit
+        - max_subcircuit_size (int): maximum number of gates in a subcircuit
+        - num_qubits (int): the number of qubits in the circuit
+        - max_cuts (int): the maximum total number of cuts
+        - time_limit (float): the time in seconds after which the refinement stops
+        - patience (int): the number of perturbation rounds without improvement after
+            which the refinement stops
+        - seed (int): the seed of the random perturbations
+        - vertex_weight (NDArray): the number of input qubits directly connected to
+            each vertex
+        - build_time (float): the time in seconds taken to index the circuit DAG
+    """
+
+    def __init__(
+        self,
+        n_vertices: int,
+        edges: Sequence[Tuple[int]],
+        vertex_ids: Dict[str, int],
+        id_vertices: Dict[int, str],
+        num_subcircuit: int,
+        max_subcircuit_width: int,
+        max_subcircuit_cuts: Optional[int],
+        max_subcircuit_size: Optional[int],
+        num_qubits: int,
+        max_cuts: int,
+        solver: str = "heuristic",
+        time_limit: float = 10,
+        patience: int = 50,
+        seed: int = 0,
+    ):
+        """
+        Initialize member variables.
+
+        Args:
+            - n_vertices (int): the number of vertices in the circuit DAG
+            - edges (list): the list of edges of the circuit DAG
+            - vertex_ids (dict): dictionary mapping vertices (i.e. two qubit gates) to the vertex
+                id (i.e. a number)
+            - id_vertices (dict): the inverse dictionary of vertex_ids, which has keys of vertex ids
+                and values of the vertices
+            - num_subcircuit (int): the number of subcircuits
+            - max_subcircuit_width (int): maximum number of qubits per subcircuit
+            - max_subcircuit_cuts (int): maximum number of cuts in each subcircuit
+            - max_subcircuit_size (int): maximum number of gates in a subcircuit
+            - num_qubits (int): the number of qubits in the circuit
+            - max_cuts (int): the maximum total number of cuts
+            - solver (str): the name of the solver, for the solve reports
+            - time_limit (float): the time in seconds after which the refinement stops
+            - patience (int): the number of perturbation rounds without improvement
+                after which the refinement stops
+            - seed (int): the seed of the random perturbations
+
+        Returns:
+            - None
+        """
+        self.n_vertices = n_vertices
+        self.edges = edges
+        self.n_edges = len(edges)
+        self.vertex_ids = vertex_ids
+        self.id_vertices = id_vertices
+        self.num_subcircuit = num_subcircuit
+        self.max_subcircuit_width = max_subcircuit_width
+        self.max_subcircuit_cuts = max_subcircuit_cuts
+        self.max_subcircuit_size = max_subcircuit_size
+        self.num_qubits = num_qubits
+        self.max_cuts = max_cuts
+        self.solver = solver
+        self.time_limit = time_limit
+        self.patience = patience
+        self.seed = seed
+
+        # Imported here, as the wire_cutting module imports this one
+        from .wire_cutting import _cost_estimate
+
+        self._cost_estimate = _cost_estimate
+
+        start_time = time.perf_counter()
+        # Count the number of input qubits directly connected to each node
+        self.vertex_weight = np.zeros(n_vertices, dtype=int)
+        self.vertex_qubits: List[List[int]] = []
+        for vertex_id in range(n_vertices):
+            qubits = []
+            for qarg in id_vertices[vertex_id].split(" "):
+                qubit, gate_count = qarg.split("]")
+                qubits.append(int(qubit.split("[")[1]))
+                if int(gate_count) == 0:
+                    self.vertex_weight[vertex_id] += 1
+            self.vertex_qubits.append(qubits)
+
+        # The edges going in and out of each vertex
+        self.incident_edges: List[List[int]] = [[] for _ in range(n_vertices)]
+        for e, (u, v) in enumerate(edges):  # type: ignore
+            self.incident_edges[u].append(e)
+            self.incident_edges[v].append(e)
+        self.build_time = time.perf_counter() - start_time
+
+    def solve(
+        self,
+        min_postprocessing_cost: float,
+        initial_subcircuits: Optional[Sequence[int]] = None,
+    ) -> bool:
+        """
+        Partition the circuit DAG heuristically.
+
+        The solve statistics are reported in the same attributes as MIPModel, where the
+        objective is the estimated classical postprocessing cost.
+
+        Args:
+            - min_post_processing_cost (float): the minimum post-processing cost found so
+                far. Solutions are compared by the caller, so it is unused
+            - initial_subcircuits (Sequence[int], optional): the subcircuit of each vertex
+                in a known solution, refined alongside the other seeds
+
+        Returns:
+            - (bool): whether or not a partition satisfying the constraints was found
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + self.time_limit
+
+        rng = np.random.default_rng(self.seed)
+
+        best_state = None
+        best_score = (float("inf"), float("inf"))
+        seeds = [self._grow_partition(), self._band_partition()]
+        if initial_subcircuits is not None:
+            seeds.append(np.array(initial_subcircuits, dtype=int))
+        for part in seeds:
+            state = self._get_state(part)
+            self._refine(state, deadline)
+            score = self._score(state)
+            if score < best_score:
+                best_state, best_score = state, score
+
+        # Escape the local minima by perturbing the best partition, then refining it
+        num_rounds = 0
+        num_stale_rounds = 0
+        while (
+            num_stale_rounds < self.patience
+            and time.perf_counter() < deadline
+            and best_state is not None
+        ):
+            state = {key: value.copy() for key, value in best_state.items()}
+            self._perturb(state, rng)
+            self._refine(state, deadline)
+            score = self._score(state)
+            num_rounds += 1
+            if score < best_score:
+                best_state, best_score = state, score
+                num_stale_rounds = 0
+            else:
+                num_stale_rounds += 1
+
+        self.runtime = time.perf_counter() - start_time
+        self.optimal = False
+        self.node_count = num_rounds
+        self.mip_gap = None
+        self.objective = best_score[1]
+        if best_state is None or best_score[0] > 0:
+            return False
+
+        best_part = best_state["part"]
+        self.subcircuits = [
+            [self.id_vertices[j] for j in np.flatnonzero(best_part == i)]
+            for i in range(self.num_subcircuit)
+        ]
+        self.cut_edges = [
+            (self.id_vertices[u], self.id_vertices[v])
+            for (u, v) in self.edges  # type: ignore
+            if best_part[u] != best_part[v]
+        ]
+        return True
+
+    def _grow_partition(self) -> NDArray:
+        """
+        Grow the subcircuits one after the other, in the topological order of the vertices.
+
+        A subcircuit takes vertices until it would exceed its maximum width or size.
+
+        Returns:
+            - (NDArray): the subcircuit of each vertex
+        """
+        state = self._get_state(
+            np.full(self.n_vertices, self.num_subcircuit - 1, dtype=int)
+        )
+        subcircuit = 0
+        for vertex in range(self.n_vertices):
+            if subcircuit == self.num_subcircuit - 1:
+                break
+            self._move(state, vertex, subcircuit)
+            if not self._fits(state, subcircuit):
+                self._move(state, vertex, self.num_subcircuit - 1)
+                subcircuit += 1
+                self._move(state, vertex, subcircuit)
+
+        return state["part"]
+
+    def _band_partition(self) -> NDArray:
+        """
+        Assign each vertex to the subcircuit of the band holding its lowest qubit.
+
+        Returns:
+            - (NDArray): the subcircuit of each vertex
+        """
+        return np.array(
+            [
+                min(qubits) * self.num_subcircuit // max(self.num_qubits, 1)
+                for qubits in self.vertex_qubits
+            ],
+            dtype=int,
+        )
+
+    def _get_state(self, part: NDArray) -> Dict[str, NDArray]:
+        """
+        Count the qubits and gates of each subcircuit of a partition.
+
+        Args:
+            - part (NDArray): the subcircuit of each vertex
+
+        Returns:
+            - (dict): the partition, with the number of original input, rho and O qubits
+                and the size of each subcircuit
+        """
+        state = {
+            "part": part.copy(),
+            "original_input": np.bincount(
+                part, weights=self.vertex_weight, minlength=self.num_subcircuit
+            ).astype(int),
+            "rho": np.zeros(self.num_subcircuit, dtype=int),
+            "O": np.zeros(self.num_subcircuit, dtype=int),
+            "size": np.bincount(part, minlength=self.num_subcircuit),
+        }
+        for u, v in self.edges:  # type: ignore
+            if part[u] != part[v]:
+                state["O"][part[u]] += 1
+                state["rho"][part[v]] += 1
+
+        return state
+
+    def _move(self, state: Dict[str, NDArray], vertex: int, subcircuit: int) -> None:
+        """
+        Move a vertex to another subcircuit, updating the counts in place.
+
+        Args:
+            - state (dict): the partition and its counts
+            - vertex (int): the vertex to move
+            - subcircuit (int): the subcircuit the vertex moves to
+
+        Returns:
+            - None
+        """
+        part = state["part"]
+        old_subcircuit = part[vertex]
+        if old_subcircuit == subcircuit:
+            return
+        for e in self.incident_edges[vertex]:
+            u, v = self.edges[e]  # type: ignore
+            if part[u] != part[v]:
+                state["O"][part[u]] -= 1
+                state["rho"][part[v]] -= 1
+        part[vertex] = subcircuit
+        for e in self.incident_edges[vertex]:
+            u, v = self.edges[e]  # type: ignore
+            if part[u] != part[v]:
+                state["O"][part[u]] += 1
+                state["rho"][part[v]] += 1
+        state["original_input"][old_subcircuit] -= self.vertex_weight[vertex]
+        state["original_input"][subcircuit] += self.vertex_weight[vertex]
+        state["size"][old_subcircuit] -= 1
+        state["size"][subcircuit] += 1
+
+    def _fits(self, state: Dict[str, NDArray], subcircuit: int) -> bool:
+        """
+        Check that a subcircuit is within its maximum width and size.
+
+        Args:
+            - state (dict): the partition and its counts
+            - subcircuit (int): the subcircuit
+
+        Returns:
+            - (bool): whether the subcircuit fits
+        """
+        width = state["original_input"][subcircuit] + state["rho"][subcircuit]
+        if width > self.max_subcircuit_width:
+            return False
+        if self.max_subcircuit_size is not None:
+            return state["size"][subcircuit] <= self.max_subcircuit_size
+        return True
+
+    def _score(self, state: Dict[str, NDArray]) -> Tuple[float, float]:
+        """
+        Score a partition, the lower the better.
+
+        Args:
+            - state (dict): the partition and its counts
+
+        Returns:
+            - (float): the total violation of the constraints
+            - (float): the estimated classical postprocessing cost
+        """
+        width = state["original_input"] + state["rho"]
+        subcircuit_cuts = state["rho"] + state["O"]
+        num_cuts = int(state["rho"].sum())
+        violation = np.maximum(width - self.max_subcircuit_width, 0).sum()
+        violation += np.count_nonzero(state["size"] == 0)
+        if self.max_subcircuit_size is not None:
+            violation += np.maximum(state["size"] - self.max_subcircuit_size, 0).sum()
+        if self.max_subcircuit_cuts is not None:
+            violation += np.maximum(subcircuit_cuts - self.max_subcircuit_cuts, 0).sum()
+        if self.max_cuts is not None:
+            violation += max(num_cuts - self.max_cuts, 0)
+
+        counter = {
+            subcircuit: {
+                "rho": int(state["rho"][subcircuit]),
+                "effective": int(width[subcircuit] - state["O"][subcircuit]),
+            }
+            for subcircuit in range(self.num_subcircuit)
+        }
+        return float(violation), float(self._cost_estimate(counter=counter))
+
+    def _refine(self, state: Dict[str, NDArray], deadline: float) -> None:
+        """
+        Move single vertices into neighboring subcircuits while the score decreases.
+
+        Args:
+            - state (dict): the partition and its counts, refined in place
+            - deadline (float): the time at which the refinement stops
+
+        Returns:
+            - None
+        """
+        score = self._score(state)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for vertex in range(self.n_vertices):
+                # A pass over large circuits may take long, so the deadline is checked
+                # at every vertex
+                if time.perf_counter() >= deadline:
+                    return
+                old_subcircuit = state["part"][vertex]
+                candidates = {
+                    state["part"][self.edges[e][0]]  # type: ignore
+                    for e in self.incident_edges[vertex]
+                } | {
+                    state["part"][self.edges[e][-1]]  # type: ignore
+                    for e in self.incident_edges[vertex]
+                }
+                # Any vertex may seed an empty subcircuit
+                candidates |= set(np.flatnonzero(state["size"] == 0))
+                candidates.discard(old_subcircuit)
+
+                best_subcircuit = old_subcircuit
+                for subcircuit in candidates:
+                    self._move(state, vertex, subcircuit)
+                    new_score = self._score(state)
+                    if new_score < score:
+                        score = new_score
+                        best_subcircuit = subcircuit
+                    self._move(state, vertex, old_subcircuit)
+                if best_subcircuit != old_subcircuit:
+                    self._move(state, vertex, best_subcircuit)
+                    improved = True
+
+    def _perturb(self, state: Dict[str, NDArray], rng: np.random.Generator) -> None:
+        """
+        Move a random connected group of vertices of a subcircuit to another subcircuit.
+
+        Args:
+            - state (dict): the partition and its counts, perturbed in place
+            - rng (Generator): the random number generator
+
+        Returns:
+            - None
+        """
+        if self.num_subcircuit < 2:
+            return
+        part = state["part"]
+        vertex = int(rng.integers(self.n_vertices))
+        subcircuit = part[vertex]
+        new_subcircuit = int(rng.integers(self.num_subcircuit - 1))
+        if new_subcircuit >= subcircuit:
+            new_subcircuit += 1
+        group_size = int(
+            rng.integers(1, max(2, self.n_vertices // (2 * self.num_subcircuit)) + 1)
+        )
+
+        # Grow the group breadth first within the subcircuit
+        group = [vertex]
+        visited = {vertex}
+        for member in group:
+            if len(group) >= group_size:
+                break
+            for e in self.incident_edges[member]:
+                for neighbor in self.edges[e]:  # type: ignore
+                    if neighbor not in visited and part[neighbor] == subcircuit:
+                        visited.add(neighbor)
+                        group.append(neighbor)
+        for member in group[:group_size]:
+            self._move(state, member, new_subcircuit)
@@ -10,11 +10,44 @@
 # that they have been altered from the originals.
 
 """File containing the tools to find and manage the cuts."""
-from typing import Sequence, Dict, Tuple, Any, List
+import time
+from typing import Sequence, Dict, Tuple, Any, List, Callable, Optional
 
+from docplex.mp.constants import EffortLevel
+from docplex.mp.constr import LinearConstraint as DocplexLinearConstraint
 from docplex.mp.model import Model
+from docplex.mp.progress import ProgressListener
 from docplex.mp.utils import DOcplexException
 import numpy as np
+import scipy.sparse
+from scipy.optimize import Bounds, LinearConstraint
+from nptyping import NDArray
+
+SOLVERS = ("cplex", "highs")
+
+
+def _import_milp() -> Callable[..., Any]:
+    """
+    Import scipy.optimize.milp, the interface to HiGHS.
+
+    It is only imported by the 'highs' solver, as it requires scipy>=1.9 and thus
+    Python>=3.8.
+
+    Returns:
+        - (callable): scipy.optimize.milp
+
+    Raises:
+        - ImportError: if the installed scipy does not provide milp
+    """
+    try:
+        from scipy.optimize import milp
+    except ImportError as ex:
+        raise ImportError(
+            "The 'highs' solver requires scipy>=1.9, which provides "
+            "scipy.optimize.milp. It can be installed with "
+            "pip install 'circuit-knitting-toolbox[highs]'."
+        ) from ex
+    return milp
 
 
 class MIPModel(object):
@@ -22,11 +55,12 @@ class MIPModel(object):
     Class to contain the model that manages the cut MIP.
 
     This class represents circuit cutting as a Mixed Integer Programming (MIP) problem
-    that can then be solved (provably) optimally using a MIP solver. This is integrated
-    with CPLEX, a fast commercial solver sold by IBM. There are free and open source MIP
-    solvers, but they come with substantial slowdowns (often many orders of magnitude).
-    By representing the original circuit as a Directed Acyclic Graph (DAG), this class
-    can find the optimal wire cuts in the circuit.
+    that can then be solved (provably) optimally using a MIP solver. The model is built
+    with docplex and solved either with CPLEX, a fast commercial solver sold by IBM, or
+    with the open source HiGHS solver shipped with scipy. The latter is slower, but has
+    no cap on the model size, unlike the community edition of CPLEX. By representing the
+    original circuit as a Directed Acyclic Graph (DAG), this class can find the optimal
+    wire cuts in the circuit.
 
     Attributes:
         - n_vertices (int): the number of vertices in the circuit DAG
@@ -45,7 +79,12 @@ class MIPModel(object):
         - subcircuit_counter (dict): a tracker for the information regarding subcircuits
         - vertex_weight (dict): keep track of the number of input qubits directly connected
             to each node
+        - solver (str): the MIP solver, either 'cplex' or 'highs'
+        - upstream_vertices (NDArray): the upstream vertex of each edge
+        - downstream_vertices (NDArray): the downstream vertex of each edge
         - model (docplex model): the model interface for CPLEX
+        - build_time (float): the time in seconds taken to build the model, apart from
+            the runtime of the solver
     """
 
     def __init__(
@@ -60,6 +99,9 @@ class MIPModel(object):
         max_subcircuit_size: int,
         num_qubits: int,
         max_cuts: int,
+        solver: str = "cplex",
+        lp_path: Optional[str] = None,
+        threads: Optional[int] = None,
     ):
         """
         Initialize member variables.
@@ -78,10 +120,26 @@ class MIPModel(object):
             - max_subcircuit_size (int): maximum number of gates in a subcircuit
             - num_qubits (int): the number of qubits in the circuit
             - max_cuts (int): the maximum total number of cuts
+            - solver (str): the MIP solver, either 'cplex' or 'highs'
+            - lp_path (str, optional): the file the model is exported to as a LP file
+                before solving, by default None to skip the export
+            - threads (int, optional): the number of threads used by CPLEX, by default
+                all the available cores
 
         Returns:
             - None
+
+        Raises:
+            - ValueError: if the solver is not supported
+            - ImportError: if the solver is 'highs' and scipy is older than 1.9
         """
+        if solver not in SOLVERS:
+            raise ValueError(
+                f"The solver ({solver}) should be one of: {', '.join(SOLVERS)}."
+            )
+        if solver == "highs":
+            # Fail before building the model
+            _import_milp()
         self.check_graph(n_vertices, edges)
         self.n_vertices = n_vertices
         self.edges = edges
@@ -94,6 +152,9 @@ class MIPModel(object):
         self.max_subcircuit_size = max_subcircuit_size
         self.num_qubits = num_qubits
         self.max_cuts = max_cuts
+        self.solver = solver
+        self.lp_path = lp_path
+        self.threads = threads
 
         self.subcircuit_counter: Dict[int, Dict[str, Any]] = {}
 
@@ -109,10 +170,16 @@ class MIPModel(object):
                     num_in_qubits += 1
             self.vertex_weight[node] = num_in_qubits
 
-        self.model = Model("docplex_cutter")
+        # The vertices at the two ends of each edge
+        self.upstream_vertices = np.array([edge[0] for edge in edges], dtype=int)
+        self.downstream_vertices = np.array([edge[-1] for edge in edges], dtype=int)
+
+        start_time = time.perf_counter()
+        self.model = Model("docplex_cutter", checker="off")
         self.model.log_output = False
         self._add_variables()
         self._add_constraints()
+        self.build_time = time.perf_counter() - start_time
 
     def _add_variables(self) -> None:
         """
@@ -121,29 +188,25 @@ class MIPModel(object):
         Returns:
             - None
         """
+        subcircuits = range(self.num_subcircuit)
+        vertices = range(self.n_vertices)
+        edges = range(self.n_edges)
+
         """
         Indicate if a vertex is in some subcircuit
         """
-        self.vertex_var = []
-        for i in range(self.num_subcircuit):
-            subcircuit_y = []
-            for j in range(self.n_vertices):
-                varName = "bin_sc_" + str(i) + "_vx_" + str(j)
-                loc_var = self.model.binary_var(name=varName)
-                subcircuit_y.append(loc_var)
-            self.vertex_var.append(subcircuit_y)
+        vertex_var = self.model.binary_var_matrix(
+            subcircuits, vertices, name=lambda ij: "bin_sc_%d_vx_%d" % ij
+        )
+        self.vertex_var = [[vertex_var[i, j] for j in vertices] for i in subcircuits]
 
         """
         Indicate if an edge has one and only one vertex in some subcircuit
         """
-        self.edge_var = []
-        for i in range(self.num_subcircuit):
-            subcircuit_x = []
-            for j in range(self.n_edges):
-                varName = "bin_sc_" + str(i) + "_edg_" + str(j)
-                loc_var = self.model.binary_var(name=varName)
-                subcircuit_x.append(loc_var)
-            self.edge_var.append(subcircuit_x)
+        edge_var = self.model.binary_var_matrix(
+            subcircuits, edges, name=lambda ij: "bin_sc_%d_edg_%d" % ij
+        )
+        self.edge_var = [[edge_var[i, j] for j in edges] for i in subcircuits]
 
         """
         Total number of cuts
@@ -153,114 +216,112 @@ class MIPModel(object):
             lb=0, ub=self.max_cuts + 0.1, name="num_cuts"
         )
 
-        for subcircuit in range(self.num_subcircuit):
-            self.subcircuit_counter[subcircuit] = {}
-
-            self.subcircuit_counter[subcircuit][
-                "original_input"
-            ] = self.model.integer_var(
+        # The variables are created in the same order as the columns of the original
+        # model, as the branching of the solvers depends on it
+        for subcircuit in subcircuits:
+            counter: Dict[str, Any] = {}
+            counter["original_input"] = self.model.integer_var(
                 lb=0,
                 ub=self.max_subcircuit_width,
                 name="original_input_%d" % subcircuit,
             )
-            self.subcircuit_counter[subcircuit]["rho"] = self.model.integer_var(
+            counter["rho"] = self.model.integer_var(
                 lb=0, ub=self.max_subcircuit_width, name="rho_%d" % subcircuit
             )
-            self.subcircuit_counter[subcircuit]["O"] = self.model.integer_var(
+            counter["O"] = self.model.integer_var(
                 lb=0, ub=self.max_subcircuit_width, name="O_%d" % subcircuit
             )
-            self.subcircuit_counter[subcircuit]["d"] = self.model.integer_var(
+            counter["d"] = self.model.integer_var(
                 lb=0.1, ub=self.max_subcircuit_width, name="d_%d" % subcircuit
             )
             if self.max_subcircuit_size is not None:
-                self.subcircuit_counter[subcircuit]["size"] = self.model.integer_var(
+                counter["size"] = self.model.integer_var(
                     lb=0.1, ub=self.max_subcircuit_size, name="size_%d" % subcircuit
                 )
             if self.max_subcircuit_cuts is not None:
-                self.subcircuit_counter[subcircuit][
-                    "num_cuts"
-                ] = self.model.integer_var(
+                counter["num_cuts"] = self.model.integer_var(
                     lb=0.1, ub=self.max_subcircuit_cuts, name="num_cuts_%d" % subcircuit
                 )
 
-            self.subcircuit_counter[subcircuit]["rho_qubit_product"] = []
-            self.subcircuit_counter[subcircuit]["O_qubit_product"] = []
-            for i in range(self.n_edges):
-                edge_var_downstream_vertex_var_product = self.model.binary_var(
-                    name="bin_edge_var_downstream_vertex_var_product_%d_%d"
-                    % (subcircuit, i)
-                )
-                self.subcircuit_counter[subcircuit]["rho_qubit_product"].append(
-                    edge_var_downstream_vertex_var_product
-                )
-                edge_var_upstream_vertex_var_product = self.model.binary_var(
-                    name="bin_edge_var_upstream_vertex_var_product_%d_%d"
-                    % (subcircuit, i)
-                )
-                self.subcircuit_counter[subcircuit]["O_qubit_product"].append(
-                    edge_var_upstream_vertex_var_product
-                )
+            # The products of each edge with its downstream and upstream vertices
+            product_names = [
+                "bin_edge_var_%s_vertex_var_product_%d_%d" % (stream, subcircuit, i)
+                for i in edges
+                for stream in ("downstream", "upstream")
+            ]
+            qubit_products = self.model.binary_var_list(
+                len(product_names), name=product_names
+            )
+            counter["rho_qubit_product"] = qubit_products[0::2]
+            counter["O_qubit_product"] = qubit_products[1::2]
 
             if subcircuit > 0:
-                lb = 0
-                ub = self.num_qubits + 2 * self.max_cuts + 1
-                self.subcircuit_counter[subcircuit][
-                    "build_cost_exponent"
-                ] = self.model.integer_var(
-                    lb=lb, ub=ub, name="build_cost_exponent_%d" % subcircuit
+                counter["build_cost_exponent"] = self.model.integer_var(
+                    lb=0,
+                    ub=self.num_qubits + 2 * self.max_cuts + 1,
+                    name="build_cost_exponent_%d" % subcircuit,
                 )
+            self.subcircuit_counter[subcircuit] = counter
 
     def _add_constraints(self) -> None:
         """
         Add all contraints and objectives to MIP model.
 
+        The constraints are added in batches, indexed by the incidence arrays of the
+        edges.
+
         Returns:
             - None
         """
+        subcircuits = range(self.num_subcircuit)
+        vertices = range(self.n_vertices)
+        edges = range(self.n_edges)
+        upstream = self.upstream_vertices
+        downstream = self.downstream_vertices
+
         """
         each vertex in exactly one subcircuit
         """
-        for v in range(self.n_vertices):
-            ctName = "cons_vertex_" + str(v)
-            self.model.add_constraint(
-                self.model.sum(
-                    self.vertex_var[i][v] for i in range(self.num_subcircuit)
-                )
-                == 1,
-                ctname=ctName,
-            )
+        self.model.add_constraints(
+            (
+                self.model.sum_vars(self.vertex_var[i][v] for i in subcircuits) == 1
+                for v in vertices
+            ),
+            names=("cons_vertex_%d" % v for v in vertices),
+        )
 
         """
         edge_var=1 indicates one and only one vertex of an edge is in subcircuit
         edge_var[subcircuit][edge] = vertex_var[subcircuit][u] XOR vertex_var[subcircuit][v]
         """
-        for i in range(self.num_subcircuit):
-            for e in range(self.n_edges):
-                if len(self.edges[e]) != 2:
-                    raise ValueError(
-                        "Edges should be length 2 sequences: {self.edges[e]}"
+        for i in subcircuits:
+            edge_var = self.edge_var[i]
+            vertex_var = self.vertex_var[i]
+            self.model.add_constraints(
+                (
+                    constraint
+                    for e in edges
+                    for constraint in (
+                        edge_var[e]
+                        - vertex_var[upstream[e]]
+                        - vertex_var[downstream[e]]
+                        <= 0,
+                        edge_var[e]
+                        - vertex_var[upstream[e]]
+                        + vertex_var[downstream[e]]
+                        >= 0,
+                        edge_var[e]
+                        - vertex_var[downstream[e]]
+                        + vertex_var[upstream[e]]
+                        >= 0,
+                        edge_var[e]
+                        + vertex_var[upstream[e]]
+                        + vertex_var[downstream[e]]
+                        <= 2,
                     )
-                u = self.edges[e][0]
-                v = self.edges[e][-1]
-                u_vertex_var = self.vertex_var[i][u]
-                v_vertex_var = self.vertex_var[i][v]
-                ctName = "cons_edge_" + str(e)
-                self.model.add_constraint(
-                    self.edge_var[i][e] - u_vertex_var - v_vertex_var <= 0,
-                    ctname=ctName + "_1",
-                )
-                self.model.add_constraint(
-                    self.edge_var[i][e] - u_vertex_var + v_vertex_var >= 0,
-                    ctname=ctName + "_2",
-                )
-                self.model.add_constraint(
-                    self.edge_var[i][e] - v_vertex_var + u_vertex_var >= 0,
-                    ctname=ctName + "_3",
-                )
-                self.model.add_constraint(
-                    self.edge_var[i][e] + u_vertex_var + v_vertex_var <= 2,
-                    ctname=ctName + "_4",
-                )
+                ),
+                names=("cons_edge_%d_%d" % (e, k) for e in edges for k in range(1, 5)),
+            )
 
         """
         Symmetry-breaking constraints
@@ -270,144 +331,140 @@ class MIPModel(object):
             v2: in subcircuit_0 or subcircuit_1 or subcircuit_2
             ...
         """
-        for vertex in range(self.num_subcircuit):
-            ctName = "cons_symm_" + str(vertex)
-            self.model.add_constraint(
-                self.model.sum(
+        self.model.add_constraints(
+            (
+                self.model.sum_vars(
                     self.vertex_var[subcircuit][vertex]
                     for subcircuit in range(vertex + 1)
                 )
-                == 1,
-                ctname=ctName,
-            )
+                == 1
+                for vertex in subcircuits
+            ),
+            names=("cons_symm_%d" % vertex for vertex in subcircuits),
+        )
 
         """
         Compute number of cuts
         """
         self.model.add_constraint(
             self.num_cuts
-            == self.model.sum(
-                [
-                    self.edge_var[subcircuit][i]
-                    for i in range(self.n_edges)
-                    for subcircuit in range(self.num_subcircuit)
-                ]
+            == self.model.sum_vars(
+                self.edge_var[subcircuit][i]
+                for i in edges
+                for subcircuit in subcircuits
             )
             / 2
         )
 
+        vertex_weights = [self.vertex_weight[self.id_vertices[i]] for i in vertices]
         num_effective_qubits = []
-        for subcircuit in range(self.num_subcircuit):
+        for subcircuit in subcircuits:
+            counter = self.subcircuit_counter[subcircuit]
+            edge_var = self.edge_var[subcircuit]
+            vertex_var = self.vertex_var[subcircuit]
+
             """
             Compute number of different types of qubit in a subcircuit
             """
             self.model.add_constraint(
-                self.subcircuit_counter[subcircuit]["original_input"]
-                - self.model.sum(
-                    self.vertex_weight[self.id_vertices[i]]
-                    * self.vertex_var[subcircuit][i]
-                    for i in range(self.n_vertices)
-                )
+                counter["original_input"]
+                - self.model.scal_prod(vertex_var, vertex_weights)
                 == 0,
                 ctname="cons_subcircuit_input_%d" % subcircuit,
             )
 
-            for i in range(self.n_edges):
-                if len(self.edges[i]) != 2:
-                    raise ValueError(
-                        "Edges should be length 2 sequences: {self.edges[i]}"
-                    )
-                self.model.add_constraint(
-                    self.subcircuit_counter[subcircuit]["rho_qubit_product"][i]
-                    == self.edge_var[subcircuit][i]
-                    & self.vertex_var[subcircuit][self.edges[i][-1]],
-                    ctname="cons_edge_var_downstream_vertex_var_%d_%d"
-                    % (subcircuit, i),
-                )
-
+            self._add_product_constraints(
+                counter["rho_qubit_product"],
+                edge_var,
+                [vertex_var[v] for v in downstream],
+                ctname="cons_edge_var_downstream_vertex_var_%d" % subcircuit,
+            )
             self.model.add_constraint(
-                self.subcircuit_counter[subcircuit]["rho"]
-                - self.model.sum(
-                    self.subcircuit_counter[subcircuit]["rho_qubit_product"]
-                )
-                == 0,
+                counter["rho"] - self.model.sum_vars(counter["rho_qubit_product"]) == 0,
                 ctname="cons_subcircuit_rho_qubits_%d" % subcircuit,
             )
 
-            for i in range(self.n_edges):
-                self.model.add_constraint(
-                    self.subcircuit_counter[subcircuit]["O_qubit_product"][i]
-                    == self.edge_var[subcircuit][i]
-                    & self.vertex_var[subcircuit][self.edges[i][0]],
-                    ctname="cons_edge_var_upstream_vertex_var_%d_%d" % (subcircuit, i),
-                )
+            self._add_product_constraints(
+                counter["O_qubit_product"],
+                edge_var,
+                [vertex_var[u] for u in upstream],
+                ctname="cons_edge_var_upstream_vertex_var_%d" % subcircuit,
+            )
             self.model.add_constraint(
-                self.subcircuit_counter[subcircuit]["O"]
-                - self.model.sum(self.subcircuit_counter[subcircuit]["O_qubit_product"])
-                == 0,
+                counter["O"] - self.model.sum_vars(counter["O_qubit_product"]) == 0,
                 ctname="cons_subcircuit_O_qubits_%d" % subcircuit,
             )
 
             self.model.add_constraint(
-                self.subcircuit_counter[subcircuit]["d"]
-                - self.subcircuit_counter[subcircuit]["original_input"]
-                - self.subcircuit_counter[subcircuit]["rho"]
-                == 0,
+                counter["d"] - counter["original_input"] - counter["rho"] == 0,
                 ctname="cons_subcircuit_d_qubits_%d" % subcircuit,
             )
 
             if self.max_subcircuit_cuts is not None:
                 self.model.add_constraint(
-                    self.subcircuit_counter[subcircuit]["num_cuts"]
-                    - self.subcircuit_counter[subcircuit]["rho"]
-                    - self.subcircuit_counter[subcircuit]["O"]
-                    == 0,
+                    counter["num_cuts"] - counter["rho"] - counter["O"] == 0,
                     ctname="cons_subcircuit_num_cuts_%d" % subcircuit,
                 )
 
             if self.max_subcircuit_size is not None:
                 self.model.add_constraint(
-                    self.subcircuit_counter[subcircuit]["size"]
-                    - self.model.sum(
-                        [self.vertex_var[subcircuit][v] for v in range(self.n_vertices)]
-                    )
-                    == 0,
+                    counter["size"] - self.model.sum_vars(vertex_var) == 0,
                     ctname="cons_subcircuit_size_%d" % subcircuit,
                 )
 
-            num_effective_qubits.append(
-                self.subcircuit_counter[subcircuit]["d"]
-                - self.subcircuit_counter[subcircuit]["O"]
-            )
+            num_effective_qubits.append(counter["d"] - counter["O"])
 
             """
             Compute the classical postprocessing cost
             """
             if subcircuit > 0:
-                ptx, ptf = self.pwl_exp(
-                    lb=int(
-                        self.subcircuit_counter[subcircuit]["build_cost_exponent"].lb
-                    ),
-                    ub=int(
-                        self.subcircuit_counter[subcircuit]["build_cost_exponent"].ub
-                    ),
-                    base=2,
-                    coefficient=1,
-                    integer_only=True,
-                )
                 self.model.add_constraint(
-                    self.subcircuit_counter[subcircuit]["build_cost_exponent"]
+                    counter["build_cost_exponent"]
                     - self.model.sum(num_effective_qubits)
                     - 2 * self.num_cuts
                     == 0,
                     ctname="cons_build_cost_exponent_%d" % subcircuit,
                 )
-                # TODO: add PWL objective in CPLEX
+                # TODO: add PWL objective in CPLEX, with the points of pwl_exp
                 # self.model.setPWLObj(self.subcircuit_counter[subcircuit]['build_cost_exponent'], ptx, ptf)
 
         # self.model.setObjective(self.num_cuts,gp.GRB.MINIMIZE)
         self.model.set_objective("min", self.num_cuts)
 
+    def _add_product_constraints(
+        self, products: Sequence[Any], a: Sequence[Any], b: Sequence[Any], ctname: str
+    ) -> None:
+        """
+        Constrain binary variables to the products (logical AND) of pairs of binary variables.
+
+        The products are linearized, so that the model stays linear for every solver.
+
+        Args:
+            - products (list): the binary variables holding the products
+            - a (list): the first binary variable of each product
+            - b (list): the second binary variable of each product
+            - ctname (str): the name prefix of the constraints
+
+        Returns:
+            - None
+        """
+        self.model.add_constraints(
+            (
+                constraint
+                for product, a_var, b_var in zip(products, a, b)
+                for constraint in (
+                    product - a_var <= 0,
+                    product - b_var <= 0,
+                    product - a_var - b_var >= -1,
+                )
+            ),
+            names=(
+                "%s_%d_%d" % (ctname, i, k)
+                for i in range(len(products))
+                for k in range(1, 4)
+            ),
+        )
+
     def pwl_exp(
         self, lb: int, ub: int, base: int, coefficient: int, integer_only: bool
     ) -> Tuple[List[int], List[int]]:
@@ -471,51 +528,63 @@ class MIPModel(object):
                     f"Edge u ({u}) cannot be greater than number of vertices ({n_vertices})"
                 )
 
-    def solve(self, min_postprocessing_cost: float) -> bool:
+    def solve(
+        self,
+        min_postprocessing_cost: float,
+        initial_subcircuits: Optional[Sequence[int]] = None,
+        get_min_postprocessing_cost: Optional[Callable[[], float]] = None,
+    ) -> bool:
         """
         Solve the MIP model.
 
+        The solve statistics (runtime, node count, MIP gap and objective) are reported
+        in the same attributes whichever solver is used.
+
         Args:
             - min_post_processing_cost (float): the predicted minimum post-processing cost,
                 often is inf
+            - initial_subcircuits (Sequence[int], optional): the subcircuit of each vertex
+                in a known solution, e.g. from HeuristicModel, passed to CPLEX as a MIP
+                start. scipy.optimize.milp takes no MIP start, so HiGHS ignores it
+            - get_min_postprocessing_cost (callable, optional): returns the minimum
+                post-processing cost found so far by the models solved concurrently. It
+                is read when the solve starts, and CPLEX keeps polling it to stop as soon
+                as its bound shows that no solution is cheaper. scipy.optimize.milp
+                takes no callback, so HiGHS only reads it at the start
 
         Returns:
             - (bool): whether or not the model found a solution
         """
+        if get_min_postprocessing_cost is not None:
+            # A concurrent model may have finished while this one was built
+            min_postprocessing_cost = min(
+                min_postprocessing_cost, get_min_postprocessing_cost()
+            )
         # print('solving for %d subcircuits'%self.num_subcircuit)
         # print('model has %d variables, %d linear constraints,%d quadratic constraints, %d general constraints'
         # % (self.model.NumVars,self.model.NumConstrs, self.model.NumQConstrs, self.model.NumGenConstrs))
-        print(
-            "Exporting as a LP file to let you check the model that will be solved : ",
-            min_postprocessing_cost,
-            str(type(min_postprocessing_cost)),
-        )
-        self.model.export_as_lp(path="./docplex_cutter.lp")
-        try:
-            self.model.set_time_limit(300)
-            if min_postprocessing_cost != float("inf"):
-                self.model.parameters.mip.tolerances.uppercutoff(
-                    min_postprocessing_cost
-                )
-            self.model.solve(log_output=True)
-
-        except DOcplexException as e:
-            print("Caught: " + e.message)
+        if self.lp_path is not None:
+            print(
+                "Exporting as a LP file to let you check the model that will be solved : ",
+                min_postprocessing_cost,
+                str(type(min_postprocessing_cost)),
+            )
+            self.model.export_as_lp(path=self.lp_path)
+        if self.solver == "highs":
+            solution_value = self._solve_highs(min_postprocessing_cost)
+        else:
+            solution_value = self._solve_cplex(
+                min_postprocessing_cost,
+                initial_subcircuits,
+                get_min_postprocessing_cost,
+            )
 
-        if self.model._has_solution:
-            my_solve_details = self.model.solve_details
-            self.objective = None
+        if solution_value is not None:
             self.subcircuits = []
-            self.optimal = self.model.get_solve_status() == "optimal"
-            self.runtime = my_solve_details.time
-            self.node_count = my_solve_details.nb_nodes_processed
-            self.mip_gap = my_solve_details.mip_relative_gap
-            self.objective = self.model.objective_value
-
             for i in range(self.num_subcircuit):
                 subcircuit = []
                 for j in range(self.n_vertices):
-                    if abs(self.vertex_var[i][j].solution_value) > 1e-4:
+                    if abs(solution_value(self.vertex_var[i][j])) > 1e-4:
                         subcircuit.append(self.id_vertices[j])
                 self.subcircuits.append(subcircuit)
             assert (
@@ -528,7 +597,7 @@ class MIPModel(object):
             for i in range(self.num_subcircuit):
                 for j in range(self.n_edges):
                     if (
-                        abs(self.edge_var[i][j].solution_value) > 1e-4
+                        abs(solution_value(self.edge_var[i][j])) > 1e-4
                         and j not in cut_edges_idx
                     ):
                         cut_edges_idx.append(j)
@@ -541,3 +610,256 @@ class MIPModel(object):
             return True
         else:
             return False
+
+    def _solve_cplex(
+        self,
+        min_postprocessing_cost: float,
+        initial_subcircuits: Optional[Sequence[int]] = None,
+        get_min_postprocessing_cost: Optional[Callable[[], float]] = None,
+    ) -> Optional[Callable[[Any], float]]:
+        """
+        Solve the MIP model with CPLEX.
+
+        Args:
+            - min_post_processing_cost (float): the predicted minimum post-processing cost,
+                often is inf
+            - initial_subcircuits (Sequence[int], optional): the subcircuit of each vertex
+                in a known solution
+            - get_min_postprocessing_cost (callable, optional): returns the minimum
+                post-processing cost found so far by the models solved concurrently
+
+        Returns:
+            - (callable): the solution value of each variable, or None if the model
+                found no solution
+        """
+        solution = None
+        cutoff_listener = None
+        try:
+            self.model.set_time_limit(300)
+            if self.threads is not None:
+                self.model.parameters.threads(self.threads)
+            cuts_cutoff = self._get_cuts_cutoff(min_postprocessing_cost)
+            if cuts_cutoff != float("inf"):
+                self.model.parameters.mip.tolerances.uppercutoff(cuts_cutoff)
+            if initial_subcircuits is not None:
+                # CPLEX derives the other variables by solving the fixed model
+                self.model.add_mip_start(
+                    self.model.new_solution(
+                        self._get_mip_start(initial_subcircuits),
+                        name="initial_subcircuits",
+                    ),
+                    effort_level=EffortLevel.SolveFixed,
+                )
+            if get_min_postprocessing_cost is not None:
+                cutoff_listener = _CutoffListener(self, get_min_postprocessing_cost)
+                self.model.add_progress_listener(cutoff_listener)
+            solution = self.model.solve(log_output=True)
+
+        except DOcplexException as e:
+            print("Caught: " + e.message)
+        finally:
+            if cutoff_listener is not None:
+                self.model.remove_progress_listener(cutoff_listener)
+
+        if solution is None or (
+            cutoff_listener is not None and cutoff_listener.cut_off
+        ):
+            return None
+        my_solve_details = self.model.solve_details
+        self.optimal = self.model.get_solve_status() == "optimal"
+        self.runtime = my_solve_details.time
+        self.node_count = my_solve_details.nb_nodes_processed
+        self.mip_gap = my_solve_details.mip_relative_gap
+        self.objective = self.model.objective_value
+
+        return lambda var: var.solution_value
+
+    def _get_cuts_cutoff(self, min_postprocessing_cost: float) -> float:
+        """
+        Bound the number of cuts of the solutions cheaper than a known cost.
+
+        With k subcircuits, the postprocessing cost of K cuts is at least (k - 1) * 4^K,
+        so the solutions with more cuts than log4(cost / (k - 1)) are dominated.
+
+        Args:
+            - min_post_processing_cost (float): the minimum post-processing cost found so
+                far, often is inf
+
+        Returns:
+            - (float): the maximum number of cuts worth searching, or inf if unbounded
+        """
+        if min_postprocessing_cost == float("inf") or self.num_subcircuit < 2:
+            return float("inf")
+        if min_postprocessing_cost <= 0:
+            return -1.0
+        return float(
+            np.floor(
+                np.log(min_postprocessing_cost / (self.num_subcircuit - 1)) / np.log(4)
+                + 1e-9
+            )
+        )
+
+    def _get_mip_start(self, initial_subcircuits: Sequence[int]) -> Dict[Any, int]:
+        """
+        Assign the vertex and edge variables of a known solution.
+
+        The subcircuits are relabeled in the order of their first vertex, so that the
+        solution satisfies the symmetry-breaking constraints.
+
+        Args:
+            - initial_subcircuits (Sequence[int]): the subcircuit of each vertex
+
+        Returns:
+            - (dict): the value of each vertex and edge variable
+        """
+        labels: Dict[int, int] = {}
+        for subcircuit in initial_subcircuits:
+            labels.setdefault(subcircuit, len(labels))
+        part = [labels[subcircuit] for subcircuit in initial_subcircuits]
+
+        mip_start = {}
+        for i in range(self.num_subcircuit):
+            for v in range(self.n_vertices):
+                mip_start[self.vertex_var[i][v]] = int(part[v] == i)
+            for e in range(self.n_edges):
+                u = self.edges[e][0]
+                v = self.edges[e][-1]
+                mip_start[self.edge_var[i][e]] = int((part[u] == i) != (part[v] == i))
+
+        return mip_start
+
+    def _solve_highs(
+        self, min_postprocessing_cost: float
+    ) -> Optional[Callable[[Any], float]]:
+        """
+        Solve the MIP model with HiGHS, through scipy.optimize.milp.
+
+        Args:
+            - min_post_processing_cost (float): the predicted minimum post-processing cost,
+                often is inf
+
+        Returns:
+            - (callable): the solution value of each variable, or None if the model
+                found no solution
+        """
+        milp = _import_milp()
+        c, integrality, bounds, constraints = self._get_matrix_form()
+        cuts_cutoff = self._get_cuts_cutoff(min_postprocessing_cost)
+        if cuts_cutoff != float("inf"):
+            # Cut off the solutions whose objective exceeds the known cost
+            constraints.append(LinearConstraint(c.reshape(1, -1), -np.inf, cuts_cutoff))
+
+        start_time = time.perf_counter()
+        result = milp(
+            c,
+            integrality=integrality,
+            bounds=bounds,
+            constraints=constraints,
+            options={"time_limit": 300},
+        )
+        runtime = time.perf_counter() - start_time
+
+        if result.x is None:
+            return None
+        self.optimal = result.status == 0
+        self.runtime = runtime
+        self.node_count = getattr(result, "mip_node_count", None)
+        self.mip_gap = getattr(result, "mip_gap", None)
+        objective = self.model.linear_expr(self.model.objective_expr)
+        self.objective = objective.constant + sum(
+            coefficient * result.x[var.index]
+            for var, coefficient in objective.iter_terms()
+        )
+
+        return lambda var: result.x[var.index]
+
+    def _get_matrix_form(
+        self,
+    ) -> Tuple[NDArray, NDArray, Bounds, List[LinearConstraint]]:
+        """
+        Extract the variables, constraints and objective of the model as arrays.
+
+        Returns:
+            - (NDArray): the objective coefficients, to be minimized
+            - (NDArray): the integrality of each variable
+            - (Bounds): the bounds of the variables
+            - (list): the linear constraints
+
+        Raises:
+            - ValueError: if the model has a constraint that is not linear
+        """
+        variables = list(self.model.iter_variables())
+        integrality = np.array([0 if var.is_continuous() else 1 for var in variables])
+        bounds = Bounds([var.lb for var in variables], [var.ub for var in variables])
+
+        objective = self.model.linear_expr(self.model.objective_expr)
+        sign = 1 if self.model.is_minimized() else -1
+        c = np.zeros(len(variables))
+        for var, coefficient in objective.iter_terms():
+            c[var.index] += sign * coefficient
+
+        rows, cols, data = [], [], []
+        lower, upper = [], []
+        for row, ct in enumerate(self.model.iter_constraints()):
+            if not isinstance(ct, DocplexLinearConstraint):
+                raise ValueError(f"The constraint {ct} is not linear.")
+            for var, coefficient in ct.iter_net_linear_coefs():
+                rows.append(row)
+                cols.append(var.index)
+                data.append(coefficient)
+            rhs = ct.cplex_num_rhs()
+            sense = ct.sense.cplex_code
+            lower.append(rhs if sense in ("G", "E") else -np.inf)
+            upper.append(rhs if sense in ("L", "E") else np.inf)
+        A = scipy.sparse.csr_matrix(
+            (data, (rows, cols)), shape=(len(lower), len(variables))
+        )
+
+        return c, integrality, bounds, [LinearConstraint(A, lower, upper)]
+
+
+class _CutoffListener(ProgressListener):
+    """
+    Stop the CPLEX search once a concurrent model found a cheaper solution.
+
+    The cutoff of CPLEX cannot be changed during the search, so the listener compares
+    the best bound of the search to the cutoff of the lowest cost found so far.
+    """
+
+    def __init__(
+        self, mip_model: MIPModel, get_min_postprocessing_cost: Callable[[], float]
+    ):
+        """
+        Initialize member variables.
+
+        Args:
+            - mip_model (MIPModel): the model being solved
+            - get_min_postprocessing_cost (callable): returns the minimum
+                post-processing cost found so far by the models solved concurrently
+
+        Returns:
+            - None
+        """
+        super().__init__()
+        self.mip_model = mip_model
+        self.get_min_postprocessing_cost = get_min_postprocessing_cost
+        self.cut_off = False
+
+    def notify_progress(self, progress_data: Any) -> None:
+        """
+        Abort the search if none of its solutions can beat the lowest cost.
+
+        Args:
+            - progress_data (ProgressData): the state of the search
+
+        Returns:
+            - None
+        """
+        if progress_data.best_bound is None:
+            return
+        cuts_cutoff = self.mip_model._get_cuts_cutoff(
+            self.get_min_postprocessing_cost()
+        )
+        if progress_data.best_bound > cuts_cutoff + 1e-6:
+            self.cut_off = True
+            self.abort()
@@ -1,7 +1,26 @@
 """Functions for conducting the wire cutting on quantum circuits."""
+import bisect
+import os
+import threading
 import typing
-from typing import Optional, Sequence, Any, Dict, Tuple, List, Union, cast
-
+import warnings
+import multiprocessing as mp
+from collections import OrderedDict
+from typing import (
+    Optional,
+    Sequence,
+    Any,
+    Dict,
+    Tuple,
+    List,
+    Union,
+    AsyncIterator,
+    Callable,
+    cast,
+)
+
+import numpy as np
+import scipy.sparse
 from nptyping import NDArray
 
 from qiskit import QuantumCircuit, QuantumRegister
@@ -10,10 +29,22 @@ from qiskit.dagcircuit import DAGCircuit, DAGOpNode
 from qiskit.converters import circuit_to_dag, dag_to_circuit
 from qiskit_ibm_runtime import Options, QiskitRuntimeService
 
-from .wire_cutting_evaluation import run_subcircuit_instances
-from .wire_cutting_post_processing import generate_summation_terms, build
+from .wire_cutting_evaluation import (
+    run_subcircuit_instances,
+    run_subcircuit_instances_async,
+    mutate_measurement_basis,
+    _get_batch_instances,
+)
+from .wire_cutting_post_processing import (
+    generate_summation_arrays,
+    build,
+    dd_build,
+    query_build,
+    get_output_qubits,
+)
 from .wire_cutting_verification import generate_reconstructed_output
 from .mip_model import MIPModel
+from .heuristic_model import HeuristicModel
 
 
 def cut_circuit_wires(
@@ -26,6 +57,9 @@ def cut_circuit_wires(
     max_cuts: Optional[int] = None,
     num_subcircuits: Optional[Sequence[int]] = None,
     verbose: bool = True,
+    solver: str = "cplex",
+    warm_start: bool = False,
+    num_processes: Optional[int] = 1,
 ) -> Dict[str, Any]:
     """
     Decompose the circuit into a collection of subcircuits.
@@ -42,6 +76,13 @@ def cut_circuit_wires(
         - max_subcircuit_cuts (int, optional): max number of cuts for a subcircuit
         - max_subcircuit_size (int, optional): max number of gates in a subcircuit
         - verbose (bool, optional): flag for printing output of cutting
+        - solver (str, optional): the solver used by automatic cut finding, either the
+            MIP solvers 'cplex' or the open source 'highs', or 'heuristic' to partition
+            circuits too large for the MIP heuristically
+        - warm_start (bool, optional): whether to start the CPLEX search from a
+            solution of the heuristic. The other solvers take no starting point
+        - num_processes (int, optional): the number of processes solving the automatic
+            cut finding models concurrently, or all the available cores if None
     Returns:
         (Dict[str, Any]): A dictionary containing information on the cuts,
         including the subcircuits themselves (key: 'subcircuits')
@@ -62,6 +103,9 @@ def cut_circuit_wires(
             max_subcircuit_cuts=max_subcircuit_cuts,
             max_subcircuit_size=max_subcircuit_size,
             verbose=verbose,
+            solver=solver,
+            warm_start=warm_start,
+            num_processes=num_processes,
         )
     elif method == "manual":
         if subcircuit_vertices is None:
@@ -84,6 +128,11 @@ def evaluate_subcircuits(
     service: Optional[QiskitRuntimeService] = None,
     backend_names: Optional[Union[str, Sequence[str]]] = None,
     options: Optional[Union[Options, Sequence[Options]]] = None,
+    cache_dir: Optional[str] = None,
+    max_cache_size: int = 2**30,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    shots: Optional[Dict[int, Dict[int, int]]] = None,
 ) -> Dict[int, Dict[int, NDArray]]:
     """
     Evaluate the subcircuits.
@@ -93,34 +142,24 @@ def evaluate_subcircuits(
         - service (QiskitRuntimeService): A service for connecting to Qiskit Runtime Service
         - options (Union[Options, Sequence[Options]]): Options to use on each backend
         - backend_names (Union[str, Sequence[str]]): The name(s) of the backend(s) to be used
+        - cache_dir (str, optional): A directory caching the results of the subcircuit
+            instances on disk, so that instances already executed with the same backend
+            and options are not executed again
+        - max_cache_size (int): The size in bytes above which the least recently used
+            results are evicted from the cache
+        - checkpoint_dir (str, optional): A directory where the results of each
+            subcircuit are written as soon as its batch completes, and with a service
+            the results of each finished job
+        - resume (bool): Whether to reuse the subcircuits and jobs already completed
+            in checkpoint_dir instead of executing them again. Checkpoints written for
+            other subcircuits, backends or options raise a ValueError
+        - shots (Dict, optional): The shots of each executed subcircuit instance, as
+            planned by plan_shots, overriding the shots of the options
     Returns:
         (Dict): the dictionary containing the results from running
         each of the subcircuits
     """
-    # Put backend_names and options in lists to ensure it is unambiguous how to sync them
-    backends_list: Sequence[str] = []
-    options_list: Sequence[Options] = []
-    if backend_names is None or isinstance(backend_names, str):
-        if isinstance(options, Options):
-            options_list = [options]
-        elif isinstance(options, Sequence) and (len(options) != 1):
-            options_list = [options[0]]
-        if isinstance(backend_names, str):
-            backends_list = [backend_names]
-    else:
-        backends_list = backend_names
-        if isinstance(options, Options):
-            options_list = [options] * len(backends_list)
-        elif options is None:
-            options_list = [None] * len(backends_list)
-        else:
-            options_list = options
-
-    if backend_names:
-        if len(backends_list) != len(options_list):
-            raise AttributeError(
-                f"The list of backend names is length ({len(backends_list)}), but the list of options is length ({len(options_list)}). It is ambiguous how these options should be applied."
-            )
+    backends_list, options_list = _get_backends_list(backend_names, options)
 
     _, _, subcircuit_instances = _generate_metadata(cuts)
 
@@ -130,16 +169,188 @@ def evaluate_subcircuits(
         service=service,
         backend_names=backends_list,
         options=options_list,
+        cache_dir=cache_dir,
+        max_cache_size=max_cache_size,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        shots=shots,
     )
 
     return subcircuit_instance_probabilities
 
 
+def plan_shots(
+    cuts: Dict[str, Any],
+    shot_budget: int,
+    subcircuit_instance_probabilities: Optional[Dict[int, Dict[int, NDArray]]] = None,
+    min_shots: int = 1,
+) -> Dict[int, Dict[int, int]]:
+    """
+    Distribute a shot budget across the subcircuit instances to execute.
+
+    Each executed circuit gets shots in proportion to the standard deviation it
+    contributes to the reconstructed distribution, which minimizes the variance of the
+    reconstruction for the budget. A circuit contributes through the instances derived
+    from it: each weighs the magnitude of its coefficients in the entries it feeds,
+    times the 1-norms of the entries of the other subcircuits in the summation terms.
+    Given the probabilities of a pilot run, the entry norms and the shot noise of each
+    instance are estimated from them, and the plan can be refined round after round.
+    Otherwise the norms are bounded by the coefficients.
+
+    Args:
+        - cuts (Dict): the results of cutting
+        - shot_budget (int): the total number of shots to distribute
+        - subcircuit_instance_probabilities (Dict, optional): the probabilities of a
+            pilot evaluation of the subcircuits
+        - min_shots (int): the minimum number of shots of each executed circuit
+    Returns:
+        - (Dict): the shots of each subcircuit instance to execute, keyed by subcircuit
+            and instance index, to be passed to evaluate_subcircuits
+    Raises:
+        - ValueError: the budget does not cover min_shots for every circuit
+    """
+    summation_terms, subcircuit_entries, subcircuit_instances = _generate_metadata(cuts)
+
+    attributions = {
+        subcircuit_idx: abs(
+            scipy.sparse.csr_matrix(
+                (entries["coefficients"], entries["instances"], entries["indptr"]),
+                shape=(
+                    len(entries["indptr"]) - 1,
+                    len(subcircuit_instances[subcircuit_idx]),
+                ),
+                copy=True,
+            )
+        )
+        for subcircuit_idx, entries in subcircuit_entries.items()
+    }
+    if subcircuit_instance_probabilities is None:
+        entry_norms = {
+            subcircuit_idx: np.asarray(attribution.sum(axis=1)).ravel()
+            for subcircuit_idx, attribution in attributions.items()
+        }
+    else:
+        entry_norms = {
+            subcircuit_idx: np.abs(entry_probs).sum(axis=1)
+            for subcircuit_idx, entry_probs in _attribute_shots(
+                subcircuit_entries, subcircuit_instance_probabilities
+            ).items()
+        }
+
+    term_norms = np.array(
+        [
+            entry_norms[subcircuit_idx][summation_terms[:, subcircuit_idx]]
+            for subcircuit_idx in range(len(subcircuit_entries))
+        ]
+    )
+    circuit_deviations = []
+    for subcircuit_idx, attribution in attributions.items():
+        entry_weights = np.bincount(
+            summation_terms[:, subcircuit_idx],
+            weights=np.prod(np.delete(term_norms, subcircuit_idx, axis=0), axis=0),
+            minlength=attribution.shape[0],
+        )
+        instance_deviations = attribution.T @ entry_weights
+        if subcircuit_instance_probabilities is not None:
+            # The estimate of an instance sums disjoint groups of outcomes with signs
+            # of magnitude one, so its total variance per shot is 1 - |p|^2
+            instance_probs = subcircuit_instance_probabilities[subcircuit_idx]
+            instance_deviations *= np.sqrt(
+                np.clip(
+                    [
+                        1 - np.sum(instance_probs[instance_idx] ** 2)
+                        for instance_idx in range(len(instance_deviations))
+                    ],
+                    0,
+                    None,
+                )
+            )
+        for init_meas in _get_batch_instances(subcircuit_instances[subcircuit_idx]):
+            circuit_deviations.append(
+                (
+                    subcircuit_idx,
+                    subcircuit_instances[subcircuit_idx][init_meas],
+                    sum(
+                        instance_deviations[
+                            subcircuit_instances[subcircuit_idx][(init_meas[0], meas)]
+                        ]
+                        for meas in mutate_measurement_basis(init_meas[1])
+                    ),
+                )
+            )
+
+    extra_shots = shot_budget - min_shots * len(circuit_deviations)
+    if extra_shots < 0:
+        raise ValueError(
+            f"The shot budget ({shot_budget}) does not cover {min_shots} shot(s) for "
+            f"each of the {len(circuit_deviations)} circuits to execute."
+        )
+    deviations = np.array([deviation for _, _, deviation in circuit_deviations])
+    if deviations.sum() > 0:
+        ideal_shots = extra_shots * deviations / deviations.sum()
+    else:
+        ideal_shots = np.full(len(deviations), extra_shots / len(deviations))
+    # Round down, and hand the leftover shots to the largest remainders
+    allocated_shots = np.floor(ideal_shots).astype(int)
+    leftover = np.argsort(allocated_shots - ideal_shots, kind="stable")
+    allocated_shots[leftover[: extra_shots - allocated_shots.sum()]] += 1
+
+    shots: Dict[int, Dict[int, int]] = {
+        subcircuit_idx: {} for subcircuit_idx in subcircuit_entries
+    }
+    for (subcircuit_idx, instance_idx, _), circuit_shots in zip(
+        circuit_deviations, allocated_shots
+    ):
+        shots[subcircuit_idx][instance_idx] = min_shots + int(circuit_shots)
+
+    return shots
+
+
+async def evaluate_subcircuits_async(
+    cuts: Dict[str, Any],
+    service: Optional[QiskitRuntimeService] = None,
+    backend_names: Optional[Union[str, Sequence[str]]] = None,
+    options: Optional[Union[Options, Sequence[Options]]] = None,
+    max_in_flight: int = 4,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, int, NDArray]]:
+    """
+    Evaluate the subcircuits, streaming the results as the jobs complete.
+
+    Args:
+        - cuts (Dict): the results of cutting
+        - service (QiskitRuntimeService): A service for connecting to Qiskit Runtime Service
+        - options (Union[Options, Sequence[Options]]): Options to use on each backend
+        - backend_names (Union[str, Sequence[str]]): The name(s) of the backend(s) to be used
+        - max_in_flight (int): The maximum number of jobs running at once
+        - batch_size (int, optional): The maximum number of circuits per job, by
+            default all the circuits of a subcircuit
+    Returns:
+        (AsyncIterator): the subcircuit index, the subcircuit instance index and the
+        measured probability of each instance, in completion order
+    """
+    backends_list, options_list = _get_backends_list(backend_names, options)
+
+    _, _, subcircuit_instances = _generate_metadata(cuts)
+
+    async for result in run_subcircuit_instances_async(
+        subcircuits=cuts["subcircuits"],
+        subcircuit_instances=subcircuit_instances,
+        service=service,
+        backend_names=backends_list,
+        options=options_list,
+        max_in_flight=max_in_flight,
+        batch_size=batch_size,
+    ):
+        yield result
+
+
 def reconstruct_full_distribution(
     circuit: QuantumCircuit,
     subcircuit_instance_probabilities: Dict[int, Dict[int, NDArray]],
     cuts: Dict[str, Any],
     num_threads: int = 1,
+    method: str = "contraction",
 ) -> NDArray:
     """
     Reconstruct the full probabilities from the subcircuit evaluations.
@@ -149,6 +360,8 @@ def reconstruct_full_distribution(
         - subcircuit_instance_probabilities (dict): the probability vectors from each
             of the subcircuit instances, as output by the _run_subcircuits function
         - num_threads (int): the number of threads to use to parallelize the recomposing
+        - method (str): the reconstruction backend used by the build function, either
+            'contraction' or 'naive'
     Returns:
         - (NDArray): the reconstructed probability vector
     """
@@ -163,6 +376,7 @@ def reconstruct_full_distribution(
         subcircuit_entry_probs=subcircuit_entry_probabilities,
         num_cuts=cuts["num_cuts"],
         num_threads=num_threads,
+        method=method,
     )
 
     reconstructed_probability = generate_reconstructed_output(
@@ -176,32 +390,320 @@ def reconstruct_full_distribution(
     return reconstructed_probability
 
 
+def reconstruct_probabilities(
+    circuit: QuantumCircuit,
+    subcircuit_instance_probabilities: Dict[int, Dict[int, NDArray]],
+    cuts: Dict[str, Any],
+    bitstrings: Sequence[Union[str, int]],
+) -> NDArray:
+    """
+    Reconstruct the probabilities of chosen output states of the full circuit.
+
+    Only the requested states are reconstructed, so the full 2^n distribution is
+    never materialized.
+
+    Args:
+        - circuit (QuantumCircuit): the original full circuit
+        - subcircuit_instance_probabilities (dict): the probability vectors from each
+            of the subcircuit instances, as output by the _run_subcircuits function
+        - cuts (dict): results from the cutting step
+        - bitstrings (list): the output states to reconstruct, either as bitstrings
+            with qubit 0 as the rightmost character, or as integers indexing the
+            full distribution
+    Returns:
+        - (NDArray): the reconstructed probability of each output state
+    Raises:
+        - ValueError: a bitstring does not describe a state of the circuit
+    """
+    num_qubits = circuit.num_qubits
+    states = []
+    for bitstring in bitstrings:
+        if not isinstance(bitstring, str):
+            if not 0 <= bitstring < 2**num_qubits:
+                raise ValueError(
+                    f"State {bitstring} is out of range for {num_qubits} qubits."
+                )
+            bitstring = format(bitstring, f"0{num_qubits}b")
+        if len(bitstring) != num_qubits or not set(bitstring) <= {"0", "1"}:
+            raise ValueError(
+                f"Bitstring {bitstring} is not a state of {num_qubits} qubits."
+            )
+        states.append(bitstring)
+    # Column q holds the bit of qubit q
+    state_bits = (
+        np.array([list(state) for state in states], dtype=int).reshape(
+            len(states), num_qubits
+        )[:, ::-1]
+        if len(states) > 0
+        else np.zeros((0, num_qubits), dtype=int)
+    )
+
+    summation_terms, subcircuit_entries, _ = _generate_metadata(cuts)
+
+    subcircuit_entry_probabilities = _attribute_shots(
+        subcircuit_entries, subcircuit_instance_probabilities
+    )
+
+    output_qubits = get_output_qubits(
+        circuit, cuts["subcircuits"], cuts["complete_path_map"]
+    )
+    subcircuit_queries = {
+        subcircuit_idx: state_bits[:, out_qubits]
+        @ (1 << np.arange(len(out_qubits), dtype=int))
+        for subcircuit_idx, out_qubits in output_qubits.items()
+    }
+
+    probabilities, _ = query_build(
+        summation_terms=summation_terms,
+        subcircuit_entry_probs=subcircuit_entry_probabilities,
+        num_cuts=cuts["num_cuts"],
+        subcircuit_queries=subcircuit_queries,
+    )
+
+    return probabilities
+
+
+def reconstruct_dynamic_definition(
+    circuit: QuantumCircuit,
+    subcircuit_instance_probabilities: Dict[int, Dict[int, NDArray]],
+    cuts: Dict[str, Any],
+    max_active_qubits: int,
+    max_recursion: int = 1,
+    num_threads: int = 1,
+    method: str = "contraction",
+) -> List[Dict[str, Any]]:
+    """
+    Reconstruct the probabilities of the full circuit bin by bin, by dynamic definition.
+
+    Only max_active_qubits qubits are resolved in each recursion, so the memory
+    used by the reconstruction does not grow with the width of the circuit.
+
+    Args:
+        - circuit (QuantumCircuit): the original full circuit
+        - subcircuit_instance_probabilities (dict): the probability vectors from each
+            of the subcircuit instances, as output by the _run_subcircuits function
+        - cuts (dict): results from the cutting step
+        - max_active_qubits (int): the number of qubits resolved in each recursion
+        - max_recursion (int): the maximum number of recursions
+        - num_threads (int): the number of threads to use to parallelize the recomposing
+        - method (str): the reconstruction backend used by the build function, either
+            'contraction' or 'naive'
+    Returns:
+        - (list): one dictionary per recursion, with the state of each qubit ('active',
+            'merged', 0 or 1) under the key 'qubit_states', and the reconstructed
+            probability of each bin under the key 'bins'
+    Raises:
+        - ValueError: max_active_qubits or max_recursion is not positive
+    """
+    if max_active_qubits < 1:
+        raise ValueError("max_active_qubits must be a positive integer.")
+    if max_recursion < 1:
+        raise ValueError("max_recursion must be a positive integer.")
+
+    summation_terms, subcircuit_entries, _ = _generate_metadata(cuts)
+
+    subcircuit_entry_probabilities = _attribute_shots(
+        subcircuit_entries, subcircuit_instance_probabilities
+    )
+
+    output_qubits = get_output_qubits(
+        circuit, cuts["subcircuits"], cuts["complete_path_map"]
+    )
+
+    return dd_build(
+        summation_terms=summation_terms,
+        subcircuit_entry_probs=subcircuit_entry_probabilities,
+        num_cuts=cuts["num_cuts"],
+        output_qubits=output_qubits,
+        max_active_qubits=max_active_qubits,
+        max_recursion=max_recursion,
+        num_threads=num_threads,
+        method=method,
+    )
+
+
+def reconstruct_expectation_values(
+    cuts: Dict[str, Any],
+    observables: Sequence[str],
+    service: Optional[QiskitRuntimeService] = None,
+    backend_names: Optional[Union[str, Sequence[str]]] = None,
+    options: Optional[Union[Options, Sequence[Options]]] = None,
+) -> NDArray:
+    """
+    Reconstruct the expectation values of Pauli observables of the full circuit.
+
+    The output qubits of each subcircuit are measured in the basis of the observable
+    and each subcircuit entry is collapsed to a scalar, so the cost of the
+    reconstruction does not depend on the number of qubits of the circuit.
+
+    Args:
+        - cuts (dict): results from the cutting step
+        - observables (list): the Pauli strings to measure, with qubit 0 as the
+            rightmost character, e.g. 'IZX'
+        - service (QiskitRuntimeService): the runtime service
+        - backend_names (Union[str, Sequence[str]]): the name(s) of the backend(s) used
+            to run the subcircuits
+        - options (Union[Options, Sequence[Options]]): options for the runtime execution
+            of subcircuits on each backend
+    Returns:
+        - (NDArray): the reconstructed expectation value of each observable
+    Raises:
+        - ValueError: an observable is not a Pauli string over the circuit qubits
+    """
+    backends_list, options_list = _get_backends_list(backend_names, options)
+
+    num_qubits = len(cuts["complete_path_map"])
+    for observable in observables:
+        if len(observable) != num_qubits or not set(observable) <= set("IXYZ"):
+            raise ValueError(
+                f"Observable {observable} is not a Pauli string on {num_qubits} qubits."
+            )
+
+    summation_terms, subcircuit_entries, subcircuit_instances = _generate_metadata(cuts)
+
+    expectation_instances = _generate_expectation_instances(
+        cuts, subcircuit_instances, observables
+    )
+
+    expectation_instance_values = run_subcircuit_instances(
+        subcircuits=cuts["subcircuits"],
+        subcircuit_instances=expectation_instances,
+        service=service,
+        backend_names=backends_list,
+        options=options_list,
+    )
+
+    subcircuit_entry_expectations = _attribute_expectations(
+        cuts,
+        subcircuit_entries,
+        subcircuit_instances,
+        expectation_instances,
+        expectation_instance_values,
+        observables,
+    )
+
+    # Every observable is a query on the scalar entries of the subcircuits
+    expectation_values, _ = query_build(
+        summation_terms=summation_terms,
+        subcircuit_entry_probs=subcircuit_entry_expectations,
+        num_cuts=cuts["num_cuts"],
+        subcircuit_queries={
+            subcircuit_idx: np.arange(len(observables))
+            for subcircuit_idx in subcircuit_entry_expectations
+        },
+    )
+
+    return expectation_values
+
+
+def _get_backends_list(
+    backend_names: Optional[Union[str, Sequence[str]]],
+    options: Optional[Union[Options, Sequence[Options]]],
+) -> Tuple[Sequence[str], Sequence[Options]]:
+    """
+    Put backend_names and options in lists to ensure it is unambiguous how to sync them.
+
+    Args:
+        - backend_names (Union[str, Sequence[str]]): The name(s) of the backend(s) to be used
+        - options (Union[Options, Sequence[Options]]): Options to use on each backend
+    Returns:
+        - (Tuple[Sequence[str], Sequence[Options]]): the backend names and the options
+            of each backend
+    Raises:
+        - AttributeError: the number of backends and of options differ
+    """
+    backends_list: Sequence[str] = []
+    options_list: Sequence[Options] = []
+    if backend_names is None or isinstance(backend_names, str):
+        if isinstance(options, Options):
+            options_list = [options]
+        elif isinstance(options, Sequence) and (len(options) != 1):
+            options_list = [options[0]]
+        if isinstance(backend_names, str):
+            backends_list = [backend_names]
+    else:
+        backends_list = backend_names
+        if isinstance(options, Options):
+            options_list = [options] * len(backends_list)
+        elif options is None:
+            options_list = [None] * len(backends_list)
+        else:
+            options_list = options
+
+    if backend_names:
+        if len(backends_list) != len(options_list):
+            raise AttributeError(
+                f"The list of backend names is length ({len(backends_list)}), but the list of options is length ({len(options_list)}). It is ambiguous how these options should be applied."
+            )
+
+    return backends_list, options_list
+
+
+# The metadata of the recent cut solutions, keyed by their cut layout
+_metadata_cache: "OrderedDict[Tuple[Any, ...], Tuple[Any, ...]]" = OrderedDict()
+_METADATA_CACHE_SIZE = 8
+# The subcircuits may be evaluated from several threads
+_metadata_cache_lock = threading.Lock()
+
+
 def _generate_metadata(
     cuts: Dict[str, Any]
 ) -> Tuple[
-    List[Dict[int, int]],
-    Dict[int, Dict[Tuple[str, str], Tuple[int, Sequence[Tuple[int, int]]]]],
+    NDArray,
+    Dict[int, Dict[str, NDArray]],
     Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
 ]:
     """
     Generate metadata used to execute subcircuits and reconstruct probabilities of original circuit.
 
+    The metadata of the recent cut solutions is cached, keyed by their cut layout, so it
+    is generated once per solution without being stored on the cuts.
+
     Args:
         - cuts (Dict[str, Any]): results from the cutting step
     Returns:
-        - (tuple): information about the 4^(num cuts) summation terms used to reconstruct original
-            probabilities, a dictionary with information on each of the subcircuits, and a dictionary
-            containing indexes for each of the subcircuits
+        - (tuple): the table of the 4^(num cuts) summation terms used to reconstruct original
+            probabilities, the kronecker terms of the entries of each of the subcircuits,
+            and a dictionary containing indexes for each of the subcircuits
     """
-    (
-        summation_terms,
-        subcircuit_entries,
-        subcircuit_instances,
-    ) = generate_summation_terms(
-        subcircuits=cuts["subcircuits"],
-        complete_path_map=cuts["complete_path_map"],
-        num_cuts=cuts["num_cuts"],
+    # The metadata only depends on the qubits of the subcircuits and the cuts
+    key = (
+        cuts["num_cuts"],
+        tuple(subcircuit.num_qubits for subcircuit in cuts["subcircuits"]),
+        tuple(
+            (
+                repr(input_qubit),
+                tuple(
+                    (
+                        path_element["subcircuit_idx"],
+                        repr(path_element["subcircuit_qubit"]),
+                    )
+                    for path_element in path
+                ),
+            )
+            for input_qubit, path in cuts["complete_path_map"].items()
+        ),
     )
+    with _metadata_cache_lock:
+        metadata = _metadata_cache.get(key)
+        if metadata is not None:
+            _metadata_cache.move_to_end(key)
+    if metadata is None:
+        metadata = generate_summation_arrays(
+            subcircuits=cuts["subcircuits"],
+            complete_path_map=cuts["complete_path_map"],
+            num_cuts=cuts["num_cuts"],
+        )
+        # The arrays are shared by every caller with the same cut solution
+        metadata[0].setflags(write=False)
+        for entries in metadata[1].values():
+            for array in entries.values():
+                array.setflags(write=False)
+        with _metadata_cache_lock:
+            _metadata_cache[key] = metadata
+            if len(_metadata_cache) > _METADATA_CACHE_SIZE:
+                _metadata_cache.popitem(last=False)
+    summation_terms, subcircuit_entries, subcircuit_instances = metadata
     return summation_terms, subcircuit_entries, subcircuit_instances
 
 
@@ -211,6 +713,11 @@ def _run_subcircuits(
     service: Optional[QiskitRuntimeService] = None,
     backend_names: Optional[Sequence[str]] = None,
     options: Optional[Sequence[Options]] = None,
+    cache_dir: Optional[str] = None,
+    max_cache_size: int = 2**30,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    shots: Optional[Dict[int, Dict[int, int]]] = None,
 ) -> Dict[int, Dict[int, NDArray]]:
     """
     Execute all the subcircuit instances.
@@ -224,6 +731,11 @@ def _run_subcircuits(
         - service (QiskitRuntimeService): the arguments for the runtime service
         - backend_names (Sequence[str]): the backend(s) used to run the subcircuits
         - options (Options): options for the runtime execution of subcircuits
+        - cache_dir (str, optional): the directory caching the subcircuit results
+        - max_cache_size (int): the maximum size in bytes of the cache
+        - checkpoint_dir (str, optional): the directory checkpointing each subcircuit
+        - resume (bool): whether to reuse the subcircuits completed in checkpoint_dir
+        - shots (Dict, optional): the shots of each executed subcircuit instance
     Returns:
         - (Dict): the resulting probabilities from each of the subcircuit instances
     """
@@ -233,72 +745,207 @@ def _run_subcircuits(
         service=service,
         backend_names=backend_names,
         options=options,
+        cache_dir=cache_dir,
+        max_cache_size=max_cache_size,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        shots=shots,
     )
 
     return subcircuit_instance_probs
 
 
 def _attribute_shots(
-    subcircuit_entries: Dict[
-        int, Dict[Tuple[str, str], Tuple[int, Sequence[Tuple[int, int]]]]
-    ],
+    subcircuit_entries: Dict[int, Dict[str, NDArray]],
     subcircuit_instance_probs: Dict[int, Dict[int, NDArray]],
-) -> Dict[int, Dict[int, NDArray]]:
+) -> Dict[int, NDArray]:
     """
     Attribute the shots into respective subcircuit entries.
 
     task['subcircuit_entry_probs'][subcircuit_idx][subcircuit_entry_idx] = prob
 
+    The instance probabilities of each subcircuit are stacked into one array and
+    the kronecker terms are applied as a single sparse matrix product.
+
     Args:
-        - subcircuit_entries (Dict): dictionary containing information about each of the
-            subcircuit instances
+        - subcircuit_entries (Dict): the kronecker terms of the entries of each of the
+            subcircuits, as generated by generate_summation_arrays
         - subcircuit_instance_probs (Dict): the probability vectors from each of the subcircuit
             instances, as output by the _run_subcircuits function
     Returns:
-        - (Dict): a dictionary containing the probability results to each of the appropriate subcircuits
+        - (Dict): the (number of entries x number of output states) array of
+            entry probabilities of each subcircuit
     Raises:
-        - ValueError: if each of the kronecker terms are not of size two or if there are no subcircuit
-            probs provided
+        - ValueError: if an entry has an empty kronecker term
     """
-    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]] = {}
-    for subcircuit_idx in subcircuit_entries:
-        subcircuit_entry_probs[subcircuit_idx] = {}
-        for label in subcircuit_entries[subcircuit_idx]:
-            subcircuit_entry_idx, kronecker_term = subcircuit_entries[subcircuit_idx][
-                label
-            ]
-            subcircuit_entry_prob: Optional[NDArray] = None
-            for term in kronecker_term:
-                if len(term) == 2:
-                    coefficient, subcircuit_instance_idx = cast(Tuple[int, int], term)
-                else:
-                    raise ValueError("Ill-formed Kronecker term: {term}")
-                if subcircuit_entry_prob is None:
-                    subcircuit_entry_prob = (
-                        coefficient
-                        * subcircuit_instance_probs[subcircuit_idx][
-                            subcircuit_instance_idx
-                        ]
-                    )
-                else:
-                    subcircuit_entry_prob += (
-                        coefficient
-                        * subcircuit_instance_probs[subcircuit_idx][
-                            subcircuit_instance_idx
-                        ]
-                    )
-
-            if subcircuit_entry_prob is None:
-                raise ValueError(
-                    "Something unexpected happened during shot attribution."
-                )
-            subcircuit_entry_probs[subcircuit_idx][
-                subcircuit_entry_idx
-            ] = subcircuit_entry_prob
+    subcircuit_entry_probs: Dict[int, NDArray] = {}
+    for subcircuit_idx, entries in subcircuit_entries.items():
+        if np.any(np.diff(entries["indptr"]) == 0):
+            raise ValueError("Something unexpected happened during shot attribution.")
+        instance_probs = subcircuit_instance_probs[subcircuit_idx]
+        stacked_instance_probs = np.array(
+            [instance_probs[idx] for idx in range(len(instance_probs))]
+        )
+        attribution = scipy.sparse.csr_matrix(
+            (entries["coefficients"], entries["instances"], entries["indptr"]),
+            shape=(len(entries["indptr"]) - 1, len(stacked_instance_probs)),
+            copy=True,
+        )
+        subcircuit_entry_probs[subcircuit_idx] = np.asarray(
+            attribution @ stacked_instance_probs
+        )
 
     return subcircuit_entry_probs
 
 
+def _get_observable_bases(
+    cuts: Dict[str, Any], observables: Sequence[str]
+) -> Dict[int, List[Dict[int, str]]]:
+    """
+    Restrict the observables to the output qubits of each subcircuit.
+
+    Args:
+        - cuts (Dict[str, Any]): results from the cutting step
+        - observables (Sequence[str]): the Pauli strings to measure
+    Returns:
+        - (Dict): for each subcircuit, the Pauli measured on each of its output qubits,
+            keyed by subcircuit qubit index, for each observable
+    """
+    observable_bases: Dict[int, List[Dict[int, str]]] = {
+        subcircuit_idx: [{} for _ in observables]
+        for subcircuit_idx in range(len(cuts["subcircuits"]))
+    }
+    for full_qubit_idx, input_qubit in enumerate(cuts["complete_path_map"]):
+        output_qubit = cuts["complete_path_map"][input_qubit][-1]
+        subcircuit_idx = output_qubit["subcircuit_idx"]
+        subcircuit_qubit_idx = cuts["subcircuits"][subcircuit_idx].qubits.index(
+            output_qubit["subcircuit_qubit"]
+        )
+        for observable_idx, observable in enumerate(observables):
+            observable_bases[subcircuit_idx][observable_idx][
+                subcircuit_qubit_idx
+            ] = observable[::-1][full_qubit_idx]
+    return observable_bases
+
+
+def _measure_observable(
+    meas: Tuple[Any, ...], observable_basis: Dict[int, str]
+) -> Tuple[Any, ...]:
+    """
+    Measure the output qubits of a subcircuit instance in the basis of an observable.
+
+    Args:
+        - meas (tuple): the measurement bases of the subcircuit instance
+        - observable_basis (Dict): the Pauli measured on each output qubit
+    Returns:
+        - (tuple): the measurement bases with the output qubits replaced
+    """
+    return tuple(
+        observable_basis.get(qubit_idx, basis) for qubit_idx, basis in enumerate(meas)
+    )
+
+
+def _generate_expectation_instances(
+    cuts: Dict[str, Any],
+    subcircuit_instances: Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
+    observables: Sequence[str],
+) -> Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]]:
+    """
+    Generate the subcircuit instances needed to measure the observables.
+
+    Each instance is closed under the identity mutations of its measurement bases,
+    as the subcircuit executions derive the I and Z measurements from a single run.
+
+    Args:
+        - cuts (Dict[str, Any]): results from the cutting step
+        - subcircuit_instances (Dict): the subcircuit instances of the reconstruction
+        - observables (Sequence[str]): the Pauli strings to measure
+    Returns:
+        - (Dict): the subcircuit instances measuring the output qubits in the basis
+            of each observable
+    """
+    observable_bases = _get_observable_bases(cuts, observables)
+    expectation_instances: Dict[
+        int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
+    ] = {}
+    for subcircuit_idx, instances in subcircuit_instances.items():
+        expectation_instances[subcircuit_idx] = {}
+        for observable_basis in observable_bases[subcircuit_idx]:
+            for init, meas in instances:
+                observable_meas = _measure_observable(meas, observable_basis)
+                for mutated_meas in [observable_meas] + mutate_measurement_basis(
+                    observable_meas
+                ):
+                    if (init, mutated_meas) not in expectation_instances[
+                        subcircuit_idx
+                    ]:
+                        expectation_instances[subcircuit_idx][
+                            (init, mutated_meas)
+                        ] = len(expectation_instances[subcircuit_idx])
+    return expectation_instances
+
+
+def _attribute_expectations(
+    cuts: Dict[str, Any],
+    subcircuit_entries: Dict[int, Dict[str, NDArray]],
+    subcircuit_instances: Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
+    expectation_instances: Dict[
+        int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
+    ],
+    expectation_instance_values: Dict[int, Dict[int, NDArray]],
+    observables: Sequence[str],
+) -> Dict[int, Dict[int, NDArray]]:
+    """
+    Attribute the measured expectations into respective subcircuit entries.
+
+    Args:
+        - cuts (Dict[str, Any]): results from the cutting step
+        - subcircuit_entries (Dict): the kronecker terms of the entries of each of the
+            subcircuits, as generated by generate_summation_arrays
+        - subcircuit_instances (Dict): the subcircuit instances of the reconstruction
+        - expectation_instances (Dict): the subcircuit instances measuring the
+            observables, as generated by _generate_expectation_instances
+        - expectation_instance_values (Dict): the scalar results of each of the
+            expectation instances
+        - observables (Sequence[str]): the Pauli strings to measure
+    Returns:
+        - (Dict): the value of each subcircuit entry for each observable
+    """
+    observable_bases = _get_observable_bases(cuts, observables)
+    subcircuit_entry_expectations: Dict[int, Dict[int, NDArray]] = {}
+    for subcircuit_idx in subcircuit_entries:
+        instance_keys = {
+            instance_idx: init_meas
+            for init_meas, instance_idx in subcircuit_instances[subcircuit_idx].items()
+        }
+        # Scalar value of each reconstruction instance, for each observable
+        instance_values = np.zeros((len(instance_keys), len(observables)), dtype=float)
+        for instance_idx, (init, meas) in instance_keys.items():
+            for observable_idx, observable_basis in enumerate(
+                observable_bases[subcircuit_idx]
+            ):
+                expectation_instance_idx = expectation_instances[subcircuit_idx][
+                    (init, _measure_observable(meas, observable_basis))
+                ]
+                instance_values[instance_idx, observable_idx] = np.sum(
+                    expectation_instance_values[subcircuit_idx][
+                        expectation_instance_idx
+                    ]
+                )
+        indptr = subcircuit_entries[subcircuit_idx]["indptr"]
+        term_values = (
+            subcircuit_entries[subcircuit_idx]["coefficients"][:, np.newaxis]
+            * instance_values[subcircuit_entries[subcircuit_idx]["instances"]]
+        )
+        subcircuit_entry_expectations[subcircuit_idx] = {
+            subcircuit_entry_idx: term_values[
+                indptr[subcircuit_entry_idx] : indptr[subcircuit_entry_idx + 1]
+            ].sum(axis=0)
+            for subcircuit_entry_idx in range(len(indptr) - 1)
+        }
+    return subcircuit_entry_expectations
+
+
 @typing.no_type_check
 def find_wire_cuts(
     circuit: QuantumCircuit,
@@ -308,6 +955,9 @@ def find_wire_cuts(
     max_subcircuit_cuts: Optional[int],
     max_subcircuit_size: Optional[int],
     verbose: bool,
+    solver: str = "cplex",
+    warm_start: bool = False,
+    num_processes: Optional[int] = 1,
 ) -> Dict[str, Any]:
     """
     Find optimal cuts for the wires.
@@ -324,16 +974,30 @@ def find_wire_cuts(
         - max_subcircuit_size (int, optional): the maximum number of two qubit gates in each
             subcircuit
         - verbose (bool): whether to print information about the cut finding or not
+        - solver (str): the solver, either 'cplex', 'highs' or 'heuristic'
+        - warm_start (bool): whether to pass a solution of the heuristic to CPLEX as a
+            starting point. The other solvers take no starting point, so it is ignored
+            with a warning
+        - num_processes (int, optional): the number of processes solving the models for
+            the different numbers of subcircuits concurrently, by default one, or all
+            the available cores if None. The models start together, and the processes
+            share the lowest cost found so far, which CPLEX polls while solving to
+            stop the models that cannot beat it
     Returns:
         - (dict): the solution found for the cuts
     """
+    if warm_start and solver != "cplex":
+        # Running the heuristic would only cost time
+        warnings.warn(
+            f"The {solver} solver takes no starting point, so warm_start is ignored."
+        )
+        warm_start = False
+
     stripped_circ = _circuit_stripping(circuit=circuit)
     n_vertices, edges, vertex_ids, id_vertices = _read_circuit(circuit=stripped_circ)
     num_qubits = circuit.num_qubits
-    cut_solution = {}
-    min_cost = float("inf")
 
-    best_mip_model = None
+    all_kwargs = []
     for num_subcircuit in num_subcircuits:
         if (
             num_subcircuit * max_subcircuit_width - (num_subcircuit - 1) < num_qubits
@@ -354,36 +1018,51 @@ def find_wire_cuts(
             max_subcircuit_size=max_subcircuit_size,
             num_qubits=num_qubits,
             max_cuts=max_cuts,
+            solver=solver,
         )
-
-        mip_model = MIPModel(**kwargs)
-        feasible = mip_model.solve(min_postprocessing_cost=min_cost)
-        if not feasible:
+        all_kwargs.append(kwargs)
+
+    if num_processes is None:
+        num_processes = os.cpu_count() or 1
+    num_processes = min(num_processes, len(all_kwargs))
+    if num_processes <= 1:
+        results = []
+        min_cost = float("inf")
+        for kwargs in all_kwargs:
+            result = _find_cuts_for_num_subcircuit(
+                circuit=circuit,
+                min_cost=min_cost,
+                warm_start=warm_start,
+                **kwargs,
+            )
+            if result is not None:
+                min_cost = min(min_cost, result[0]["classical_cost"])
+            results.append(result)
+    else:
+        # Why "spawn"?  See https://pythonspeed.com/articles/python-multiprocessing/
+        ctx = mp.get_context("spawn")
+        best_cost = ctx.Value("d", float("inf"))
+        threads = max(1, (os.cpu_count() or 1) // num_processes)
+        tasks = [(circuit, warm_start, threads, kwargs) for kwargs in all_kwargs]
+        with ctx.Pool(
+            num_processes, initializer=_init_cuts_worker, initargs=(best_cost,)
+        ) as pool:
+            results = pool.map(_find_cuts_worker, tasks, chunksize=1)
+
+    cut_solution: Dict[str, Any] = {}
+    min_cost = float("inf")
+    best_report = None
+    for kwargs, result in zip(all_kwargs, results):
+        if result is None:
             if verbose:
-                print("%d subcircuits : NO SOLUTIONS" % (num_subcircuit))
+                print("%d subcircuits : NO SOLUTIONS" % (kwargs["num_subcircuit"]))
             continue
-        else:
-            positions = _cuts_parser(mip_model.cut_edges, circuit)
-            subcircuits, complete_path_map = _subcircuits_parser(
-                subcircuit_gates=mip_model.subcircuits, circuit=circuit
-            )
-            O_rho_pairs = _get_pairs(complete_path_map=complete_path_map)
-            counter = _get_counter(subcircuits=subcircuits, O_rho_pairs=O_rho_pairs)
-
-            classical_cost = _cost_estimate(counter=counter)
-            cost = classical_cost
-
-            if cost < min_cost:
-                min_cost = cost
-                best_mip_model = mip_model
-                cut_solution = {
-                    "max_subcircuit_width": max_subcircuit_width,
-                    "subcircuits": subcircuits,
-                    "complete_path_map": complete_path_map,
-                    "num_cuts": len(positions),
-                    "counter": counter,
-                    "classical_cost": classical_cost,
-                }
+        solution, report = result
+        if solution["classical_cost"] < min_cost:
+            min_cost = solution["classical_cost"]
+            cut_solution = solution
+            best_report = report
+
     if verbose and len(cut_solution) > 0:
         print("-" * 20)
         classical_cost: float = float(cut_solution["classical_cost"])
@@ -398,21 +1077,174 @@ def find_wire_cuts(
             classical_cost=classical_cost,
         )
 
-        if best_mip_model is None:
+        if best_report is None:
             raise ValueError(
                 "Something went wrong during cut finding. The best MIP model object was never instantiated."
             )
-        print("Model objective value = %.2e" % (best_mip_model.objective), flush=True)  # type: ignore
-        print("MIP runtime:", best_mip_model.runtime, flush=True)
+        print("Model objective value = %.2e" % (best_report["objective"]), flush=True)
+        print("MIP solver:", best_report["solver"], flush=True)
+        print("MIP build time:", best_report["build_time"], flush=True)
+        print("MIP runtime:", best_report["runtime"], flush=True)
 
-        if best_mip_model.optimal:
-            print("OPTIMAL, MIP gap =", best_mip_model.mip_gap, flush=True)
+        if best_report["optimal"]:
+            print("OPTIMAL, MIP gap =", best_report["mip_gap"], flush=True)
         else:
-            print("NOT OPTIMAL, MIP gap =", best_mip_model.mip_gap, flush=True)
+            print("NOT OPTIMAL, MIP gap =", best_report["mip_gap"], flush=True)
         print("-" * 20, flush=True)
     return cut_solution
 
 
+def _find_cuts_for_num_subcircuit(
+    circuit: QuantumCircuit,
+    min_cost: float,
+    warm_start: bool,
+    lp_path: Optional[str] = None,
+    threads: Optional[int] = None,
+    get_min_cost: Optional[Callable[[], float]] = None,
+    **kwargs,
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Find the cuts for one number of subcircuits.
+
+    Args:
+        - circuit (QuantumCircuit): original quantum circuit to be cut into subcircuits
+        - min_cost (float): the minimum post-processing cost found so far, often is inf
+        - warm_start (bool): whether to pass a solution of the heuristic to CPLEX as a
+            starting point
+        - lp_path (str, optional): the file the MIP model is exported to, or None to
+            skip the export
+        - threads (int, optional): the number of threads used by CPLEX
+        - get_min_cost (callable, optional): returns the minimum post-processing cost
+            found so far by the models solved concurrently, polled by CPLEX
+        - **kwargs: the arguments of the model
+    Returns:
+        - (tuple): the solution found for the cuts and the solve statistics of the
+            model, or None if the model found no solution
+    """
+    if kwargs["solver"] == "heuristic":
+        mip_model = HeuristicModel(**kwargs)
+        feasible = mip_model.solve(min_postprocessing_cost=min_cost)
+    else:
+        initial_subcircuits = None
+        if warm_start and kwargs["solver"] == "cplex":
+            initial_subcircuits = _find_initial_subcircuits(**kwargs)
+        mip_model = MIPModel(**kwargs, lp_path=lp_path, threads=threads)
+        feasible = mip_model.solve(
+            min_postprocessing_cost=min_cost,
+            initial_subcircuits=initial_subcircuits,
+            get_min_postprocessing_cost=get_min_cost,
+        )
+    if not feasible:
+        return None
+
+    positions = _cuts_parser(mip_model.cut_edges, circuit)
+    subcircuits, complete_path_map = _subcircuits_parser(
+        subcircuit_gates=mip_model.subcircuits, circuit=circuit
+    )
+    O_rho_pairs = _get_pairs(complete_path_map=complete_path_map)
+    counter = _get_counter(subcircuits=subcircuits, O_rho_pairs=O_rho_pairs)
+
+    classical_cost = _cost_estimate(counter=counter)
+    cut_solution = {
+        "max_subcircuit_width": kwargs["max_subcircuit_width"],
+        "subcircuits": subcircuits,
+        "complete_path_map": complete_path_map,
+        "num_cuts": len(positions),
+        "counter": counter,
+        "classical_cost": classical_cost,
+    }
+    report = {
+        "objective": mip_model.objective,
+        "solver": mip_model.solver,
+        "build_time": mip_model.build_time,
+        "runtime": mip_model.runtime,
+        "optimal": mip_model.optimal,
+        "mip_gap": mip_model.mip_gap,
+    }
+    return cut_solution, report
+
+
+# The lowest post-processing cost found by any of the cut finding processes
+_best_cost: Any = None
+
+
+def _init_cuts_worker(best_cost: Any) -> None:
+    """
+    Share the lowest post-processing cost with a cut finding process.
+
+    Args:
+        - best_cost (multiprocessing.Value): the lowest post-processing cost found so far
+    Returns:
+        - None
+    """
+    global _best_cost
+    _best_cost = best_cost
+
+
+def _get_best_cost() -> float:
+    """
+    Read the lowest post-processing cost found by any of the cut finding processes.
+
+    Returns:
+        - (float): the lowest post-processing cost found so far
+    """
+    return _best_cost.value
+
+
+def _find_cuts_worker(
+    task: Tuple[QuantumCircuit, bool, int, Dict[str, Any]]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Find the cuts for one number of subcircuits in a cut finding process.
+
+    The model is cut off at the lowest cost found by the models that finished before
+    it starts, which CPLEX keeps polling while it solves, and its own cost is shared
+    with the other models.
+
+    Args:
+        - task (tuple): the circuit, whether to warm start, the number of CPLEX threads
+            and the arguments of the model
+    Returns:
+        - (tuple): the solution found for the cuts and the solve statistics of the
+            model, or None if the model found no solution
+    """
+    circuit, warm_start, threads, kwargs = task
+    result = _find_cuts_for_num_subcircuit(
+        circuit=circuit,
+        min_cost=_best_cost.value,
+        warm_start=warm_start,
+        threads=threads,
+        get_min_cost=_get_best_cost,
+        **kwargs,
+    )
+    if result is not None:
+        with _best_cost.get_lock():
+            _best_cost.value = min(_best_cost.value, result[0]["classical_cost"])
+    return result
+
+
+def _find_initial_subcircuits(**kwargs) -> Optional[List[int]]:
+    """
+    Find a quick heuristic solution to start the MIP search from.
+
+    Args:
+        - kwargs: the arguments of MIPModel
+    Returns:
+        - (list): the subcircuit of each vertex, or None if the heuristic found no
+            solution satisfying the constraints
+    """
+    heuristic_model = HeuristicModel(
+        **{key: value for key, value in kwargs.items() if key != "solver"}
+    )
+    if not heuristic_model.solve(min_postprocessing_cost=float("inf")):
+        return None
+    initial_subcircuits = [0] * heuristic_model.n_vertices
+    for subcircuit_idx, subcircuit in enumerate(heuristic_model.subcircuits):
+        for vertex in subcircuit:
+            initial_subcircuits[heuristic_model.vertex_ids[vertex]] = subcircuit_idx
+    return initial_subcircuits
+
+
 def cut_circuit_wire(
     circuit: QuantumCircuit, subcircuit_vertices: Sequence[Sequence[int]], verbose: bool
 ) -> Dict[str, Any]:
@@ -599,24 +1431,28 @@ def _subcircuits_parser(
     Assign the single qubit gates to the closest two-qubit gates
     """
 
-    def calculate_distance_between_gate(gate_A, gate_B):
-        if len(gate_A.split(" ")) >= len(gate_B.split(" ")):
-            tmp_gate = gate_A
-            gate_A = gate_B
-            gate_B = tmp_gate
+    def calculate_distance_to_subcircuit(gate, qubit_depths):
         distance = float("inf")
-        for qarg_A in gate_A.split(" "):
-            qubit_A = qarg_A.split("]")[0] + "]"
-            qgate_A = int(qarg_A.split("]")[-1])
-            for qarg_B in gate_B.split(" "):
-                qubit_B = qarg_B.split("]")[0] + "]"
-                qgate_B = int(qarg_B.split("]")[-1])
-                # print('%s gate %d --> %s gate %d'%(qubit_A,qgate_A,qubit_B,qgate_B))
-                if qubit_A == qubit_B:
-                    distance = min(distance, abs(qgate_B - qgate_A))
-        # print('Distance from %s to %s = %f'%(gate_A,gate_B,distance))
+        for qarg in gate.split(" "):
+            depths = qubit_depths.get(qarg.split("]")[0] + "]", [])
+            depth = int(qarg.split("]")[-1])
+            # The nearest gates of the subcircuit on the same qubit
+            idx = bisect.bisect_left(depths, depth)
+            if idx < len(depths):
+                distance = min(distance, depths[idx] - depth)
+            if idx > 0:
+                distance = min(distance, depth - depths[idx - 1])
+        # print('Distance from %s to subcircuit = %f'%(gate,distance))
         return distance
 
+    # Index the gates of the subcircuits by their encoding
+    gate_positions: Dict[str, List[Tuple[int, int]]] = {}
+    for subcircuit_idx, gates in enumerate(subcircuit_gates):
+        for gate_idx, gate in enumerate(gates):
+            positions = gate_positions.setdefault(gate, [])
+            if all(idx != subcircuit_idx for idx, _ in positions):
+                positions.append((subcircuit_idx, gate_idx))
+
     dag = circuit_to_dag(circuit)
     qubit_allGate_depths = {x: 0 for x in circuit.qubits}
     qubit_2qGate_depths = {x: 0 for x in circuit.qubits}
@@ -645,15 +1481,28 @@ def _subcircuits_parser(
                 qubit_2qGate_depths[qarg] += 1
             MIP_gate_depth_encoding = MIP_gate_depth_encoding[:-1]
             # print('gate_depth_encoding = %s, MIP_gate_depth_encoding = %s'%(gate_depth_encoding,MIP_gate_depth_encoding))
-            for subcircuit_idx in range(len(subcircuit_gates)):
-                for gate_idx in range(len(subcircuit_gates[subcircuit_idx])):
-                    if (
-                        subcircuit_gates[subcircuit_idx][gate_idx]
-                        == MIP_gate_depth_encoding
-                    ):
-                        subcircuit_gates[subcircuit_idx][gate_idx] = gate_depth_encoding
-                        break
+            for subcircuit_idx, gate_idx in gate_positions.get(
+                MIP_gate_depth_encoding, []
+            ):
+                subcircuit_gates[subcircuit_idx][gate_idx] = gate_depth_encoding
     # print('After translation :',subcircuit_gates,flush=True)
+
+    # The sorted depths of the two-qubit gates of each subcircuit on each qubit
+    subcircuit_qubit_depths: List[Dict[str, List[int]]] = []
+    for gates in subcircuit_gates:
+        qubit_depths: Dict[str, List[int]] = {}
+        for gate in gates:
+            if len(gate.split(" ")) == 1:
+                # Do not compare against single qubit gates
+                continue
+            for qarg in gate.split(" "):
+                qubit_depths.setdefault(qarg.split("]")[0] + "]", []).append(
+                    int(qarg.split("]")[-1])
+                )
+        for depths in qubit_depths.values():
+            depths.sort()
+        subcircuit_qubit_depths.append(qubit_depths)
+
     subcircuit_op_nodes: Dict[int, List[DAGOpNode]] = {
         x: [] for x in range(len(subcircuit_gates))
     }
@@ -667,18 +1516,10 @@ def _subcircuits_parser(
             nearest_subcircuit_idx = -1
             min_distance = float("inf")
             for subcircuit_idx in range(len(subcircuit_gates)):
-                distance = float("inf")
-                for gate in subcircuit_gates[subcircuit_idx]:
-                    if len(gate.split(" ")) == 1:
-                        # Do not compare against single qubit gates
-                        continue
-                    else:
-                        distance = min(
-                            distance,
-                            calculate_distance_between_gate(
-                                gate_A=gate_depth_encoding, gate_B=gate
-                            ),
-                        )
+                distance = calculate_distance_to_subcircuit(
+                    gate=gate_depth_encoding,
+                    qubit_depths=subcircuit_qubit_depths[subcircuit_idx],
+                )
                 # print('Distance from %s to subcircuit %d = %f'%(gate_depth_encoding,subcircuit_idx,distance))
                 if distance < min_distance:
                     min_distance = distance
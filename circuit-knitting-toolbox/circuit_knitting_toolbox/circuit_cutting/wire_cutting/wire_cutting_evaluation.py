@@ -10,17 +10,33 @@
 # that they have been altered from the originals.
 
 """Contains functions for executing subcircuits."""
-import itertools, copy
-from typing import Dict, Tuple, Sequence, Optional, List, Any, Union
+import asyncio, functools, itertools, copy, hashlib, json, os, threading
+import multiprocessing as mp
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import (
+    Dict,
+    Tuple,
+    Sequence,
+    Optional,
+    List,
+    Any,
+    Union,
+    Callable,
+    AsyncIterator,
+    cast,
+)
 from multiprocessing.pool import ThreadPool
 
 import numpy as np
 from nptyping import NDArray
 
-from qiskit import QuantumCircuit
-from qiskit.converters import circuit_to_dag, dag_to_circuit
-from qiskit.circuit.library.standard_gates import HGate, SGate, SdgGate, XGate
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import ClassicalRegister, ParameterExpression, ParameterVector
+from qiskit.circuit.library.standard_gates import get_standard_gate_name_mapping
+from qiskit.circuit.library.standard_gates import UGate
 from qiskit.primitives import Sampler as TestSampler
+from qiskit.quantum_info import Statevector
 from qiskit_ibm_runtime import QiskitRuntimeService, Sampler, Session, Options
 
 
@@ -30,12 +46,19 @@ def run_subcircuit_instances(
     service: Optional[QiskitRuntimeService] = None,
     backend_names: Optional[Sequence[str]] = None,
     options: Optional[Sequence[Options]] = None,
+    cache_dir: Optional[str] = None,
+    max_cache_size: int = 2**30,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    shots: Optional[Dict[int, Dict[int, int]]] = None,
 ) -> Dict[int, Dict[int, NDArray]]:
     """
     Execute all provided subcircuits.
 
     Using the backend(s) provided, this executes all the subcircuits to generate the
-    resultant probability vectors.
+    resultant probability vectors. Without a service, the subcircuits are simulated
+    exactly by simulate_subcircuits. Otherwise, their circuits are split into jobs
+    that the backends pull from a shared queue, see _run_scheduled_jobs.
     subcircuit_instance_probs[subcircuit_idx][subcircuit_instance_idx] = measured probability
 
     Args:
@@ -45,9 +68,150 @@ def run_subcircuit_instances(
         - service (QiskitRuntimeService): the runtime service
         - backend_names (Sequence[str]): the backend(s) used to execute the subcircuits
         - options (Sequence[Options]): options for the runtime execution of subcircuits
+        - cache_dir (str, optional): a directory caching the probabilities of the
+            executed circuits across calls. Circuits found in the cache are not executed
+        - max_cache_size (int): the size in bytes above which the least recently used
+            probabilities are evicted from the cache
+        - checkpoint_dir (str, optional): a directory where the probabilities of each
+            subcircuit are written, with its instance index map and a hash of the
+            subcircuit, backends and options, as soon as its batch completes. With a
+            service, the circuits of each finished job are written too
+        - resume (bool): whether to load the subcircuits already completed in
+            checkpoint_dir instead of executing them again. With a service, only the
+            circuits missing from the checkpoints of a subcircuit are executed
+        - shots (Dict, optional): the shots of the executed subcircuit instances, as
+            planned by plan_shots, overriding the shots of the options. Exact
+            simulations ignore them
 
     Returns:
         - (Dict): the probability vectors from each of the subcircuit instances
+
+    Raises:
+        - ValueError: if a checkpoint was written for different subcircuit instances,
+            a different subcircuit, or other backends or options
+        - AttributeError: if the backend names and options have different lengths
+    """
+    subcircuit_instance_probs: Dict[int, Dict[int, NDArray]] = {}
+    completed_circuits: Dict[int, Dict[int, NDArray]] = {}
+    checkpoint_keys: Dict[int, str] = {}
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        checkpoint_keys = {
+            subcircuit_idx: _get_checkpoint_key(
+                subcircuit=subcircuit,
+                backend_names=backend_names if service is not None else None,
+                options=options if service is not None else None,
+            )
+            for subcircuit_idx, subcircuit in enumerate(subcircuits)
+        }
+        if resume:
+            for subcircuit_idx in range(len(subcircuits)):
+                checkpoint, circuit_probs = _load_checkpoint(
+                    checkpoint_dir=checkpoint_dir,
+                    subcircuit_idx=subcircuit_idx,
+                    subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                    checkpoint_key=checkpoint_keys[subcircuit_idx],
+                )
+                if checkpoint is not None:
+                    subcircuit_instance_probs[subcircuit_idx] = checkpoint
+                elif len(circuit_probs) > 0:
+                    completed_circuits[subcircuit_idx] = circuit_probs
+    pending_subcircuits = [
+        subcircuit_idx
+        for subcircuit_idx in range(len(subcircuits))
+        if subcircuit_idx not in subcircuit_instance_probs
+    ]
+
+    if service is None:
+        # Simulate the instances of every subcircuit exactly, in one process pool
+        batches = [
+            _prepare_subcircuit_batch(
+                subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                subcircuit=subcircuits[subcircuit_idx],
+            )
+            for subcircuit_idx in pending_subcircuits
+        ]
+        all_probabilities = _run_cached(
+            run=simulate_subcircuits,
+            subcircuits=[
+                template
+                for template, parameter_values in batches
+                for _ in parameter_values
+            ],
+            parameter_values=[
+                parameters
+                for _, parameter_values in batches
+                for parameters in parameter_values
+            ],
+            cache_dir=cache_dir,
+            max_cache_size=max_cache_size,
+        )
+        offset = 0
+        for subcircuit_idx, (_, parameter_values) in zip(pending_subcircuits, batches):
+            subcircuit_instance_probs[subcircuit_idx] = _measure_subcircuit_batch(
+                subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                subcircuit_inst_probs=all_probabilities[
+                    offset : offset + len(parameter_values)
+                ],
+            )
+            offset += len(parameter_values)
+            if checkpoint_dir is not None:
+                _save_checkpoint(
+                    checkpoint_dir=checkpoint_dir,
+                    subcircuit_idx=subcircuit_idx,
+                    subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                    subcircuit_instance_probs=subcircuit_instance_probs[subcircuit_idx],
+                    checkpoint_key=checkpoint_keys[subcircuit_idx],
+                )
+        return {
+            subcircuit_idx: subcircuit_instance_probs[subcircuit_idx]
+            for subcircuit_idx in range(len(subcircuits))
+        }
+
+    subcircuit_instance_probs.update(
+        _run_scheduled_jobs(
+            subcircuits=subcircuits,
+            subcircuit_instances=subcircuit_instances,
+            pending_subcircuits=pending_subcircuits,
+            service=service,
+            backend_names=backend_names,
+            options=options,
+            cache_dir=cache_dir,
+            max_cache_size=max_cache_size,
+            checkpoint_dir=checkpoint_dir,
+            shots=shots,
+            completed_circuits=completed_circuits,
+            checkpoint_keys=checkpoint_keys,
+        )
+    )
+
+    return {
+        subcircuit_idx: subcircuit_instance_probs[subcircuit_idx]
+        for subcircuit_idx in range(len(subcircuits))
+    }
+
+
+def _get_subcircuit_backends(
+    num_subcircuits: int,
+    service: Optional[QiskitRuntimeService] = None,
+    backend_names: Optional[Sequence[str]] = None,
+    options: Optional[Sequence[Options]] = None,
+) -> Tuple[List[Union[str, None]], List[Union[Options, None]]]:
+    """
+    Assign a backend and options to each subcircuit, in a round-robin fashion.
+
+    Args:
+        - num_subcircuits (int): the number of subcircuits
+        - service (QiskitRuntimeService): the runtime service
+        - backend_names (Sequence[str]): the backend(s) used to execute the subcircuits
+        - options (Sequence[Options]): options for the runtime execution of subcircuits
+
+    Returns:
+        - (list): the backend name of each subcircuit
+        - (list): the options of each subcircuit
+
+    Raises:
+        - AttributeError: if the backend names and options have different lengths
     """
     if backend_names and options:
         if len(backend_names) != len(options):
@@ -57,7 +221,7 @@ def run_subcircuit_instances(
     if service:
         if backend_names:
             backend_names_repeated: List[Union[str, None]] = [
-                backend_names[i % len(backend_names)] for i, _ in enumerate(subcircuits)
+                backend_names[i % len(backend_names)] for i in range(num_subcircuits)
             ]
             if options is None:
                 options_repeated: List[Union[Options, None]] = [None] * len(
@@ -65,36 +229,119 @@ def run_subcircuit_instances(
                 )
             else:
                 options_repeated = [
-                    options[i % len(options)] for i, _ in enumerate(subcircuits)
+                    options[i % len(options)] for i in range(num_subcircuits)
                 ]
         else:
-            backend_names_repeated = ["ibmq_qasm_simulator"] * len(subcircuits)
+            backend_names_repeated = ["ibmq_qasm_simulator"] * num_subcircuits
             if options:
-                options_repeated = [options[0]] * len(subcircuits)
+                options_repeated = [options[0]] * num_subcircuits
             else:
-                options_repeated = [None] * len(subcircuits)
+                options_repeated = [None] * num_subcircuits
     else:
-        backend_names_repeated = [None] * len(subcircuits)
-        options_repeated = [None] * len(subcircuits)
+        backend_names_repeated = [None] * num_subcircuits
+        options_repeated = [None] * num_subcircuits
 
-    subcircuit_instance_probs: Dict[int, Dict[int, NDArray]] = {}
-    with ThreadPool() as pool:
-        args = [
-            [
-                subcircuit_instances[subcircuit_idx],
-                subcircuit,
-                service,
-                backend_names_repeated[subcircuit_idx],
-                options_repeated[subcircuit_idx],
-            ]
-            for subcircuit_idx, subcircuit in enumerate(subcircuits)
-        ]
-        subcircuit_instance_probs_list = pool.starmap(_run_subcircuit_batch, args)
+    return backend_names_repeated, options_repeated
 
-        for i, partition_batch in enumerate(subcircuit_instance_probs_list):
-            subcircuit_instance_probs[i] = partition_batch
 
-    return subcircuit_instance_probs
+async def run_subcircuit_instances_async(
+    subcircuits: Sequence[QuantumCircuit],
+    subcircuit_instances: Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
+    service: Optional[QiskitRuntimeService] = None,
+    backend_names: Optional[Sequence[str]] = None,
+    options: Optional[Sequence[Options]] = None,
+    max_in_flight: int = 4,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, int, NDArray]]:
+    """
+    Execute all provided subcircuits concurrently, yielding results as they complete.
+
+    The circuits of each subcircuit are submitted as jobs of at most batch_size
+    circuits, with at most max_in_flight jobs running at once.
+
+    Args:
+        - subcircuits (Sequence[QuantumCircuit]): the list of subcircuits to execute
+        - subcircuit_instances (Dict): dictionary containing information about each of the
+            subcircuit instances
+        - service (QiskitRuntimeService): the runtime service
+        - backend_names (Sequence[str]): the backend(s) used to execute the subcircuits
+        - options (Sequence[Options]): options for the runtime execution of subcircuits
+        - max_in_flight (int): the maximum number of jobs running at once
+        - batch_size (int, optional): the maximum number of circuits per job, by
+            default all the circuits of a subcircuit
+
+    Returns:
+        - (AsyncIterator): the subcircuit index, the subcircuit instance index and the
+            measured probability of each instance, in completion order
+    """
+    backend_names_repeated, options_repeated = _get_subcircuit_backends(
+        num_subcircuits=len(subcircuits),
+        service=service,
+        backend_names=backend_names,
+        options=options,
+    )
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def run_job(subcircuit_idx, template, batch_instances, parameter_values):
+        async with semaphore:
+            if service is None:
+                # The jobs in flight already run concurrently, so each one simulates
+                # in a single process rather than starting a process pool
+                run = functools.partial(
+                    simulate_subcircuits,
+                    [template] * len(parameter_values),
+                    parameter_values,
+                    num_processes=1,
+                )
+            else:
+                # Each job measures its own copy of the template
+                run = functools.partial(
+                    run_subcircuits,
+                    [template.copy()] * len(parameter_values),
+                    service=service,
+                    backend_name=backend_names_repeated[subcircuit_idx],
+                    options=options_repeated[subcircuit_idx],
+                    parameter_values=parameter_values,
+                )
+            subcircuit_inst_probs = await loop.run_in_executor(None, run)
+        return subcircuit_idx, batch_instances, subcircuit_inst_probs
+
+    jobs = []
+    for subcircuit_idx, subcircuit in enumerate(subcircuits):
+        template, parameter_values = _prepare_subcircuit_batch(
+            subcircuit_instance=subcircuit_instances[subcircuit_idx],
+            subcircuit=subcircuit,
+        )
+        batch_instances = _get_batch_instances(subcircuit_instances[subcircuit_idx])
+        job_size = batch_size or max(len(parameter_values), 1)
+        for start in range(0, len(parameter_values), job_size):
+            jobs.append(
+                asyncio.ensure_future(
+                    run_job(
+                        subcircuit_idx,
+                        template,
+                        batch_instances[start : start + job_size],
+                        parameter_values[start : start + job_size],
+                    )
+                )
+            )
+
+    try:
+        for job in asyncio.as_completed(jobs):
+            subcircuit_idx, batch_instances, subcircuit_inst_probs = await job
+            for init_meas, subcircuit_inst_prob in zip(
+                batch_instances, subcircuit_inst_probs
+            ):
+                for instance_idx, measured_prob in _measure_subcircuit_instance(
+                    subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                    init_meas=init_meas,
+                    subcircuit_inst_prob=subcircuit_inst_prob,
+                ).items():
+                    yield subcircuit_idx, instance_idx, measured_prob
+    finally:
+        for job in jobs:
+            job.cancel()
 
 
 def mutate_measurement_basis(meas: Tuple[str, ...]) -> List[Tuple[Any, ...]]:
@@ -124,91 +371,12 @@ def mutate_measurement_basis(meas: Tuple[str, ...]) -> List[Tuple[Any, ...]]:
         return mutated_meas_out
 
 
-def modify_subcircuit_instance(
-    subcircuit: QuantumCircuit, init: Tuple[str, ...], meas: Tuple[str, ...]
-) -> QuantumCircuit:
-    """
-    Modify the initialization and measurement bases for a given subcircuit.
-
-    Args:
-        - subcircuit (QuantumCircuit): the subcircuit to be modified
-        - init (tuple): the current initializations
-        - meas (tuple): the current measement bases
-
-    Returns:
-        - (QuantumCircuit): the updated circuit, modified so the initialziation
-            and measurement operators are all in the standard computational basis
-
-    Raises:
-        - Exeption: if one of the init's or meas's are not an acceptable string
-    """
-    subcircuit_dag = circuit_to_dag(subcircuit)
-    subcircuit_instance_dag = copy.deepcopy(subcircuit_dag)
-    for i, x in enumerate(init):
-        q = subcircuit.qubits[i]
-        if x == "zero":
-            continue
-        elif x == "one":
-            subcircuit_instance_dag.apply_operation_front(
-                op=XGate(), qargs=[q], cargs=[]
-            )
-        elif x == "plus":
-            subcircuit_instance_dag.apply_operation_front(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-        elif x == "minus":
-            subcircuit_instance_dag.apply_operation_front(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-            subcircuit_instance_dag.apply_operation_front(
-                op=XGate(), qargs=[q], cargs=[]
-            )
-        elif x == "plusI":
-            subcircuit_instance_dag.apply_operation_front(
-                op=SGate(), qargs=[q], cargs=[]
-            )
-            subcircuit_instance_dag.apply_operation_front(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-        elif x == "minusI":
-            subcircuit_instance_dag.apply_operation_front(
-                op=SGate(), qargs=[q], cargs=[]
-            )
-            subcircuit_instance_dag.apply_operation_front(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-            subcircuit_instance_dag.apply_operation_front(
-                op=XGate(), qargs=[q], cargs=[]
-            )
-        else:
-            raise Exception("Illegal initialization :", x)
-    for i, x in enumerate(meas):
-        q = subcircuit.qubits[i]
-        if x == "I" or x == "comp":
-            continue
-        elif x == "X":
-            subcircuit_instance_dag.apply_operation_back(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-        elif x == "Y":
-            subcircuit_instance_dag.apply_operation_back(
-                op=SdgGate(), qargs=[q], cargs=[]
-            )
-            subcircuit_instance_dag.apply_operation_back(
-                op=HGate(), qargs=[q], cargs=[]
-            )
-        else:
-            raise Exception("Illegal measurement basis:", x)
-    subcircuit_instance_circuit = dag_to_circuit(subcircuit_instance_dag)
-
-    return subcircuit_instance_circuit
-
-
 def run_subcircuits(
     subcircuits: Sequence[QuantumCircuit],
     service: Optional[QiskitRuntimeService] = None,
     backend_name: Optional[str] = None,
     options: Optional[Options] = None,
+    parameter_values: Optional[Sequence[Sequence[float]]] = None,
 ) -> List[NDArray]:
     """
     Execute the subcircuit(s).
@@ -216,8 +384,12 @@ def run_subcircuits(
     Args:
         - subcircuit (QuantumCircuit): the subcircuits to be executed
         - service (QiskitRuntimeService): the runtime service
-        - backend_name (str): the backend used to execute the subcircuits
+        - backend_name (str): the backend used to execute the subcircuits. When it is
+            set, the subcircuits are transpiled locally through a cache, and the
+            runtime transpilation is skipped
         - options (Options): options for the runtime execution of subcircuits
+        - parameter_values (list, optional): the parameters bound to each of the
+            subcircuits
 
     Returns:
         - (NDArray): the probability distributions
@@ -225,19 +397,33 @@ def run_subcircuits(
     for subcircuit in subcircuits:
         if subcircuit.num_clbits == 0:
             subcircuit.measure_all()
+    num_qubits = [subcircuit.num_qubits for subcircuit in subcircuits]
 
     if service is not None:
+        if backend_name is not None:
+            # Transpile each distinct circuit once, and let the runtime skip it
+            subcircuits = _transpile_subcircuits(
+                subcircuits=subcircuits,
+                backend=service.backend(backend_name),
+                options=options,
+            )
+            options = copy.deepcopy(options) if options is not None else Options()
+            options.transpilation.skip_transpilation = True
         session = Session(service=service, backend=backend_name)
         sampler = Sampler(session=session, options=options)
     else:
         sampler = TestSampler(options=options)
 
-    quasi_dists = sampler.run(circuits=subcircuits).result().quasi_dists
+    quasi_dists = (
+        sampler.run(circuits=subcircuits, parameter_values=parameter_values)
+        .result()
+        .quasi_dists
+    )
 
     all_probabilities_out = []
     for i, qd in enumerate(quasi_dists):
         probabilities = qd.nearest_probability_distribution()
-        probabilities_out = np.zeros(2 ** subcircuits[i].num_qubits, dtype=float)
+        probabilities_out = np.zeros(2 ** num_qubits[i], dtype=float)
 
         for state in probabilities:
             probabilities_out[state] = probabilities[state]
@@ -260,116 +446,1217 @@ def measure_prob(unmeasured_prob: NDArray, meas: Tuple[Any, ...]) -> NDArray:
     if meas.count("comp") == len(meas):
         return np.array(unmeasured_prob)
     else:
-        measured_prob = np.zeros(int(2 ** meas.count("comp")))
-        for full_state, p in enumerate(unmeasured_prob):
-            sigma, effective_state = measure_state(full_state=full_state, meas=meas)
-            # TODO: Add states merging here. Change effective_state to merged_bin
-            measured_prob[effective_state] += sigma * p
+        unmeasured_prob = np.asarray(unmeasured_prob)
+        effective_states, sigma = _get_measurement_indices(
+            meas=tuple(meas), num_qubits=len(unmeasured_prob).bit_length() - 1
+        )
+        measured_prob = np.bincount(
+            effective_states,
+            weights=sigma * unmeasured_prob,
+            minlength=2 ** meas.count("comp"),
+        )
 
         return measured_prob
 
 
-def measure_state(full_state: int, meas: Tuple[Any, ...]) -> Tuple[int, int]:
+# The arrays take 2^w entries each, so only the recently used bases are kept
+@lru_cache(maxsize=64)
+def _get_measurement_indices(
+    meas: Tuple[Any, ...], num_qubits: int
+) -> Tuple[NDArray, NDArray]:
     """
-    Compute the corresponding effective_state for the given full_state.
-
-    Measured in basis `meas`. Returns sigma (int), effective_state (int) where sigma = +-1
+    Find the effective state and the sign of every state of a measurement.
 
     Args:
-        - full_state (int): the current state (in decimal form)
         - meas (tuple): the measurement bases
+        - num_qubits (int): the number of qubits of the measured distribution
+
+    Returns:
+        - (NDArray): the effective state of each state, made of the qubits measured in
+            the computational basis from the least significant bit
+        - (NDArray): sigma of each state, the sign given by the parity of the qubits
+            measured in a non computational basis other than I
+    """
+    full_states = np.arange(2**num_qubits)
+    parity = np.zeros(len(full_states), dtype=full_states.dtype)
+    effective_states = np.zeros(len(full_states), dtype=full_states.dtype)
+    position = 0
+    for qubit, basis in enumerate(meas):
+        if basis == "comp":
+            effective_states |= ((full_states >> qubit) & 1) << position
+            position += 1
+        elif basis != "I":
+            parity ^= (full_states >> qubit) & 1
+    sigma = (1 - 2 * parity).astype(np.int8)
+    # The arrays are shared by the callers
+    effective_states.flags.writeable = False
+    sigma.flags.writeable = False
+    return effective_states, sigma
+
+
+def _run_scheduled_jobs(
+    subcircuits: Sequence[QuantumCircuit],
+    subcircuit_instances: Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
+    pending_subcircuits: Sequence[int],
+    service: QiskitRuntimeService,
+    backend_names: Optional[Sequence[str]] = None,
+    options: Optional[Sequence[Options]] = None,
+    cache_dir: Optional[str] = None,
+    max_cache_size: int = 2**30,
+    checkpoint_dir: Optional[str] = None,
+    shots: Optional[Dict[int, Dict[int, int]]] = None,
+    completed_circuits: Optional[Dict[int, Dict[int, NDArray]]] = None,
+    checkpoint_keys: Optional[Dict[int, str]] = None,
+) -> Dict[int, Dict[int, NDArray]]:
+    """
+    Execute the subcircuits as jobs pulled from a queue shared by all the backends.
+
+    The circuits of every subcircuit are queued, the most expensive first. Each worker
+    is bound to a backend, and whenever it is idle pulls a job of at most the
+    max_experiments of its backend, sized to its share of the estimated remaining
+    runtime (width x depth x shots). Backends finishing early thus pull more jobs.
+    Within a job, the circuits planned with different shots are run separately.
+
+    Args:
+        - subcircuits (Sequence[QuantumCircuit]): the list of subcircuits to execute
+        - subcircuit_instances (Dict): dictionary containing information about each of the
+            subcircuit instances
+        - pending_subcircuits (Sequence[int]): the indices of the subcircuits to execute
+        - service (QiskitRuntimeService): the runtime service
+        - backend_names (Sequence[str]): the backend(s) used to execute the subcircuits
+        - options (Sequence[Options]): options for the runtime execution of subcircuits
+        - cache_dir (str, optional): the directory caching the circuit probabilities
+        - max_cache_size (int): the maximum size in bytes of the cache
+        - checkpoint_dir (str, optional): the directory where the circuits of each
+            finished job are written, and the results of each subcircuit once all its
+            circuits complete
+        - shots (Dict, optional): the shots of the executed subcircuit instances
+        - completed_circuits (Dict, optional): the probabilities of the circuits of
+            each subcircuit already executed, by position in its batch, which are not
+            executed again
+        - checkpoint_keys (Dict, optional): the key written to the checkpoints of each
+            subcircuit, as returned by _get_checkpoint_key
 
     Returns:
-        - (tuple): sigma (defined by the parity of non computational basis 1 measurements) and
-            the effective state (defined by the measurements in the computational basis)
+        - (dict): the probability vectors from each of the subcircuit instances
     """
-    bin_full_state = bin(full_state)[2:].zfill(len(meas))
-    sigma = 1
-    bin_effective_state = ""
-    for meas_bit, meas_basis in zip(bin_full_state, meas[::-1]):
-        if meas_bit == "1" and meas_basis != "I" and meas_basis != "comp":
-            sigma *= -1
-        if meas_basis == "comp":
-            bin_effective_state += meas_bit
-    effective_state = int(bin_effective_state, 2) if bin_effective_state != "" else 0
+    if len(pending_subcircuits) == 0:
+        return {}
+    # One worker per subcircuit, as many as there are backends at least
+    worker_backends, worker_options = _get_subcircuit_backends(
+        num_subcircuits=max(len(pending_subcircuits), len(backend_names or [])),
+        service=service,
+        backend_names=backend_names,
+        options=options,
+    )
+    max_experiments = {
+        backend_name: _get_max_experiments(service.backend(backend_name))
+        for backend_name in set(worker_backends)
+    }
+    # Backends running fewer shots per circuit take larger shares of the work
+    speeds = [1 / _get_shots(worker_option) for worker_option in worker_options]
+    shares = [speed / sum(speeds) for speed in speeds]
+
+    batches = {
+        subcircuit_idx: _prepare_subcircuit_batch(
+            subcircuit_instance=subcircuit_instances[subcircuit_idx],
+            subcircuit=subcircuits[subcircuit_idx],
+        )
+        for subcircuit_idx in pending_subcircuits
+    }
+    planned_shots = {
+        subcircuit_idx: [
+            (shots or {})
+            .get(subcircuit_idx, {})
+            .get(subcircuit_instances[subcircuit_idx][init_meas])
+            for init_meas in _get_batch_instances(subcircuit_instances[subcircuit_idx])
+        ]
+        for subcircuit_idx in pending_subcircuits
+    }
+    costs = {
+        subcircuit_idx: [
+            template.num_qubits * template.depth() * (circuit_shots or 1)
+            for circuit_shots in planned_shots[subcircuit_idx]
+        ]
+        for subcircuit_idx, (template, _) in batches.items()
+    }
+    subcircuit_inst_probs: Dict[int, List[Optional[NDArray]]] = {
+        subcircuit_idx: [
+            (completed_circuits or {}).get(subcircuit_idx, {}).get(position)
+            for position in range(len(parameter_values))
+        ]
+        for subcircuit_idx, (_, parameter_values) in batches.items()
+    }
+    queue = deque(
+        (subcircuit_idx, position)
+        for subcircuit_idx in sorted(
+            pending_subcircuits, key=lambda subcircuit_idx: -max(costs[subcircuit_idx])
+        )
+        for position, prob in enumerate(subcircuit_inst_probs[subcircuit_idx])
+        if prob is None
+    )
+    remaining_cost = [
+        sum(costs[subcircuit_idx][position] for subcircuit_idx, position in queue)
+    ]
+    remaining_circuits = {
+        subcircuit_idx: sum(prob is None for prob in probs)
+        for subcircuit_idx, probs in subcircuit_inst_probs.items()
+    }
+    subcircuit_instance_probs: Dict[int, Dict[int, NDArray]] = {}
+    lock = threading.Lock()
+
+    def complete(subcircuit_idx: int) -> None:
+        subcircuit_instance_probs[subcircuit_idx] = _measure_subcircuit_batch(
+            subcircuit_instance=subcircuit_instances[subcircuit_idx],
+            subcircuit_inst_probs=cast(
+                List[NDArray], subcircuit_inst_probs[subcircuit_idx]
+            ),
+        )
+        if checkpoint_dir is not None:
+            _save_checkpoint(
+                checkpoint_dir=checkpoint_dir,
+                subcircuit_idx=subcircuit_idx,
+                subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                subcircuit_instance_probs=subcircuit_instance_probs[subcircuit_idx],
+                checkpoint_key=(checkpoint_keys or {}).get(subcircuit_idx, ""),
+            )
+
+    # The subcircuits whose every circuit was checkpointed before
+    for subcircuit_idx, num_circuits in remaining_circuits.items():
+        if num_circuits == 0:
+            complete(subcircuit_idx)
+
+    def run_job(
+        job: List[Tuple[int, int]], backend_name: str, options: Optional[Options]
+    ) -> List[NDArray]:
+        # Each job measures its own copy of the templates
+        templates = {
+            subcircuit_idx: batches[subcircuit_idx][0].copy()
+            for subcircuit_idx in {subcircuit_idx for subcircuit_idx, _ in job}
+        }
+        job_probs: List[Optional[NDArray]] = [None] * len(job)
+        for job_shots in dict.fromkeys(
+            planned_shots[subcircuit_idx][position] for subcircuit_idx, position in job
+        ):
+            run_options = options
+            if job_shots is not None:
+                run_options = (
+                    copy.deepcopy(options) if options is not None else Options()
+                )
+                run_options.execution.shots = job_shots
+            run_positions = [
+                job_position
+                for job_position, (subcircuit_idx, position) in enumerate(job)
+                if planned_shots[subcircuit_idx][position] == job_shots
+            ]
+            run_probs = _run_cached(
+                run=lambda subcircuits, parameter_values: run_subcircuits(
+                    subcircuits,
+                    service=service,
+                    backend_name=backend_name,
+                    options=run_options,
+                    parameter_values=parameter_values,
+                ),
+                subcircuits=[
+                    templates[job[job_position][0]] for job_position in run_positions
+                ],
+                parameter_values=[
+                    batches[job[job_position][0]][1][job[job_position][1]]
+                    for job_position in run_positions
+                ],
+                cache_dir=cache_dir,
+                max_cache_size=max_cache_size,
+                backend_name=backend_name,
+                options=run_options,
+            )
+            for job_position, prob in zip(run_positions, run_probs):
+                job_probs[job_position] = prob
+
+        return cast(List[NDArray], job_probs)
+
+    def work(backend_name: str, options: Optional[Options], share: float) -> None:
+        try:
+            while True:
+                with lock:
+                    job: List[Tuple[int, int]] = []
+                    job_cost = 0
+                    target_cost = remaining_cost[0] * share
+                    while queue and (len(job) == 0 or job_cost < target_cost):
+                        if len(job) == max_experiments[backend_name]:
+                            break
+                        job.append(queue.popleft())
+                        job_cost += costs[job[-1][0]][job[-1][1]]
+                    remaining_cost[0] -= job_cost
+                if len(job) == 0:
+                    return
 
-    return sigma, effective_state
+                job_probs = run_job(job, backend_name, options)
+                if checkpoint_dir is not None:
+                    # Written before the results are recorded, so that the checkpoint
+                    # of a completed subcircuit always replaces those of all its jobs
+                    for subcircuit_idx in dict.fromkeys(
+                        subcircuit_idx for subcircuit_idx, _ in job
+                    ):
+                        _save_circuits_checkpoint(
+                            checkpoint_dir=checkpoint_dir,
+                            subcircuit_idx=subcircuit_idx,
+                            subcircuit_instance=subcircuit_instances[subcircuit_idx],
+                            checkpoint_key=(checkpoint_keys or {}).get(
+                                subcircuit_idx, ""
+                            ),
+                            circuit_probs={
+                                position: prob
+                                for (job_subcircuit_idx, position), prob in zip(
+                                    job, job_probs
+                                )
+                                if job_subcircuit_idx == subcircuit_idx
+                            },
+                        )
+                completed = []
+                with lock:
+                    for (subcircuit_idx, position), prob in zip(job, job_probs):
+                        subcircuit_inst_probs[subcircuit_idx][position] = prob
+                        remaining_circuits[subcircuit_idx] -= 1
+                        if remaining_circuits[subcircuit_idx] == 0:
+                            completed.append(subcircuit_idx)
+                for subcircuit_idx in completed:
+                    complete(subcircuit_idx)
+        except BaseException:
+            # Stop the other workers from pulling more jobs
+            with lock:
+                queue.clear()
+            raise
 
+    with ThreadPool(len(worker_backends)) as pool:
+        pool.starmap(work, zip(worker_backends, worker_options, shares))
 
-def _run_subcircuit_batch(
+    return subcircuit_instance_probs
+
+
+def _get_max_experiments(backend: Any) -> Optional[int]:
+    """
+    Find the maximum number of circuits a backend accepts in a job.
+
+    Args:
+        - backend (Backend): the backend
+
+    Returns:
+        - (int): the maximum number of circuits per job, or None if unbounded
+    """
+    max_experiments = getattr(backend, "max_circuits", None)
+    if max_experiments is None and hasattr(backend, "configuration"):
+        max_experiments = getattr(backend.configuration(), "max_experiments", None)
+
+    return max_experiments
+
+
+def _get_shots(options: Optional[Options]) -> int:
+    """
+    Find the number of shots each circuit is executed with.
+
+    Args:
+        - options (Options): options for the runtime execution of subcircuits
+
+    Returns:
+        - (int): the number of shots
+    """
+    if options is None:
+        options = Options()
+
+    return options.execution.shots
+
+
+def _prepare_subcircuit_batch(
     subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
     subcircuit: QuantumCircuit,
-    service: Optional[QiskitRuntimeService] = None,
-    backend_name: Optional[str] = None,
-    options: Optional[Options] = None,
-):
+) -> Tuple[QuantumCircuit, List[List[float]]]:
     """
-    Execute a circuit using qiskit runtime.
+    Collect the circuits to execute for a subcircuit.
 
     Args:
         - subcircuit_instances (Dict): dictionary containing information about each of the
             subcircuit instances
         - subcircuit (QuantumCircuit): the subcircuit to execute
-        - service (QiskitRuntimeService): the runtime service
-        - backend_name (str): the backends used to execute the subcircuit
-        - options (Options): options for the runtime execution of subcircuit
 
     Returns:
-        - (dict): the measurement probabilities for the subcircuit batch, as calculated from the
-            runtime execution
+        - (QuantumCircuit): the parameterized subcircuit
+        - (list): the parameters of each circuit to execute, in the order given
+            by _get_batch_instances
     """
-    subcircuit_instance_probs = {}
-    circuits_to_run = []
+    template, prep_qubits, meas_qubits = _get_subcircuit_template(
+        subcircuit=subcircuit, subcircuit_instance=subcircuit_instance
+    )
+    parameter_values = [
+        _get_instance_parameters(
+            init=init,
+            meas=meas,
+            prep_qubits=prep_qubits,
+            meas_qubits=meas_qubits,
+        )
+        for init, meas in _get_batch_instances(subcircuit_instance)
+    ]
+
+    return template, parameter_values
+
+
+def _get_batch_instances(
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
+) -> List[Tuple[Tuple[str, ...], Tuple[Any, ...]]]:
+    """
+    Find the instances of a subcircuit that need to be executed.
+
+    Instances whose measurements only differ by I and Z share one circuit.
+
+    Args:
+        - subcircuit_instances (Dict): dictionary containing information about each of the
+            subcircuit instances
+
+    Returns:
+        - (list): the (init, meas) of each circuit to execute
+    """
+    batch_instances = []
+    placeholder_check = {}
 
     # For each circuit associated with a given subcircuit
     for init_meas in subcircuit_instance:
         subcircuit_instance_idx = subcircuit_instance[init_meas]
 
         # Collect all of the circuits we need to evaluate, ensuring we don't have duplicates
-        if subcircuit_instance_idx not in subcircuit_instance_probs:
-            modified_subcircuit_instance = modify_subcircuit_instance(
-                subcircuit=subcircuit,
-                init=init_meas[0],
-                meas=tuple(init_meas[1]),
-            )
-            circuits_to_run.append(modified_subcircuit_instance)
+        if subcircuit_instance_idx not in placeholder_check:
+            batch_instances.append((init_meas[0], tuple(init_meas[1])))
             mutated_meas = mutate_measurement_basis(meas=tuple(init_meas[1]))
             for meas in mutated_meas:
                 mutated_subcircuit_instance_idx = subcircuit_instance[
                     (init_meas[0], meas)
                 ]
-                # Set a placeholder in the probability dict to prevent duplicate circuits to the Sampler
-                subcircuit_instance_probs[mutated_subcircuit_instance_idx] = np.array(
-                    [0.0]
+                # Set a placeholder to prevent duplicate circuits to the Sampler
+                placeholder_check[mutated_subcircuit_instance_idx] = True
+
+    return batch_instances
+
+
+def _measure_subcircuit_batch(
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    subcircuit_inst_probs: Sequence[NDArray],
+) -> Dict[int, NDArray]:
+    """
+    Compute the measured probabilities of every instance of a subcircuit.
+
+    Args:
+        - subcircuit_instances (Dict): dictionary containing information about each of the
+            subcircuit instances
+        - subcircuit_inst_probs (list): the probabilities of the circuits collected by
+            _prepare_subcircuit_batch
+
+    Returns:
+        - (dict): the measurement probabilities for the subcircuit batch
+    """
+    subcircuit_instance_probs = {}
+    for init_meas, subcircuit_inst_prob in zip(
+        _get_batch_instances(subcircuit_instance), subcircuit_inst_probs
+    ):
+        subcircuit_instance_probs.update(
+            _measure_subcircuit_instance(
+                subcircuit_instance=subcircuit_instance,
+                init_meas=init_meas,
+                subcircuit_inst_prob=subcircuit_inst_prob,
+            )
+        )
+
+    return subcircuit_instance_probs
+
+
+def _measure_subcircuit_instance(
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    init_meas: Tuple[Tuple[str, ...], Tuple[Any, ...]],
+    subcircuit_inst_prob: NDArray,
+) -> Dict[int, NDArray]:
+    """
+    Compute the measured probabilities of the instances sharing an executed circuit.
+
+    Args:
+        - subcircuit_instances (Dict): dictionary containing information about each of the
+            subcircuit instances
+        - init_meas (tuple): the (init, meas) of the executed circuit
+        - subcircuit_inst_prob (NDArray): the probabilities of the executed circuit
+
+    Returns:
+        - (dict): the measurement probabilities of each instance derived from the
+            executed circuit
+    """
+    return {
+        subcircuit_instance[(init_meas[0], meas)]: measure_prob(
+            unmeasured_prob=subcircuit_inst_prob, meas=meas
+        )
+        for meas in mutate_measurement_basis(meas=tuple(init_meas[1]))
+    }
+
+
+def simulate_subcircuits(
+    subcircuits: Sequence[QuantumCircuit],
+    parameter_values: Optional[Sequence[Sequence[float]]] = None,
+    num_processes: Optional[int] = None,
+) -> List[NDArray]:
+    """
+    Compute the exact output probabilities of the subcircuit(s) by statevector simulation.
+
+    Instances of a subcircuit template sharing their initializations are simulated
+    once, and each of their measurement bases is applied to the final statevector.
+
+    Args:
+        - subcircuits (Sequence[QuantumCircuit]): the subcircuits to be simulated
+        - parameter_values (list, optional): the parameters bound to each of the
+            subcircuits
+        - num_processes (int, optional): the number of processes simulating the
+            subcircuits, by default the number of CPUs of the machine
+
+    Returns:
+        - (list): the probability distributions
+    """
+    if parameter_values is None:
+        parameter_values = [[] for _ in subcircuits]
+
+    # Group the circuits differing only by their measurement layer
+    groups: Dict[Tuple[Any, ...], List[int]] = {}
+    for circuit_idx, (circuit, parameters) in enumerate(
+        zip(subcircuits, parameter_values)
+    ):
+        num_meas_parameters = 3 * len(_get_template_meas_qubits(circuit))
+        prep_parameters = tuple(parameters[: len(parameters) - num_meas_parameters])
+        groups.setdefault((id(circuit), prep_parameters), []).append(circuit_idx)
+    tasks = [
+        (
+            subcircuits[circuit_indices[0]],
+            parameter_values[circuit_indices[0]],
+            [parameter_values[circuit_idx] for circuit_idx in circuit_indices],
+        )
+        for circuit_indices in groups.values()
+    ]
+
+    if num_processes is None:
+        num_processes = os.cpu_count() or 1
+    num_processes = min(num_processes, len(tasks))
+    if num_processes <= 1:
+        group_probs = _simulate_batch(tasks)
+    else:
+        # Several chunks per process balance subcircuits of different widths
+        num_chunks = min(len(tasks), 4 * num_processes)
+        chunks = [tasks[rank::num_chunks] for rank in range(num_chunks)]
+        # Why "spawn"?  See https://pythonspeed.com/articles/python-multiprocessing/
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(num_processes) as pool:
+            chunk_probs = pool.map(_simulate_batch, chunks)
+        group_probs = [[] for _ in tasks]
+        for rank, probs in enumerate(chunk_probs):
+            group_probs[rank::num_chunks] = probs
+
+    all_probabilities_out: List[NDArray] = [np.empty(0)] * len(subcircuits)
+    for circuit_indices, probs in zip(groups.values(), group_probs):
+        for circuit_idx, prob in zip(circuit_indices, probs):
+            all_probabilities_out[circuit_idx] = prob
+    return all_probabilities_out
+
+
+def _simulate_batch(
+    tasks: Sequence[Tuple[QuantumCircuit, Sequence[float], Sequence[Sequence[float]]]]
+) -> List[List[NDArray]]:
+    """
+    Simulate a batch of subcircuits.
+
+    Args:
+        - tasks (list): the subcircuits, with the parameters of one of their
+            instances and the parameters of every instance sharing their initializations
+
+    Returns:
+        - (list): the probability distributions of the instances of each task
+    """
+    all_probabilities_out = []
+    for circuit, parameters, instance_parameters in tasks:
+        meas_qubits = _get_template_meas_qubits(circuit)
+        num_prep_parameters = len(parameters) - 3 * len(meas_qubits)
+        if len(parameters) > 0:
+            # Simulate up to the measurement layer, which is left as identities
+            circuit = circuit.assign_parameters(
+                dict(
+                    zip(
+                        circuit.parameters,
+                        list(parameters[:num_prep_parameters])
+                        + [0.0] * (3 * len(meas_qubits)),
+                    )
                 )
+            )
+        statevector = Statevector(circuit.remove_final_measurements(inplace=False))
 
-    # Run all of our circuits in one batch
-    subcircuit_inst_probs = run_subcircuits(
-        circuits_to_run,
-        service=service,
-        backend_name=backend_name,
-        options=options,
+        probabilities_out = []
+        for instance in instance_parameters:
+            measured_statevector = statevector
+            for position, qubit in enumerate(meas_qubits):
+                angles = instance[num_prep_parameters + 3 * position :][:3]
+                if any(angle != 0.0 for angle in angles):
+                    measured_statevector = measured_statevector.evolve(
+                        UGate(*angles), qargs=[qubit]
+                    )
+            probabilities_out.append(measured_statevector.probabilities())
+        all_probabilities_out.append(probabilities_out)
+    return all_probabilities_out
+
+
+def _get_template_meas_qubits(circuit: QuantumCircuit) -> List[int]:
+    """
+    Get the qubits with a parameterized measurement in a subcircuit template.
+
+    Args:
+        - circuit (QuantumCircuit): the circuit, as built by _get_subcircuit_template
+
+    Returns:
+        - (list): the qubits with a parameterized measurement, or an empty list if the
+            circuit is not a subcircuit template
+    """
+    return list((circuit.metadata or {}).get("meas_qubits", []))
+
+
+def _save_checkpoint(
+    checkpoint_dir: str,
+    subcircuit_idx: int,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    subcircuit_instance_probs: Dict[int, NDArray],
+    checkpoint_key: str,
+) -> None:
+    """
+    Write the probabilities of the instances of a subcircuit to its checkpoint.
+
+    The checkpoints of the jobs of the subcircuit are removed, as it replaces them.
+
+    Args:
+        - checkpoint_dir (str): the checkpoint directory
+        - subcircuit_idx (int): the subcircuit index
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+        - subcircuit_instance_probs (Dict): the probabilities of each instance
+        - checkpoint_key (str): the key of the subcircuit, backends and options
+    """
+    checkpoint_path = os.path.join(checkpoint_dir, f"subcircuit_{subcircuit_idx}.npz")
+    arrays = {
+        f"instance_{instance_idx}": prob
+        for instance_idx, prob in subcircuit_instance_probs.items()
+    }
+    _write_checkpoint(checkpoint_path, subcircuit_instance, checkpoint_key, arrays)
+
+    prefix = f"subcircuit_{subcircuit_idx}_circuits_"
+    for name in os.listdir(checkpoint_dir):
+        if name.startswith(prefix) and name.endswith(".npz"):
+            os.remove(os.path.join(checkpoint_dir, name))
+
+
+def _save_circuits_checkpoint(
+    checkpoint_dir: str,
+    subcircuit_idx: int,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    checkpoint_key: str,
+    circuit_probs: Dict[int, NDArray],
+) -> None:
+    """
+    Write the probabilities of the circuits of a subcircuit executed by a job.
+
+    Args:
+        - checkpoint_dir (str): the checkpoint directory
+        - subcircuit_idx (int): the subcircuit index
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+        - checkpoint_key (str): the key of the subcircuit, backends and options
+        - circuit_probs (Dict): the probabilities of each circuit of the job, by
+            position in the batch of the subcircuit
+    """
+    # Each circuit is executed by a single job, so its first position names the file
+    checkpoint_path = os.path.join(
+        checkpoint_dir,
+        f"subcircuit_{subcircuit_idx}_circuits_{min(circuit_probs)}.npz",
     )
+    arrays = {f"circuit_{position}": prob for position, prob in circuit_probs.items()}
+    _write_checkpoint(checkpoint_path, subcircuit_instance, checkpoint_key, arrays)
 
-    # Calculate the measured probabilities
-    unique_subcircuit_check = {}
-    i = 0
-    for init_meas in subcircuit_instance:
-        subcircuit_instance_idx = subcircuit_instance[init_meas]
-        if subcircuit_instance_idx not in unique_subcircuit_check:
-            subcircuit_inst_prob = subcircuit_inst_probs[i]
-            i = i + 1
-            mutated_meas = mutate_measurement_basis(meas=tuple(init_meas[1]))
-            for meas in mutated_meas:
-                measured_prob = measure_prob(
-                    unmeasured_prob=subcircuit_inst_prob, meas=meas
+
+def _write_checkpoint(
+    checkpoint_path: str,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    checkpoint_key: str,
+    arrays: Dict[str, NDArray],
+) -> None:
+    """
+    Write arrays to a checkpoint, with the instance index map and key of their
+    subcircuit.
+
+    Args:
+        - checkpoint_path (str): the path of the checkpoint
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+        - checkpoint_key (str): the key of the subcircuit, backends and options
+        - arrays (Dict): the arrays to write, by name
+    """
+    arrays = dict(arrays)
+    arrays["index_map"] = np.array(_get_instance_map(subcircuit_instance))
+    arrays["checkpoint_key"] = np.array(checkpoint_key)
+    # Write to a temporary file first, so a crash never leaves a partial checkpoint
+    temporary_path = f"{checkpoint_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def _load_checkpoint(
+    checkpoint_dir: str,
+    subcircuit_idx: int,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    checkpoint_key: str,
+) -> Tuple[Optional[Dict[int, NDArray]], Dict[int, NDArray]]:
+    """
+    Read the probabilities of the instances of a subcircuit from its checkpoints.
+
+    If the subcircuit did not complete, the checkpoints of its finished jobs are
+    merged instead.
+
+    Args:
+        - checkpoint_dir (str): the checkpoint directory
+        - subcircuit_idx (int): the subcircuit index
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+        - checkpoint_key (str): the key of the subcircuit, backends and options
+
+    Returns:
+        - (Dict): the probabilities of each instance, or None if the subcircuit
+            did not complete
+        - (Dict): the probabilities of the circuits executed so far, by position in
+            the batch of the subcircuit, if it did not complete
+
+    Raises:
+        - ValueError: if a checkpoint was written for a different instance index map
+            or key
+    """
+    checkpoint_path = os.path.join(checkpoint_dir, f"subcircuit_{subcircuit_idx}.npz")
+    if os.path.exists(checkpoint_path):
+        instance_probs = _read_checkpoint(
+            checkpoint_path, subcircuit_instance, checkpoint_key, "instance_"
+        )
+        return instance_probs, {}
+
+    circuit_probs: Dict[int, NDArray] = {}
+    prefix = f"subcircuit_{subcircuit_idx}_circuits_"
+    for name in sorted(os.listdir(checkpoint_dir)):
+        if name.startswith(prefix) and name.endswith(".npz"):
+            circuit_probs.update(
+                _read_checkpoint(
+                    os.path.join(checkpoint_dir, name),
+                    subcircuit_instance,
+                    checkpoint_key,
+                    "circuit_",
                 )
-                mutated_subcircuit_instance_idx = subcircuit_instance[
-                    (init_meas[0], meas)
-                ]
-                subcircuit_instance_probs[
-                    mutated_subcircuit_instance_idx
-                ] = measured_prob
-                unique_subcircuit_check[mutated_subcircuit_instance_idx] = True
+            )
+    return None, circuit_probs
 
-    return subcircuit_instance_probs
+
+def _read_checkpoint(
+    checkpoint_path: str,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+    checkpoint_key: str,
+    prefix: str,
+) -> Dict[int, NDArray]:
+    """
+    Read the arrays of a checkpoint, checking the instance index map and key of its
+    subcircuit.
+
+    Args:
+        - checkpoint_path (str): the path of the checkpoint
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+        - checkpoint_key (str): the key of the subcircuit, backends and options
+        - prefix (str): the prefix of the array names, followed by their index
+
+    Returns:
+        - (Dict): the arrays, by index
+
+    Raises:
+        - ValueError: if the checkpoint was written for a different instance index map
+            or key
+    """
+    with np.load(checkpoint_path) as checkpoint:
+        if str(checkpoint["index_map"]) != _get_instance_map(subcircuit_instance):
+            raise ValueError(
+                f"The checkpoint {checkpoint_path} was written for different "
+                "subcircuit instances."
+            )
+        if (
+            "checkpoint_key" not in checkpoint.files
+            or str(checkpoint["checkpoint_key"]) != checkpoint_key
+        ):
+            raise ValueError(
+                f"The checkpoint {checkpoint_path} was written for a different "
+                "subcircuit, backends or options."
+            )
+        return {
+            int(name[len(prefix) :]): checkpoint[name]
+            for name in checkpoint.files
+            if name.startswith(prefix)
+        }
+
+
+def _get_checkpoint_key(
+    subcircuit: QuantumCircuit,
+    backend_names: Optional[Sequence[str]] = None,
+    options: Optional[Sequence[Optional[Options]]] = None,
+) -> str:
+    """
+    Identify what the results of a subcircuit are computed from.
+
+    Args:
+        - subcircuit (QuantumCircuit): the subcircuit
+        - backend_names (Sequence[str], optional): the backends executing the
+            subcircuits, or None for an exact simulation
+        - options (Sequence[Options], optional): options for the runtime execution of
+            subcircuits
+
+    Returns:
+        - (str): a hash of the subcircuit, the backend names and the options affecting
+            the results
+    """
+    key = repr(
+        (
+            _get_circuit_key(subcircuit),
+            list(backend_names or []),
+            [_get_options_key(option) for option in options or []],
+        )
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _get_instance_map(
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
+) -> str:
+    """
+    Serialize the instance index map of a subcircuit.
+
+    Args:
+        - subcircuit_instance (Dict): the instance index map of the subcircuit
+
+    Returns:
+        - (str): the sorted (init, meas, index) entries of the map, as JSON
+    """
+    return json.dumps(
+        sorted(
+            [list(init), list(meas), instance_idx]
+            for (init, meas), instance_idx in subcircuit_instance.items()
+        )
+    )
+
+
+def _run_cached(
+    run: Callable[[List[QuantumCircuit], List[Sequence[float]]], List[NDArray]],
+    subcircuits: Sequence[QuantumCircuit],
+    parameter_values: Sequence[Sequence[float]],
+    cache_dir: Optional[str] = None,
+    max_cache_size: int = 2**30,
+    backend_name: Optional[str] = None,
+    options: Optional[Options] = None,
+) -> List[NDArray]:
+    """
+    Execute the subcircuits that are not found in the on-disk cache.
+
+    The probabilities are stored as .npy files named after a hash of the circuit,
+    its parameters, the backend name and the options affecting the results, and
+    loaded memory-mapped.
+
+    Args:
+        - run (callable): executes a list of subcircuits with their parameters
+        - subcircuits (Sequence[QuantumCircuit]): the subcircuits to execute
+        - parameter_values (list): the parameters bound to each of the subcircuits
+        - cache_dir (str, optional): the directory caching the circuit probabilities,
+            or None to execute every subcircuit
+        - max_cache_size (int): the maximum size in bytes of the cache
+        - backend_name (str): the backend used to execute the subcircuits
+        - options (Options): options for the runtime execution of subcircuits
+
+    Returns:
+        - (list): the probability distributions
+    """
+    if len(subcircuits) == 0:
+        return []
+    if cache_dir is None:
+        return run(list(subcircuits), list(parameter_values))
+    os.makedirs(cache_dir, exist_ok=True)
+
+    cache_paths = []
+    all_probabilities_out: List[Optional[NDArray]] = []
+    for subcircuit, parameters in zip(subcircuits, parameter_values):
+        key = repr(
+            (
+                _get_circuit_key(subcircuit),
+                tuple(float(x) for x in parameters),
+                backend_name,
+                _get_options_key(options),
+            )
+        )
+        cache_path = os.path.join(
+            cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".npy"
+        )
+        cache_paths.append(cache_path)
+        try:
+            all_probabilities_out.append(np.load(cache_path, mmap_mode="r"))
+            # Mark the entry as recently used
+            os.utime(cache_path)
+        except (OSError, ValueError):
+            all_probabilities_out.append(None)
+
+    misses = [idx for idx, prob in enumerate(all_probabilities_out) if prob is None]
+    if len(misses) > 0:
+        miss_probs = run(
+            [subcircuits[idx] for idx in misses],
+            [parameter_values[idx] for idx in misses],
+        )
+        for idx, prob in zip(misses, miss_probs):
+            all_probabilities_out[idx] = prob
+            # Write to a temporary file first, so readers never see partial files
+            temporary_path = f"{cache_paths[idx]}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as f:
+                np.save(f, prob)
+            os.replace(temporary_path, cache_paths[idx])
+    _evict_cache(cache_dir=cache_dir, max_cache_size=max_cache_size)
+
+    return cast(List[NDArray], all_probabilities_out)
+
+
+# The options affecting the results of a subcircuit, as (group, field) pairs
+_RESULT_OPTIONS = (
+    (None, "optimization_level"),
+    (None, "resilience_level"),
+    ("transpilation", "skip_transpilation"),
+    ("transpilation", "initial_layout"),
+    ("transpilation", "layout_method"),
+    ("transpilation", "routing_method"),
+    ("transpilation", "approximation_degree"),
+    ("resilience", "noise_amplifier"),
+    ("resilience", "noise_factors"),
+    ("resilience", "extrapolator"),
+    ("execution", "shots"),
+    ("execution", "init_qubits"),
+    ("simulator", "noise_model"),
+    ("simulator", "seed_simulator"),
+    ("simulator", "coupling_map"),
+    ("simulator", "basis_gates"),
+)
+
+
+def _get_options_key(options: Optional[Options]) -> Optional[Tuple[Any, ...]]:
+    """
+    Describe the options affecting the results of the subcircuits as a stable key.
+
+    The other fields, e.g. the log level, callback or job tags, are left out, so
+    they do not invalidate the cache.
+
+    Args:
+        - options (Options): options for the runtime execution of subcircuits
+
+    Returns:
+        - (tuple): the name and value of each option affecting the results, or None
+            without options
+    """
+    if options is None:
+        return None
+    key = []
+    for group, field in _RESULT_OPTIONS:
+        value = getattr(options, group, None) if group is not None else options
+        value = getattr(value, field, None)
+        if hasattr(value, "to_dict"):
+            # e.g. a noise model, whose repr is not unique
+            value = value.to_dict()
+        key.append((group, field, repr(value)))
+    return tuple(key)
+
+
+def _evict_cache(cache_dir: str, max_cache_size: int) -> None:
+    """
+    Delete the least recently used probabilities until the cache fits its size.
+
+    Args:
+        - cache_dir (str): the directory caching the circuit probabilities
+        - max_cache_size (int): the maximum size in bytes of the cache
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy"):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    cache_size = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if cache_size <= max_cache_size:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        cache_size -= size
+
+
+# The standard gates, which are described by their name and parameters alone
+_STANDARD_GATES = get_standard_gate_name_mapping()
+
+# Transpiled circuits, keyed by circuit structure, backend and transpiler options
+_transpile_cache: "OrderedDict[Tuple[Any, ...], QuantumCircuit]" = OrderedDict()
+_TRANSPILE_CACHE_SIZE = 128
+# The scheduler transpiles from several threads
+_transpile_cache_lock = threading.Lock()
+
+
+def _transpile_subcircuits(
+    subcircuits: Sequence[QuantumCircuit],
+    backend: Any,
+    options: Optional[Options] = None,
+) -> List[QuantumCircuit]:
+    """
+    Transpile the subcircuits for a backend, reusing earlier transpilations.
+
+    Circuits with the same structure are only transpiled once per backend
+    configuration and transpiler options, so the compile time does not depend on
+    the number of instances sharing a parameterized subcircuit.
+
+    Args:
+        - subcircuits (Sequence[QuantumCircuit]): the subcircuits to transpile
+        - backend (Backend): the target backend
+        - options (Options): options for the runtime execution of subcircuits, whose
+            defaults are used if None
+
+    Returns:
+        - (list): the transpiled subcircuits
+    """
+    if options is None:
+        # Compile as the runtime would have, had its transpilation not been skipped
+        options = Options()
+    transpile_options: Dict[str, Any] = {
+        "optimization_level": options.optimization_level,
+        "initial_layout": options.transpilation.initial_layout,
+        "layout_method": options.transpilation.layout_method,
+        "routing_method": options.transpilation.routing_method,
+        "approximation_degree": options.transpilation.approximation_degree,
+    }
+    options_key = tuple(
+        (name, repr(value)) for name, value in sorted(transpile_options.items())
+    )
+    backend_key = _get_backend_key(backend)
+
+    transpiled_subcircuits = []
+    for subcircuit in subcircuits:
+        key = (_get_circuit_key(subcircuit), backend_key, options_key)
+        with _transpile_cache_lock:
+            transpiled_subcircuit = _transpile_cache.get(key)
+            if transpiled_subcircuit is not None:
+                _transpile_cache.move_to_end(key)
+        if transpiled_subcircuit is None:
+            # Transpile outside of the lock, so that the threads do not wait on each other
+            transpiled_subcircuit = transpile(
+                subcircuit, backend=backend, **transpile_options
+            )
+            with _transpile_cache_lock:
+                _transpile_cache[key] = transpiled_subcircuit
+                if len(_transpile_cache) > _TRANSPILE_CACHE_SIZE:
+                    _transpile_cache.popitem(last=False)
+        transpiled_subcircuits.append(transpiled_subcircuit)
+    return transpiled_subcircuits
+
+
+def _get_circuit_key(circuit: QuantumCircuit) -> Tuple[Any, ...]:
+    """
+    Describe the structure of a circuit as a hashable key.
+
+    Gates outside of the standard library are described by their definition, as
+    custom gates sharing a name may have different bodies.
+
+    Args:
+        - circuit (QuantumCircuit): the circuit
+
+    Returns:
+        - (tuple): the size of the circuit and its instructions, with their bits,
+            parameters, conditions and definitions
+    """
+    qubit_indices = {qubit: idx for idx, qubit in enumerate(circuit.qubits)}
+    clbit_indices = {clbit: idx for idx, clbit in enumerate(circuit.clbits)}
+    instruction_keys = []
+    for instruction in circuit.data:
+        operation = instruction.operation
+        condition = getattr(operation, "condition", None)
+        if condition is not None:
+            target, value = condition
+            if isinstance(target, ClassicalRegister):
+                target = tuple(clbit_indices[clbit] for clbit in target)
+            else:
+                target = clbit_indices[target]
+            condition = (target, repr(value))
+        definition = None
+        standard_gate = _STANDARD_GATES.get(operation.name)
+        if type(operation) is not type(standard_gate):
+            definition = operation.definition
+            if definition is not None:
+                definition = _get_circuit_key(definition)
+        instruction_keys.append(
+            (
+                operation.name,
+                tuple(qubit_indices[qubit] for qubit in instruction.qubits),
+                tuple(clbit_indices[clbit] for clbit in instruction.clbits),
+                tuple(_get_param_key(param) for param in operation.params),
+                condition,
+                definition,
+            )
+        )
+    return (circuit.num_qubits, circuit.num_clbits, tuple(instruction_keys))
+
+
+def _get_param_key(param: Any) -> Any:
+    """
+    Describe the exact value of an instruction parameter as a hashable key.
+
+    Args:
+        - param (Any): the parameter, e.g. a number, a parameter expression or a
+            matrix
+
+    Returns:
+        - (Any): the key of the parameter
+    """
+    if isinstance(param, np.ndarray):
+        return (param.dtype.str, param.shape, param.tobytes())
+    if isinstance(param, QuantumCircuit):
+        return _get_circuit_key(param)
+    if isinstance(param, ParameterExpression):
+        return str(param)
+    # The repr of a number keeps its exact value
+    return repr(param)
+
+
+def _get_backend_key(backend: Any) -> Tuple[Any, ...]:
+    """
+    Describe the configuration of a backend relevant to transpilation.
+
+    Args:
+        - backend (Backend): the backend
+
+    Returns:
+        - (tuple): the name, basis gates and coupling map of the backend
+    """
+    if callable(getattr(backend, "configuration", None)):
+        configuration = backend.configuration()
+        name = backend.name() if callable(backend.name) else backend.name
+        basis_gates = configuration.basis_gates
+        coupling_map = configuration.coupling_map
+    else:
+        name = backend.name
+        basis_gates = backend.operation_names
+        coupling_map = (
+            backend.coupling_map.get_edges() if backend.coupling_map else None
+        )
+    return (
+        name,
+        tuple(sorted(basis_gates)),
+        tuple(sorted(tuple(edge) for edge in coupling_map or [])),
+    )
+
+
+# U gate angles preparing each initial state from |0>, up to a global phase
+_INIT_ANGLES = {
+    "zero": (0.0, 0.0, 0.0),
+    "one": (np.pi, 0.0, 0.0),
+    "plus": (np.pi / 2, 0.0, 0.0),
+    "minus": (np.pi / 2, np.pi, 0.0),
+    "plusI": (np.pi / 2, np.pi / 2, 0.0),
+    "minusI": (np.pi / 2, -np.pi / 2, 0.0),
+}
+
+# U gate angles rotating each measurement basis onto the computational basis
+_MEAS_ANGLES = {
+    "I": (0.0, 0.0, 0.0),
+    "Z": (0.0, 0.0, 0.0),
+    "comp": (0.0, 0.0, 0.0),
+    "X": (np.pi / 2, 0.0, np.pi),
+    "Y": (np.pi / 2, 0.0, np.pi / 2),
+}
+
+
+def _get_subcircuit_template(
+    subcircuit: QuantumCircuit,
+    subcircuit_instance: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+) -> Tuple[QuantumCircuit, List[int], List[int]]:
+    """
+    Build a circuit with parameterized initialization and measurement layers.
+
+    A U gate is added before the subcircuit on each qubit initialized outside of
+    the zero state by any instance, and after the subcircuit on each qubit measured
+    in the X or Y basis by any instance, so every instance is a parameter binding
+    of the same circuit.
+
+    Args:
+        - subcircuit (QuantumCircuit): the subcircuit
+        - subcircuit_instance (Dict): the instances of the subcircuit
+
+    Returns:
+        - (QuantumCircuit): the parameterized subcircuit
+        - (list): the qubits with a parameterized initialization
+        - (list): the qubits with a parameterized measurement
+    """
+    prep_qubits = sorted(
+        {
+            qubit
+            for init, _ in subcircuit_instance
+            for qubit, x in enumerate(init)
+            if x != "zero"
+        }
+    )
+    meas_qubits = sorted(
+        {
+            qubit
+            for _, meas in subcircuit_instance
+            for qubit, x in enumerate(meas)
+            if x in ("X", "Y")
+        }
+    )
+    angles = ParameterVector("theta", 3 * (len(prep_qubits) + len(meas_qubits)))
+    template = QuantumCircuit(subcircuit.num_qubits, subcircuit.num_clbits)
+    for position, qubit in enumerate(prep_qubits):
+        template.u(*angles[3 * position : 3 * position + 3], qubit)
+    template.compose(
+        subcircuit,
+        qubits=range(subcircuit.num_qubits),
+        clbits=range(subcircuit.num_clbits),
+        inplace=True,
+    )
+    for position, qubit in enumerate(meas_qubits, start=len(prep_qubits)):
+        template.u(*angles[3 * position : 3 * position + 3], qubit)
+    template.metadata = {"meas_qubits": meas_qubits}
+    return template, prep_qubits, meas_qubits
+
+
+def _get_instance_parameters(
+    init: Tuple[str, ...],
+    meas: Tuple[str, ...],
+    prep_qubits: Sequence[int],
+    meas_qubits: Sequence[int],
+) -> List[float]:
+    """
+    Get the parameters of a subcircuit template for the given instance.
+
+    Args:
+        - init (tuple): the initializations
+        - meas (tuple): the measurement bases
+        - prep_qubits (list): the qubits with a parameterized initialization
+        - meas_qubits (list): the qubits with a parameterized measurement
+
+    Returns:
+        - (list): the parameter values, in the order of the template parameters
+
+    Raises:
+        - Exeption: if one of the init's or meas's are not an acceptable string
+    """
+    for x in init:
+        if x not in _INIT_ANGLES:
+            raise Exception("Illegal initialization :", x)
+    for x in meas:
+        if x not in _MEAS_ANGLES:
+            raise Exception("Illegal measurement basis:", x)
+    parameters: List[float] = []
+    for qubit in prep_qubits:
+        parameters.extend(_INIT_ANGLES[init[qubit]])
+    for qubit in meas_qubits:
+        parameters.extend(_MEAS_ANGLES[meas[qubit]])
+    return parameters
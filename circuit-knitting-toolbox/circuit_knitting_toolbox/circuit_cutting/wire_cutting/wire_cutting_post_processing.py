@@ -11,6 +11,7 @@
 
 """File containing all cutting post processing functionality."""
 import itertools
+import heapq
 import multiprocessing as mp
 from typing import Dict, Sequence, Union, Tuple, List, Optional, Any
 
@@ -247,6 +248,10 @@ def generate_summation_terms(
 
     subcircuit_instances[subcircuit_idx][init,meas] = subcircuit_instance_idx.
 
+    The entries of a subcircuit only depend on the cuts touching it, so they are
+    enumerated over the 4^(local cuts) labels of each subcircuit, and the
+    summation terms are derived from the local labels by index arithmetic.
+
     Args:
         - subcircuits (list): the list of subcircuits
         - complete_path_map (dict): the paths of all the qubits through the circuit DAGs
@@ -260,80 +265,99 @@ def generate_summation_terms(
         - (dict): dictionary containing the subcircuits entry information
         - (dict): dictionary containing subcircuit instances
     """
-    summation_terms = []
+    O_rho_pairs = get_cut_qubit_pairs(complete_path_map=complete_path_map)
     subcircuit_entries: Dict[
         int, Dict[Tuple[str, str], Tuple[int, Sequence[Tuple[int, int]]]]
-    ] = {subcircuit_idx: {} for subcircuit_idx in range(len(subcircuits))}
+    ] = {}
     subcircuit_instances: Dict[
         int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
-    ] = {subcircuit_idx: {} for subcircuit_idx in range(len(subcircuits))}
-    O_rho_pairs = get_cut_qubit_pairs(complete_path_map=complete_path_map)
-    for summation_term_idx in range(4**num_cuts):
-        label = get_label(label_idx=summation_term_idx, num_cuts=num_cuts)
-        # print('%d/%d summation term:'%(summation_term_idx+1,4**num_cuts),label)
-        summation_term = {}
-        subcircuit_labels = attribute_label(
-            label=label, O_rho_pairs=O_rho_pairs, num_subcircuits=len(subcircuits)
+    ] = {}
+    subcircuit_cuts: Dict[int, List[int]] = {}
+    for subcircuit_idx, subcircuit in enumerate(subcircuits):
+        (
+            subcircuit_cuts[subcircuit_idx],
+            entry_keys,
+            kronecker_terms,
+            subcircuit_instances[subcircuit_idx],
+        ) = _generate_subcircuit_entries(
+            subcircuit_idx=subcircuit_idx,
+            subcircuit=subcircuit,
+            O_rho_pairs=O_rho_pairs,
         )
-        for subcircuit_idx in range(len(subcircuits)):
-            # print('subcircuit %d label :'%subcircuit_idx,subcircuit_labels[subcircuit_idx])
-            subcircuit_entry_key = (
-                subcircuit_labels[subcircuit_idx]["init"],
-                subcircuit_labels[subcircuit_idx]["meas"],
+        subcircuit_entries[subcircuit_idx] = {
+            entry_key: (subcircuit_entry_idx, kronecker_term)
+            for subcircuit_entry_idx, (entry_key, kronecker_term) in enumerate(
+                zip(entry_keys, kronecker_terms)
             )
-            if subcircuit_entry_key in subcircuit_entries[subcircuit_idx]:
-                subcircuit_entry_idx, kronecker_term = subcircuit_entries[
-                    subcircuit_idx
-                ][subcircuit_entry_key]
-                # print('Already in, subcircuit_entry {:d} : {}'.format(subcircuit_entry_idx,kronecker_term))
-            else:
-                subcircuit_full_label = fill_label(
-                    subcircuit_idx=subcircuit_idx,
-                    subcircuit=subcircuits[subcircuit_idx],
-                    subcircuit_label=subcircuit_labels[subcircuit_idx],
-                    O_rho_pairs=O_rho_pairs,
-                )
-                # print('Full label :',subcircuit_full_label)
-                if len(subcircuit_full_label) != 2:
-                    raise ValueError(
-                        f"subcircuit_full_label variable should be a length-2 tuple: {subcircuit_full_label}"
-                    )
-                subcircuit_init_meas = get_init_meas(
-                    init_label=subcircuit_full_label[0],
-                    meas_label=subcircuit_full_label[-1],
-                )
-                kronecker_term = []
-                for init_meas in subcircuit_init_meas:
-                    if len(init_meas) != 2:
-                        raise ValueError(
-                            f"init_meas variable should be a length-2 tuple: {init_meas}"
-                        )
-                    init: Tuple[str, ...] = init_meas[0]
-                    meas: Tuple[str, ...] = init_meas[-1]
-                    coefficient, init = convert_to_physical_init(
-                        init=list(init_meas[0])
-                    )
-                    if (init, meas) in subcircuit_instances[subcircuit_idx]:
-                        subcircuit_instance_idx = subcircuit_instances[subcircuit_idx][
-                            (init, meas)
-                        ]
-                    else:
-                        subcircuit_instance_idx = len(
-                            subcircuit_instances[subcircuit_idx]
-                        )
-                        subcircuit_instances[subcircuit_idx][
-                            (init, meas)
-                        ] = subcircuit_instance_idx
-                    kronecker_term.append((coefficient, subcircuit_instance_idx))
-                subcircuit_entry_idx = len(subcircuit_entries[subcircuit_idx])
-                subcircuit_entries[subcircuit_idx][subcircuit_entry_key] = (
-                    subcircuit_entry_idx,
-                    kronecker_term,
-                )
-                # print('New subcircuit_entry, {:d} : {}'.format(subcircuit_entry_idx,kronecker_term))
-            summation_term[subcircuit_idx] = subcircuit_entry_idx
-        summation_terms.append(summation_term)
-        # print('summation_term =',summation_term,'\n')
+        }
+    summation_terms = [
+        dict(enumerate(summation_term))
+        for summation_term in _get_summation_table(
+            num_cuts=num_cuts, subcircuit_cuts=subcircuit_cuts
+        ).tolist()
+    ]
+    return summation_terms, subcircuit_entries, subcircuit_instances
+
+
+def generate_summation_arrays(
+    subcircuits: Sequence[QuantumCircuit],
+    complete_path_map: Dict[Qubit, Sequence[Dict[str, Union[int, Qubit]]]],
+    num_cuts: int,
+) -> Tuple[
+    NDArray,
+    Dict[int, Dict[str, NDArray]],
+    Dict[int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]],
+]:
+    """
+    Generate the summation terms for the final reconstructions as arrays.
+
+    This holds the same information as generate_summation_terms, without a Python
+    object per summation term or kronecker term.
+
+    | summation_terms[summation_term_idx, subcircuit_idx] = subcircuit_entry_idx.
+
+    | subcircuit_entries[subcircuit_idx] holds the kronecker terms of every entry in
+        compressed sparse row format: the kronecker term of subcircuit_entry_idx is
+        made of the coefficients and subcircuit instance indices at positions
+        indptr[subcircuit_entry_idx] to indptr[subcircuit_entry_idx + 1] of the
+        'coefficients' and 'instances' arrays.
+
+    subcircuit_instances[subcircuit_idx][init,meas] = subcircuit_instance_idx.
+
+    Args:
+        - subcircuits (list): the list of subcircuits
+        - complete_path_map (dict): the paths of all the qubits through the circuit DAGs
+        - num_cuts (int): the number of cuts
+
+    Returns:
+        a tuple
+        containing:
+
+        - (NDArray): the (4^num_cuts x number of subcircuits) table of entry indices
+        - (dict): the kronecker terms of the entries of each subcircuit
+        - (dict): dictionary containing subcircuit instances
+    """
+    O_rho_pairs = get_cut_qubit_pairs(complete_path_map=complete_path_map)
+    subcircuit_entries: Dict[int, Dict[str, NDArray]] = {}
+    subcircuit_instances: Dict[
+        int, Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int]
+    ] = {}
+    subcircuit_cuts: Dict[int, List[int]] = {}
+    for subcircuit_idx, subcircuit in enumerate(subcircuits):
+        (
+            subcircuit_cuts[subcircuit_idx],
+            _,
+            kronecker_terms,
+            subcircuit_instances[subcircuit_idx],
+        ) = _generate_subcircuit_entries(
+            subcircuit_idx=subcircuit_idx,
+            subcircuit=subcircuit,
+            O_rho_pairs=O_rho_pairs,
+        )
+        subcircuit_entries[subcircuit_idx] = _get_kronecker_arrays(kronecker_terms)
+    summation_terms = _get_summation_table(
+        num_cuts=num_cuts, subcircuit_cuts=subcircuit_cuts
+    )
     return summation_terms, subcircuit_entries, subcircuit_instances
 
 
@@ -369,7 +393,7 @@ def naive_compute(
                 subcircuit_entry_idx
             ]
             if summation_term_prob is None:
-                summation_term_prob = subcircuit_entry_prob
+                summation_term_prob = np.array(subcircuit_entry_prob)
             else:
                 summation_term_prob = np.kron(
                     summation_term_prob, subcircuit_entry_prob
@@ -383,22 +407,104 @@ def naive_compute(
     return reconstructed_prob, overhead
 
 
+def contract_compute(
+    subcircuit_order: Sequence[int],
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+    num_cuts: int,
+    output_slices: Optional[Dict[int, slice]] = None,
+) -> Tuple[NDArray, Dict[str, int]]:
+    """
+    Reconstruct the full probability distribution with a single tensor contraction.
+
+    Each subcircuit's entries are arranged into a tensor with one axis of size 4 per
+    cut touching the subcircuit, plus one axis for the subcircuit's output states.
+    The sum over all 4^num_cuts summation terms is then a contraction over the shared
+    cut axes, which is evaluated pairwise along an optimized einsum path rather than
+    by materializing a full Kronecker product per term.
+
+    Args:
+        - subcircuit_order (list): the order of the subcircuit outputs in the
+            reconstructed distribution
+        - summation_terms (list): the summation terms, as generated
+            from generate_summation_terms
+        - subcircuit_entry_probs (dict): the input probabilities from each of
+            the subcircuit executions
+        - num_cuts (int): the number of cuts
+        - output_slices (dict, optional): the slice of the output states to keep for
+            each subcircuit, used to reconstruct a contiguous chunk of the distribution
+
+    Returns:
+        - (NDArray): the reconstructed probability distribution
+        - (dict): the approximate computational overhead of the function
+
+    Raises:
+        - ValueError: if there are too many cuts and subcircuits to label the
+            contraction indices
+    """
+    if num_cuts + len(subcircuit_order) > 52:
+        raise ValueError(
+            f"Cannot contract {num_cuts} cuts across {len(subcircuit_order)} subcircuits, "
+            "as einsum supports at most 52 distinct indices."
+        )
+    subcircuit_cuts = _get_subcircuit_cuts(
+        summation_terms=summation_terms,
+        subcircuit_order=subcircuit_order,
+        num_cuts=num_cuts,
+    )
+
+    # Cut axes are labelled 0..num_cuts-1, and the output axis of each
+    # subcircuit is labelled num_cuts + its position in subcircuit_order
+    operands: List[Any] = []
+    for position, subcircuit_idx in enumerate(subcircuit_order):
+        subcircuit_tensor = _get_subcircuit_tensor(
+            subcircuit_idx=subcircuit_idx,
+            cuts=subcircuit_cuts[subcircuit_idx],
+            summation_terms=summation_terms,
+            subcircuit_entry_probs=subcircuit_entry_probs,
+        )
+        if output_slices is not None:
+            subcircuit_tensor = subcircuit_tensor[..., output_slices[subcircuit_idx]]
+        operands.append(subcircuit_tensor)
+        operands.append(list(subcircuit_cuts[subcircuit_idx]) + [num_cuts + position])
+    output_indices = [num_cuts + position for position in range(len(subcircuit_order))]
+
+    path, _ = np.einsum_path(*operands, output_indices, optimize="greedy")
+    overhead = _contraction_overhead(
+        operand_indices=operands[1::2],
+        operand_shapes=[operand.shape for operand in operands[::2]],
+        output_indices=output_indices,
+        path=path,
+    )
+    reconstructed_prob = np.einsum(*operands, output_indices, optimize=path)
+
+    return reconstructed_prob.reshape(-1), overhead
+
+
 def build(
     summation_terms: Sequence[Dict[int, int]],
     subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
     num_cuts: int,
     num_threads: int,
+    method: str = "contraction",
 ) -> Tuple[NDArray, List[int], Dict[str, int]]:
     """
     Reconstruct the full probability distribution from the subcircuits.
 
     Args:
         - summation_terms (list): the summation terms used to generate the full
-            vector, as generated in generate_summation_terms
+            vector, as generated in generate_summation_terms or
+            generate_summation_arrays
         - subcircuit_entry_probs (dict): the probabilities vectors from the
             subcircuit executions
         - num_cuts (int): the number of cuts
-        - num_threads (int): the number of threads to use for multithreading
+        - num_threads (int): the number of processes to use. The 'contraction' method
+            splits the output states across the processes, which write their chunks
+            into one shared output vector, while the 'naive' method splits the
+            summation terms and sums the full vector returned by each process
+        - method (str): 'contraction' to contract the subcircuit entries over the
+            shared cut indices, or 'naive' to sum the Kronecker product of every
+            summation term
 
     Returns:
         a tuple
@@ -408,33 +514,64 @@ def build(
           circuit
         - (list): the ordering of the distribution
         - (dict): the computational post-processing overhead
+
+    Raises:
+        - ValueError: if the method is not recognized
     """
     smart_order = sorted(
         list(subcircuit_entry_probs.keys()),
         key=lambda subcircuit_idx: len(subcircuit_entry_probs[subcircuit_idx][0]),
     )
-    args = []
-    for i in range(num_threads * 5):
-        segment_summation_terms = _find_process_jobs(
-            jobs=summation_terms, rank=i, num_workers=num_threads * 5
+    if method == "contraction" and num_threads > 1:
+        reconstructed_prob, overhead = _parallel_contract(
+            subcircuit_order=smart_order,
+            summation_terms=summation_terms,
+            subcircuit_entry_probs=subcircuit_entry_probs,
+            num_cuts=num_cuts,
+            num_threads=num_threads,
+        )
+    elif method == "contraction":
+        reconstructed_prob, overhead = contract_compute(
+            subcircuit_order=smart_order,
+            summation_terms=summation_terms,
+            subcircuit_entry_probs=subcircuit_entry_probs,
+            num_cuts=num_cuts,
+        )
+    elif method == "naive":
+        args = []
+        for i in range(num_threads * 5):
+            segment_summation_terms = _find_process_jobs(
+                jobs=summation_terms, rank=i, num_workers=num_threads * 5
+            )
+            if len(segment_summation_terms) == 0:
+                break
+            arg = (smart_order, segment_summation_terms)
+            args.append(arg)
+        # Why "spawn"?  See https://pythonspeed.com/articles/python-multiprocessing/
+        ctx = mp.get_context("spawn")
+        shared_entry_probs, entry_index = _share_entry_probs(
+            subcircuit_entry_probs=subcircuit_entry_probs, ctx=ctx
+        )
+        with ctx.Pool(
+            num_threads,
+            initializer=_init_build_worker,
+            initargs=(shared_entry_probs, entry_index),
+        ) as pool:
+            results = pool.starmap(_naive_compute_shared, args)
+        overhead = {"additions": 0, "multiplications": 0}
+        reconstructed_prob = None
+        for result in results:
+            thread_reconstructed_prob, thread_overhead = result
+            if reconstructed_prob is None:
+                reconstructed_prob = thread_reconstructed_prob
+            else:
+                reconstructed_prob += thread_reconstructed_prob
+            overhead["additions"] += thread_overhead["additions"]
+            overhead["multiplications"] += thread_overhead["multiplications"]
+    else:
+        raise ValueError(
+            'The method argument for the build function should be either "contraction" or "naive".'
         )
-        if len(segment_summation_terms) == 0:
-            break
-        arg = (smart_order, segment_summation_terms, subcircuit_entry_probs)
-        args.append(arg)
-    # Why "spawn"?  See https://pythonspeed.com/articles/python-multiprocessing/
-    with mp.get_context("spawn").Pool(num_threads) as pool:
-        results = pool.starmap(naive_compute, args)
-    overhead = {"additions": 0, "multiplications": 0}
-    reconstructed_prob = None
-    for result in results:
-        thread_reconstructed_prob, thread_overhead = result
-        if reconstructed_prob is None:
-            reconstructed_prob = thread_reconstructed_prob
-        else:
-            reconstructed_prob += thread_reconstructed_prob
-        overhead["additions"] += thread_overhead["additions"]
-        overhead["multiplications"] += thread_overhead["multiplications"]
     reconstructed_prob /= 2**num_cuts
 
     if reconstructed_prob is None:
@@ -443,6 +580,478 @@ def build(
     return reconstructed_prob, smart_order, overhead
 
 
+def query_build(
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+    num_cuts: int,
+    subcircuit_queries: Dict[int, NDArray],
+) -> Tuple[NDArray, Dict[str, int]]:
+    """
+    Reconstruct the probabilities of a batch of output states of the full circuit.
+
+    The entries of each subcircuit are only gathered at the output state each query
+    maps to, and the cut indices are contracted with the query index shared by all
+    subcircuits, so the cost is linear in the number of queries.
+
+    Args:
+        - summation_terms (list): the summation terms used to generate the full
+            vector, as generated in generate_summation_terms
+        - subcircuit_entry_probs (dict): the probabilities vectors from the
+            subcircuit executions
+        - num_cuts (int): the number of cuts
+        - subcircuit_queries (dict): for each subcircuit, the index of the output
+            state of the subcircuit entries matching each query
+
+    Returns:
+        - (NDArray): the reconstructed probability of each query
+        - (dict): the approximate computational overhead of the function
+
+    Raises:
+        - ValueError: if there are too many cuts to label the contraction indices
+    """
+    if num_cuts + 1 > 52:
+        raise ValueError(
+            f"Cannot contract {num_cuts} cuts, "
+            "as einsum supports at most 52 distinct indices."
+        )
+    subcircuit_order = sorted(subcircuit_entry_probs.keys())
+    subcircuit_cuts = _get_subcircuit_cuts(
+        summation_terms=summation_terms,
+        subcircuit_order=subcircuit_order,
+        num_cuts=num_cuts,
+    )
+
+    # Cut axes are labelled 0..num_cuts-1, and the query axis num_cuts
+    operands: List[Any] = []
+    for subcircuit_idx in subcircuit_order:
+        subcircuit_tensor = _get_subcircuit_tensor(
+            subcircuit_idx=subcircuit_idx,
+            cuts=subcircuit_cuts[subcircuit_idx],
+            summation_terms=summation_terms,
+            subcircuit_entry_probs=subcircuit_entry_probs,
+        )
+        operands.append(subcircuit_tensor[..., subcircuit_queries[subcircuit_idx]])
+        operands.append(list(subcircuit_cuts[subcircuit_idx]) + [num_cuts])
+    output_indices = [num_cuts]
+
+    path, _ = np.einsum_path(*operands, output_indices, optimize="greedy")
+    overhead = _contraction_overhead(
+        operand_indices=operands[1::2],
+        operand_shapes=[operand.shape for operand in operands[::2]],
+        output_indices=output_indices,
+        path=path,
+    )
+    query_probs = np.einsum(*operands, output_indices, optimize=path)
+
+    return query_probs / 2**num_cuts, overhead
+
+
+def get_output_qubits(
+    full_circuit: QuantumCircuit,
+    subcircuits: Sequence[QuantumCircuit],
+    complete_path_map: Dict[Qubit, Sequence[Dict[str, Union[int, Qubit]]]],
+) -> Dict[int, List[int]]:
+    """
+    Locate the full circuit qubit measured by each output qubit of the subcircuits.
+
+    Args:
+        - full_circuit (QuantumCircuit): the original uncut circuit
+        - subcircuits (list): the cut subcircuits
+        - complete_path_map (dict): the path map of the cuts, as defined from the
+            cutting function
+
+    Returns:
+        - (dict): for each subcircuit, the index in the full circuit of each of its
+            output qubits, ordered from the least significant bit of the subcircuit
+            entry probabilities
+    """
+    subcircuit_out_qubits: Dict[int, List[Tuple[int, int]]] = {
+        subcircuit_idx: [] for subcircuit_idx in range(len(subcircuits))
+    }
+    for input_qubit in complete_path_map:
+        output_qubit = complete_path_map[input_qubit][-1]
+        subcircuit_idx = output_qubit["subcircuit_idx"]
+        subcircuit_out_qubits[subcircuit_idx].append(  # type: ignore
+            (
+                subcircuits[subcircuit_idx].qubits.index(  # type: ignore
+                    output_qubit["subcircuit_qubit"]
+                ),
+                full_circuit.qubits.index(input_qubit),
+            )
+        )
+    return {
+        subcircuit_idx: [x[1] for x in sorted(out_qubits)]
+        for subcircuit_idx, out_qubits in subcircuit_out_qubits.items()
+    }
+
+
+def merge_entry_probs(
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+    qubit_states: Dict[int, Sequence[Union[str, int]]],
+) -> Dict[int, NDArray]:
+    """
+    Merge the output qubits of the subcircuit entries into bins.
+
+    Each output qubit is either kept ('active'), summed over ('merged'), or fixed
+    to the given bit value (0 or 1).
+
+    Args:
+        - subcircuit_entry_probs (dict): the input probabilities from each of
+            the subcircuit executions
+        - qubit_states (dict): for each subcircuit, the state of each output qubit,
+            ordered from the least significant bit of the entry probabilities
+
+    Returns:
+        - (dict): for each subcircuit, a (number of entries x 2^active qubits) array
+            of the binned entry probabilities
+    """
+    merged_entry_probs = {}
+    for subcircuit_idx, entries in subcircuit_entry_probs.items():
+        entry_block = np.array([entries[idx] for idx in range(len(entries))])
+        # The first output axis holds the most significant bit
+        states = list(reversed(qubit_states[subcircuit_idx]))
+        entry_tensor = entry_block.reshape((len(entry_block),) + (2,) * len(states))
+        entry_tensor = entry_tensor[
+            (slice(None),)
+            + tuple(slice(None) if isinstance(x, str) else x for x in states)
+        ]
+        unfixed_states = [x for x in states if isinstance(x, str)]
+        entry_tensor = entry_tensor.sum(
+            axis=tuple(
+                1 + axis for axis, x in enumerate(unfixed_states) if x == "merged"
+            )
+        )
+        merged_entry_probs[subcircuit_idx] = entry_tensor.reshape(len(entry_block), -1)
+    return merged_entry_probs
+
+
+def dd_build(
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+    num_cuts: int,
+    output_qubits: Dict[int, List[int]],
+    max_active_qubits: int,
+    max_recursion: int,
+    num_threads: int = 1,
+    method: str = "contraction",
+) -> List[Dict[str, Any]]:
+    """
+    Reconstruct the probability distribution by dynamic definition.
+
+    The first recursion merges all but max_active_qubits output qubits into bins
+    inside the subcircuit entries and reconstructs the distribution over the bins.
+    Each later recursion zooms into the most probable bin found so far that still
+    has merged qubits, fixing its active qubits and activating the next merged ones.
+
+    Args:
+        - summation_terms (list): the summation terms used to generate the full
+            vector, as generated in generate_summation_terms
+        - subcircuit_entry_probs (dict): the probabilities vectors from the
+            subcircuit executions
+        - num_cuts (int): the number of cuts
+        - output_qubits (dict): the full circuit qubit of each subcircuit output,
+            as generated in get_output_qubits
+        - max_active_qubits (int): the number of qubits resolved in each recursion
+        - max_recursion (int): the maximum number of recursions
+        - num_threads (int): the number of processes used by the build function
+        - method (str): the reconstruction backend used by the build function
+
+    Returns:
+        - (list): one dictionary per recursion, with the state of each full circuit
+            qubit ('active', 'merged', 0 or 1) under the key 'qubit_states', and the
+            reconstructed probability of each bin under the key 'bins'. Bit j of a
+            bin index is the value of the j-th lowest active qubit.
+    """
+    num_qubits = sum(len(out_qubits) for out_qubits in output_qubits.values())
+    dd_bins: List[Dict[str, Any]] = []
+    # Min-heap of (-probability, recursion, bin index) for bins that can be zoomed
+    zoom_candidates: List[Tuple[float, int, int]] = []
+    for recursion in range(max_recursion):
+        if recursion == 0:
+            qubit_states: List[Union[str, int]] = ["merged"] * num_qubits
+        elif len(zoom_candidates) > 0:
+            _, parent_recursion, bin_idx = heapq.heappop(zoom_candidates)
+            qubit_states = list(dd_bins[parent_recursion]["qubit_states"])
+            parent_active = [
+                qubit for qubit, x in enumerate(qubit_states) if x == "active"
+            ]
+            for bit, qubit in enumerate(parent_active):
+                qubit_states[qubit] = (bin_idx >> bit) & 1
+        else:
+            break
+        merged_qubits = [qubit for qubit, x in enumerate(qubit_states) if x == "merged"]
+        for qubit in merged_qubits[::-1][:max_active_qubits]:
+            qubit_states[qubit] = "active"
+
+        merged_entry_probs = merge_entry_probs(
+            subcircuit_entry_probs=subcircuit_entry_probs,
+            qubit_states={
+                subcircuit_idx: [qubit_states[qubit] for qubit in out_qubits]
+                for subcircuit_idx, out_qubits in output_qubits.items()
+            },
+        )
+        unordered_bins, smart_order, _ = build(
+            summation_terms=summation_terms,
+            subcircuit_entry_probs=merged_entry_probs,
+            num_cuts=num_cuts,
+            num_threads=num_threads,
+            method=method,
+        )
+
+        # Order the bins by active qubit, from the least significant bit
+        unordered_qubits = [
+            qubit
+            for subcircuit_idx in smart_order
+            for qubit in output_qubits[subcircuit_idx][::-1]
+            if qubit_states[qubit] == "active"
+        ]
+        ordered_qubits = sorted(unordered_qubits, reverse=True)
+        bins = (
+            unordered_bins.reshape((2,) * len(unordered_qubits))
+            .transpose([unordered_qubits.index(qubit) for qubit in ordered_qubits])
+            .reshape(-1)
+        )
+        dd_bins.append({"qubit_states": qubit_states, "bins": bins})
+
+        if "merged" in qubit_states:
+            for bin_idx, bin_prob in enumerate(bins):
+                heapq.heappush(zoom_candidates, (-bin_prob, recursion, bin_idx))
+
+    return dd_bins
+
+
+def _parallel_contract(
+    subcircuit_order: Sequence[int],
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+    num_cuts: int,
+    num_threads: int,
+) -> Tuple[NDArray, Dict[str, int]]:
+    """
+    Reconstruct the full probability distribution in output-space chunks.
+
+    The leading bits of the output states are split into num_threads * 5 chunks. Each
+    process contracts the subcircuit entries restricted to its chunks and writes them
+    into a disjoint slice of a preallocated shared output vector, so no reduction is
+    needed and peak memory stays at one output vector.
+
+    Args:
+        - subcircuit_order (list): the order of the subcircuit outputs in the
+            reconstructed distribution
+        - summation_terms (list): the summation terms, as generated
+            from generate_summation_terms
+        - subcircuit_entry_probs (dict): the input probabilities from each of
+            the subcircuit executions
+        - num_cuts (int): the number of cuts
+        - num_threads (int): the number of processes to use
+
+    Returns:
+        - (NDArray): the reconstructed probability distribution
+        - (dict): the approximate computational overhead of the function
+    """
+    output_bits = [
+        int(np.log2(len(subcircuit_entry_probs[subcircuit_idx][0])))
+        for subcircuit_idx in subcircuit_order
+    ]
+    num_chunk_bits = min(sum(output_bits), int(np.ceil(np.log2(num_threads * 5))))
+    args = [
+        (chunk, num_chunk_bits, output_bits, subcircuit_order, num_cuts)
+        for chunk in range(2**num_chunk_bits)
+    ]
+
+    ctx = mp.get_context("spawn")
+    shared_entry_probs, entry_index = _share_entry_probs(
+        subcircuit_entry_probs=subcircuit_entry_probs, ctx=ctx
+    )
+    shared_output = ctx.RawArray("d", 2 ** sum(output_bits))
+    with ctx.Pool(
+        num_threads,
+        initializer=_init_build_worker,
+        initargs=(shared_entry_probs, entry_index, summation_terms, shared_output),
+    ) as pool:
+        results = pool.starmap(_contract_chunk, args)
+    overhead = {"additions": 0, "multiplications": 0}
+    for chunk_overhead in results:
+        overhead["additions"] += chunk_overhead["additions"]
+        overhead["multiplications"] += chunk_overhead["multiplications"]
+
+    return np.frombuffer(shared_output, dtype=float), overhead
+
+
+# State attached to each spawned build process by _init_build_worker
+_worker_entry_probs: Dict[int, NDArray] = {}
+_worker_summation_terms: Optional[Sequence[Dict[int, int]]] = None
+_worker_output: Any = None
+
+
+def _share_entry_probs(
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]], ctx: Any
+) -> Tuple[Any, Dict[int, Tuple[int, int, int]]]:
+    """
+    Pack the subcircuit entry probabilities into one shared memory block.
+
+    The entries of each subcircuit are stored contiguously as the rows of a
+    (number of entries x number of output states) block, so that build processes
+    can attach to them without the probabilities being pickled into every task.
+
+    Args:
+        - subcircuit_entry_probs (dict): the input probabilities from each of
+            the subcircuit executions
+        - ctx (multiprocessing context): the context used to start the processes
+
+    Returns:
+        - (RawArray): the shared memory block
+        - (dict): the offset, number of entries and entry length of each
+            subcircuit's block
+    """
+    entry_index = {}
+    offset = 0
+    for subcircuit_idx in subcircuit_entry_probs:
+        num_entries = len(subcircuit_entry_probs[subcircuit_idx])
+        entry_length = len(subcircuit_entry_probs[subcircuit_idx][0])
+        entry_index[subcircuit_idx] = (offset, num_entries, entry_length)
+        offset += num_entries * entry_length
+
+    shared_entry_probs = ctx.RawArray("d", offset)
+    for subcircuit_idx, subcircuit_block in _attach_entry_probs(
+        shared_entry_probs=shared_entry_probs, entry_index=entry_index, writeable=True
+    ).items():
+        for entry_idx in range(len(subcircuit_block)):
+            subcircuit_block[entry_idx] = subcircuit_entry_probs[subcircuit_idx][
+                entry_idx
+            ]
+    return shared_entry_probs, entry_index
+
+
+def _attach_entry_probs(
+    shared_entry_probs: Any,
+    entry_index: Dict[int, Tuple[int, int, int]],
+    writeable: bool = False,
+) -> Dict[int, NDArray]:
+    """
+    View the shared memory block as the entry probabilities of each subcircuit.
+
+    Args:
+        - shared_entry_probs (RawArray): the shared memory block
+        - entry_index (dict): the offset, number of entries and entry length of each
+            subcircuit's block
+        - writeable (bool): whether the views may be written to
+
+    Returns:
+        - (dict): a zero-copy (number of entries x number of output states) view of
+            each subcircuit's block, whose rows are indexed by subcircuit_entry_idx
+    """
+    buffer = np.frombuffer(shared_entry_probs, dtype=float)
+    subcircuit_blocks = {}
+    for subcircuit_idx, (offset, num_entries, entry_length) in entry_index.items():
+        subcircuit_block = buffer[offset : offset + num_entries * entry_length].reshape(
+            num_entries, entry_length
+        )
+        subcircuit_block.flags.writeable = writeable
+        subcircuit_blocks[subcircuit_idx] = subcircuit_block
+    return subcircuit_blocks
+
+
+def _init_build_worker(
+    shared_entry_probs: Any,
+    entry_index: Dict[int, Tuple[int, int, int]],
+    summation_terms: Optional[Sequence[Dict[int, int]]] = None,
+    shared_output: Any = None,
+) -> None:
+    """
+    Attach a build process to the shared entry probabilities and output vector.
+
+    Args:
+        - shared_entry_probs (RawArray): the shared entry probabilities
+        - entry_index (dict): the offset, number of entries and entry length of each
+            subcircuit's block
+        - summation_terms (list, optional): the summation terms, as generated
+            from generate_summation_terms
+        - shared_output (RawArray, optional): the shared output vector
+
+    Returns:
+        - None
+    """
+    global _worker_entry_probs, _worker_summation_terms, _worker_output
+    _worker_entry_probs = _attach_entry_probs(
+        shared_entry_probs=shared_entry_probs, entry_index=entry_index
+    )
+    _worker_summation_terms = summation_terms
+    _worker_output = shared_output
+
+
+def _naive_compute_shared(
+    subcircuit_order: Sequence[int], summation_terms: Sequence[Dict[int, int]]
+) -> Tuple[Optional[NDArray], Dict[str, int]]:
+    """
+    Run naive_compute on the entry probabilities shared with the build process.
+
+    Args:
+        - subcircuit_order (list): the order of the subcircuit inputs
+        - summation_terms (list): the summation terms of this job
+
+    Returns:
+        - (NDArray): the reconstructed probability distribution
+        - (dict): the approximate computational overhead of the function
+    """
+    return naive_compute(
+        subcircuit_order=subcircuit_order,
+        summation_terms=summation_terms,
+        subcircuit_entry_probs=_worker_entry_probs,
+    )
+
+
+def _contract_chunk(
+    chunk: int,
+    num_chunk_bits: int,
+    output_bits: Sequence[int],
+    subcircuit_order: Sequence[int],
+    num_cuts: int,
+) -> Dict[str, int]:
+    """
+    Reconstruct one chunk of the output states into the shared output vector.
+
+    The summation terms and entry probabilities are the ones shared with the
+    build process.
+
+    Args:
+        - chunk (int): the value of the leading bits of the output states in the chunk
+        - num_chunk_bits (int): the number of leading bits used to split the output
+        - output_bits (list): the number of output bits of each subcircuit, in the
+            order of subcircuit_order
+        - subcircuit_order (list): the order of the subcircuit outputs in the
+            reconstructed distribution
+        - num_cuts (int): the number of cuts
+
+    Returns:
+        - (dict): the approximate computational overhead of the chunk
+    """
+    # Walk the subcircuits from the most significant output bits, fixing
+    # chunk bits until all of them are consumed
+    output_slices = {}
+    remaining_bits = num_chunk_bits
+    for subcircuit_idx, bits in zip(subcircuit_order, output_bits):
+        fixed_bits = min(bits, remaining_bits)
+        remaining_bits -= fixed_bits
+        prefix = (chunk >> remaining_bits) & ((1 << fixed_bits) - 1)
+        free_bits = bits - fixed_bits
+        output_slices[subcircuit_idx] = slice(
+            prefix << free_bits, (prefix + 1) << free_bits
+        )
+    if _worker_summation_terms is None:
+        raise ValueError("The build process was not given the summation terms.")
+    chunk_prob, overhead = contract_compute(
+        subcircuit_order=subcircuit_order,
+        summation_terms=_worker_summation_terms,
+        subcircuit_entry_probs=_worker_entry_probs,
+        num_cuts=num_cuts,
+        output_slices=output_slices,
+    )
+    output = np.frombuffer(_worker_output, dtype=float)
+    output[chunk * len(chunk_prob) : (chunk + 1) * len(chunk_prob)] = chunk_prob
+    return overhead
+
+
 def _find_process_jobs(
     jobs: Sequence[Dict[int, int]], rank: int, num_workers: int
 ) -> Sequence[Dict[int, int]]:
@@ -468,3 +1077,220 @@ def _find_process_jobs(
         jobs_stop = jobs_start + (count - 1) + 1
     process_jobs = list(jobs[jobs_start:jobs_stop])
     return process_jobs
+
+
+def _generate_subcircuit_entries(
+    subcircuit_idx: int,
+    subcircuit: QuantumCircuit,
+    O_rho_pairs: List[Tuple[Dict[str, Union[int, Any]], Dict[str, Union[int, Any]]]],
+) -> Tuple[
+    List[int],
+    List[Tuple[str, str]],
+    List[List[Tuple[int, int]]],
+    Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int],
+]:
+    """
+    Generate the entries of a subcircuit over the labels of the cuts touching it.
+
+    The entry index is the local label index, where digit j is the basis of the
+    j-th lowest cut touching the subcircuit.
+
+    Args:
+        - subcircuit_idx (int): the subcircuit index
+        - subcircuit (QuantumCircuit): the subcircuit
+        - O_rho_pairs (list): the list of cut pair qubits
+
+    Returns:
+        - (list): the cuts touching the subcircuit, in ascending order
+        - (list): the (init, meas) label of each entry
+        - (list): the (coefficient, subcircuit_instance_idx) kronecker term of each entry
+        - (dict): the subcircuit instances
+    """
+    subcircuit_cuts = [
+        cut
+        for cut, (O_qubit, rho_qubit) in enumerate(O_rho_pairs)
+        if subcircuit_idx in (O_qubit["subcircuit_idx"], rho_qubit["subcircuit_idx"])
+    ]
+    entry_keys = []
+    kronecker_terms = []
+    subcircuit_instances: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], int] = {}
+    for local_label_idx in range(4 ** len(subcircuit_cuts)):
+        local_label = get_label(
+            label_idx=local_label_idx, num_cuts=len(subcircuit_cuts)
+        )
+        subcircuit_label = {"init": "", "meas": ""}
+        for cut, c in zip(subcircuit_cuts, local_label):
+            O_qubit, rho_qubit = O_rho_pairs[cut]
+            if O_qubit["subcircuit_idx"] == subcircuit_idx:
+                subcircuit_label["meas"] += c
+            if rho_qubit["subcircuit_idx"] == subcircuit_idx:
+                subcircuit_label["init"] += c
+        init_label, meas_label = fill_label(
+            subcircuit_idx=subcircuit_idx,
+            subcircuit=subcircuit,
+            subcircuit_label=subcircuit_label,
+            O_rho_pairs=O_rho_pairs,
+        )
+        kronecker_term = []
+        for init_meas in get_init_meas(init_label=init_label, meas_label=meas_label):
+            coefficient, init = convert_to_physical_init(init=list(init_meas[0]))
+            subcircuit_instance_idx = subcircuit_instances.setdefault(
+                (init, init_meas[1]), len(subcircuit_instances)
+            )
+            kronecker_term.append((coefficient, subcircuit_instance_idx))
+        entry_keys.append((subcircuit_label["init"], subcircuit_label["meas"]))
+        kronecker_terms.append(kronecker_term)
+    return subcircuit_cuts, entry_keys, kronecker_terms, subcircuit_instances
+
+
+def _get_summation_table(
+    num_cuts: int, subcircuit_cuts: Dict[int, Sequence[int]]
+) -> NDArray:
+    """
+    Compute the entry index of every subcircuit in every summation term.
+
+    Args:
+        - num_cuts (int): the number of cuts
+        - subcircuit_cuts (dict): the cuts touching each subcircuit, in ascending order
+
+    Returns:
+        - (NDArray): the (4^num_cuts x number of subcircuits) table of entry indices
+    """
+    labels = np.arange(4**num_cuts, dtype=np.int64)
+    summation_table = np.zeros((4**num_cuts, len(subcircuit_cuts)), dtype=np.int32)
+    for subcircuit_idx, cuts in subcircuit_cuts.items():
+        for position, cut in enumerate(cuts):
+            # Move the base-4 digit of the cut to the position of the local label
+            summation_table[:, subcircuit_idx] += ((labels >> (2 * cut)) & 3) << (
+                2 * position
+            )
+    return summation_table
+
+
+def _get_kronecker_arrays(
+    kronecker_terms: Sequence[Sequence[Tuple[int, int]]]
+) -> Dict[str, NDArray]:
+    """
+    Store the kronecker terms of the entries of a subcircuit in compressed sparse row format.
+
+    Args:
+        - kronecker_terms (list): the (coefficient, subcircuit_instance_idx) pairs
+            of each entry
+
+    Returns:
+        - (dict): the 'indptr', 'coefficients' and 'instances' arrays
+    """
+    indptr = np.zeros(len(kronecker_terms) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(term) for term in kronecker_terms])
+    pairs = np.array(
+        [pair for term in kronecker_terms for pair in term], dtype=np.int64
+    ).reshape(-1, 2)
+    return {
+        "indptr": indptr,
+        "coefficients": pairs[:, 0],
+        "instances": pairs[:, 1],
+    }
+
+
+def _get_subcircuit_cuts(
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_order: Sequence[int],
+    num_cuts: int,
+) -> Dict[int, List[int]]:
+    """
+    Find the cuts each subcircuit's entries depend on.
+
+    Summation term label_idx encodes the basis of cut k in its k-th base-4 digit. A
+    subcircuit entry is uniquely determined by the bases of the cuts touching that
+    subcircuit, so a subcircuit touches cut k iff changing the k-th digit of the label
+    changes its entry.
+
+    Args:
+        - summation_terms (list): the summation terms, as generated
+            from generate_summation_terms
+        - subcircuit_order (list): the subcircuit indices
+        - num_cuts (int): the number of cuts
+
+    Returns:
+        - (dict): the ascending list of cuts touching each subcircuit
+    """
+    return {
+        subcircuit_idx: [
+            cut
+            for cut in range(num_cuts)
+            if summation_terms[4**cut][subcircuit_idx]
+            != summation_terms[0][subcircuit_idx]
+        ]
+        for subcircuit_idx in subcircuit_order
+    }
+
+
+def _get_subcircuit_tensor(
+    subcircuit_idx: int,
+    cuts: Sequence[int],
+    summation_terms: Sequence[Dict[int, int]],
+    subcircuit_entry_probs: Dict[int, Dict[int, NDArray]],
+) -> NDArray:
+    """
+    Arrange the entries of a subcircuit into a tensor indexed by its cut bases.
+
+    Args:
+        - subcircuit_idx (int): the subcircuit index
+        - cuts (list): the cuts touching the subcircuit
+        - summation_terms (list): the summation terms, as generated
+            from generate_summation_terms
+        - subcircuit_entry_probs (dict): the input probabilities from each of
+            the subcircuit executions
+
+    Returns:
+        - (NDArray): the tensor, with one axis of size 4 per cut followed by
+            the output axis of the subcircuit
+    """
+    entry_indices = np.empty((4,) * len(cuts), dtype=int)
+    for local_label in itertools.product(range(4), repeat=len(cuts)):
+        label_idx = sum(digit * 4**cut for digit, cut in zip(local_label, cuts))
+        entry_indices[local_label] = summation_terms[label_idx][subcircuit_idx]
+    entries = subcircuit_entry_probs[subcircuit_idx]
+    if isinstance(entries, np.ndarray):
+        subcircuit_tensor = entries[entry_indices.ravel()]
+    else:
+        subcircuit_tensor = np.array([entries[idx] for idx in entry_indices.ravel()])
+    return subcircuit_tensor.reshape(entry_indices.shape + subcircuit_tensor.shape[1:])
+
+
+def _contraction_overhead(
+    operand_indices: Sequence[Sequence[int]],
+    operand_shapes: Sequence[Tuple[int, ...]],
+    output_indices: Sequence[int],
+    path: Sequence[Any],
+) -> Dict[str, int]:
+    """
+    Estimate the number of operations needed to evaluate an einsum path.
+
+    Args:
+        - operand_indices (list): the indices of each operand
+        - operand_shapes (list): the shapes of each operand
+        - output_indices (list): the indices of the output
+        - path (list): the contraction path, as returned by np.einsum_path
+
+    Returns:
+        - (dict): the approximate number of additions and multiplications
+    """
+    dimensions = {}
+    for indices, shape in zip(operand_indices, operand_shapes):
+        dimensions.update(zip(indices, shape))
+    remaining = [set(indices) for indices in operand_indices]
+    overhead = {"additions": 0, "multiplications": 0}
+    for contraction in path[1:]:
+        contracted = [remaining[position] for position in contraction]
+        for position in sorted(contraction, reverse=True):
+            del remaining[position]
+        involved = set().union(*contracted)
+        kept = involved & set(output_indices).union(*remaining)
+        cost = int(np.prod([dimensions[index] for index in involved]))
+        if len(contracted) > 1:
+            overhead["multiplications"] += cost
+        if kept != involved:
+            overhead["additions"] += cost
+        remaining.append(kept)
+    return overhead
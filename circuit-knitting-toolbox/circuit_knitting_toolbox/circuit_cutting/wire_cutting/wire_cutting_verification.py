@@ -123,18 +123,16 @@ def generate_reconstructed_output(
     for subcircuit_idx in smart_order:
         unordered_qubit += subcircuit_out_qubits[subcircuit_idx]
 
-    reconstructed_output = np.zeros(len(unordered))
-
-    for unordered_state, unordered_p in enumerate(unordered):
-        bin_unordered_state = bin(unordered_state)[2:].zfill(full_circuit.num_qubits)
-        _, ordered_bin_state = zip(
-            *sorted(zip(unordered_qubit, bin_unordered_state), reverse=True)
-        )
-        ordered_bin_state_str = "".join([str(x) for x in ordered_bin_state])
-        ordered_state = int(ordered_bin_state_str, 2)
-        reconstructed_output[ordered_state] = unordered_p
-
-    return np.array(reconstructed_output)
+    # Axis a of the unordered tensor holds qubit unordered_qubit[a], and axis b of
+    # the reconstructed tensor holds qubit num_qubits - 1 - b
+    num_qubits = len(unordered_qubit)
+    axes = [unordered_qubit.index(qubit) for qubit in reversed(range(num_qubits))]
+    reconstructed_output = np.empty(len(unordered))
+    reconstructed_output.reshape((2,) * num_qubits)[...] = np.reshape(
+        unordered, (2,) * num_qubits
+    ).transpose(axes)
+
+    return reconstructed_output
 
 
 def _evaluate_circuit(circuit: QuantumCircuit) -> Sequence[float]:
@@ -11,17 +11,101 @@
 
 """Tests for circuit_cutting package."""
 
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
 import unittest
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+from unittest import mock
 
 import numpy as np
+from docplex.mp.model import Model
 from qiskit import QuantumCircuit
+from qiskit.quantum_info import Pauli, Statevector
+from qiskit.providers.fake_provider import FakeManila
+from qiskit_ibm_runtime import Options
 
 from circuit_knitting_toolbox.circuit_cutting.wire_cutting import (
     cut_circuit_wires,
     evaluate_subcircuits,
+    evaluate_subcircuits_async,
+    plan_shots,
+    generate_summation_terms,
+    generate_summation_arrays,
     reconstruct_full_distribution,
+    reconstruct_dynamic_definition,
+    reconstruct_probabilities,
+    reconstruct_expectation_values,
     verify,
 )
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting import (
+    wire_cutting_evaluation,
+)
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting.wire_cutting import (
+    _circuit_stripping,
+    _generate_metadata,
+    _read_circuit,
+    _subcircuits_parser,
+)
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting.wire_cutting_evaluation import (
+    _transpile_subcircuits,
+)
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting.heuristic_model import (
+    HeuristicModel,
+)
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting.mip_model import (
+    MIPModel,
+    _CutoffListener,
+)
+from circuit_knitting_toolbox.circuit_cutting.wire_cutting.wire_cutting_post_processing import (
+    attribute_label,
+    convert_to_physical_init,
+    fill_label,
+    get_cut_qubit_pairs,
+    get_init_meas,
+    get_label,
+)
+
+
+def _generate_summation_terms_per_label(subcircuits, complete_path_map, num_cuts):
+    """Enumerate the summation terms label by label, as the original implementation."""
+    summation_terms = []
+    subcircuit_entries = {idx: {} for idx in range(len(subcircuits))}
+    subcircuit_instances = {idx: {} for idx in range(len(subcircuits))}
+    O_rho_pairs = get_cut_qubit_pairs(complete_path_map=complete_path_map)
+    for label_idx in range(4**num_cuts):
+        subcircuit_labels = attribute_label(
+            label=get_label(label_idx=label_idx, num_cuts=num_cuts),
+            O_rho_pairs=O_rho_pairs,
+            num_subcircuits=len(subcircuits),
+        )
+        summation_term = {}
+        for idx, subcircuit in enumerate(subcircuits):
+            entries = subcircuit_entries[idx]
+            instances = subcircuit_instances[idx]
+            key = (subcircuit_labels[idx]["init"], subcircuit_labels[idx]["meas"])
+            if key not in entries:
+                init_label, meas_label = fill_label(
+                    subcircuit_idx=idx,
+                    subcircuit=subcircuit,
+                    subcircuit_label=subcircuit_labels[idx],
+                    O_rho_pairs=O_rho_pairs,
+                )
+                kronecker_term = []
+                for init, meas in get_init_meas(
+                    init_label=init_label, meas_label=meas_label
+                ):
+                    coefficient, init = convert_to_physical_init(init=list(init))
+                    instance_idx = instances.setdefault((init, meas), len(instances))
+                    kronecker_term.append((coefficient, instance_idx))
+                entries[key] = (len(entries), kronecker_term)
+            summation_term[idx] = entries[key][0]
+        summation_terms.append(summation_term)
+    return summation_terms, subcircuit_entries, subcircuit_instances
 
 
 class TestCircuitCutting(unittest.TestCase):
@@ -66,6 +150,180 @@ class TestCircuitCutting(unittest.TestCase):
 
         self.assertAlmostEqual(0.0, metrics["nearest"]["Mean Squared Error"])
 
+    def test_circuit_cutting_automatic_highs(self):
+        qc = self.circuit
+        kwargs = dict(
+            circuit=qc,
+            method="automatic",
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            max_cuts=10,
+            num_subcircuits=[2],
+        )
+        cuts = cut_circuit_wires(solver="highs", **kwargs)
+        self.assertEqual(cuts["num_cuts"], cut_circuit_wires(**kwargs)["num_cuts"])
+
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        reconstructed_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts
+        )
+
+        metrics, _ = verify(qc, reconstructed_probabilities)
+
+        self.assertAlmostEqual(0.0, metrics["nearest"]["Mean Squared Error"])
+
+        with self.assertRaises(ValueError):
+            cut_circuit_wires(solver="gurobi", **kwargs)
+
+        # HiGHS takes no MIP start, so the heuristic is not run for it
+        with mock.patch(
+            "circuit_knitting_toolbox.circuit_cutting.wire_cutting.wire_cutting."
+            "_find_initial_subcircuits"
+        ) as find_initial_subcircuits:
+            with self.assertWarns(UserWarning):
+                warm_cuts = cut_circuit_wires(solver="highs", warm_start=True, **kwargs)
+        find_initial_subcircuits.assert_not_called()
+        self.assertEqual(cuts["num_cuts"], warm_cuts["num_cuts"])
+
+        # scipy<1.9 has no milp
+        with mock.patch.dict(sys.modules, {"scipy.optimize": object()}):
+            with self.assertRaises(ImportError):
+                cut_circuit_wires(solver="highs", **kwargs)
+
+    def test_circuit_cutting_automatic_parallel(self):
+        qc = self.circuit
+        kwargs = dict(
+            circuit=qc,
+            method="automatic",
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            max_cuts=10,
+            num_subcircuits=[2, 3],
+        )
+        cuts = cut_circuit_wires(num_processes=2, **kwargs)
+        sequential_cuts = cut_circuit_wires(**kwargs)
+        self.assertEqual(cuts["num_cuts"], sequential_cuts["num_cuts"])
+        self.assertEqual(cuts["classical_cost"], sequential_cuts["classical_cost"])
+
+        # CPLEX stops once a concurrent model found a solution it cannot beat
+        n_vertices, edges, vertex_ids, id_vertices = _read_circuit(
+            circuit=_circuit_stripping(circuit=qc)
+        )
+        model_kwargs = dict(
+            n_vertices=n_vertices,
+            edges=edges,
+            vertex_ids=vertex_ids,
+            id_vertices=id_vertices,
+            num_subcircuit=3,
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            num_qubits=qc.num_qubits,
+            max_cuts=10,
+        )
+        self.assertTrue(
+            MIPModel(**model_kwargs).solve(
+                float("inf"), get_min_postprocessing_cost=lambda: float("inf")
+            )
+        )
+        # The three subcircuits need two cuts, which cost more than 8
+        min_cost = 8.0
+        self.assertFalse(
+            MIPModel(**model_kwargs).solve(
+                float("inf"), get_min_postprocessing_cost=lambda: min_cost
+            )
+        )
+        min_costs = [float("inf")]
+        listener = _CutoffListener(MIPModel(**model_kwargs), lambda: min_costs[-1])
+        with mock.patch.object(listener, "abort") as abort:
+            listener.notify_progress(mock.Mock(best_bound=2.0))
+            abort.assert_not_called()
+            # The cutoff tightens while solving
+            min_costs.append(min_cost)
+            listener.notify_progress(mock.Mock(best_bound=2.0))
+            abort.assert_called_once()
+        self.assertTrue(listener.cut_off)
+
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        reconstructed_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts
+        )
+
+        metrics, _ = verify(qc, reconstructed_probabilities)
+
+        self.assertAlmostEqual(0.0, metrics["nearest"]["Mean Squared Error"])
+
+    def test_circuit_cutting_automatic_heuristic(self):
+        qc = self.circuit
+        cuts = cut_circuit_wires(
+            circuit=qc,
+            method="automatic",
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            max_cuts=10,
+            num_subcircuits=[2],
+            solver="heuristic",
+        )
+        self.assertTrue(
+            all(subcircuit.width() <= 3 for subcircuit in cuts["subcircuits"])
+        )
+        self.assertLessEqual(cuts["num_cuts"], 10)
+
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        reconstructed_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts
+        )
+
+        metrics, _ = verify(qc, reconstructed_probabilities)
+
+        self.assertAlmostEqual(0.0, metrics["nearest"]["Mean Squared Error"])
+
+        # The refinement stops at the deadline, even in the middle of a pass
+        n_vertices, edges, vertex_ids, id_vertices = _read_circuit(
+            circuit=_circuit_stripping(circuit=qc)
+        )
+        model = HeuristicModel(
+            n_vertices=n_vertices,
+            edges=edges,
+            vertex_ids=vertex_ids,
+            id_vertices=id_vertices,
+            num_subcircuit=2,
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            num_qubits=qc.num_qubits,
+            max_cuts=10,
+        )
+        state = model._get_state(np.zeros(n_vertices, dtype=int))
+        with mock.patch.object(
+            time,
+            "perf_counter",
+            side_effect=itertools.chain([0.0], itertools.repeat(2.0)),
+        ):
+            model._refine(state, deadline=1.0)
+        np.testing.assert_array_equal(np.zeros(n_vertices, dtype=int), state["part"])
+
+    def test_circuit_cutting_automatic_warm_start(self):
+        qc = self.circuit
+        kwargs = dict(
+            circuit=qc,
+            method="automatic",
+            max_subcircuit_width=3,
+            max_subcircuit_cuts=10,
+            max_subcircuit_size=12,
+            max_cuts=10,
+            num_subcircuits=[2],
+        )
+        with mock.patch.object(
+            Model, "add_mip_start", autospec=True, side_effect=Model.add_mip_start
+        ) as add_mip_start:
+            cuts = cut_circuit_wires(warm_start=True, **kwargs)
+        add_mip_start.assert_called_once()
+        self.assertEqual(cuts["num_cuts"], cut_circuit_wires(**kwargs)["num_cuts"])
+
     def test_circuit_cutting_manual(self):
         qc = self.circuit
 
@@ -80,3 +338,629 @@ class TestCircuitCutting(unittest.TestCase):
         metrics, _ = verify(qc, reconstructed_probabilities)
 
         self.assertAlmostEqual(0.0, metrics["nearest"]["Mean Squared Error"])
+
+    def test_subcircuits_parser(self):
+        # The first CNOT is encoded by its depths among all the gates as
+        # q[0]1 q[1]1, the second one by its depths among the two-qubit gates
+        qc = QuantumCircuit(3)
+        qc.h(0)
+        qc.h(1)
+        qc.cx(0, 1)
+        qc.cx(0, 1)
+        qc.cx(1, 2)
+        _, _, _, id_vertices = _read_circuit(circuit=_circuit_stripping(circuit=qc))
+        for partition in [[[0, 2], [1]], [[0], [1, 2]]]:
+            subcircuit_gates = [
+                [id_vertices[vertex] for vertex in vertices] for vertices in partition
+            ]
+            subcircuits, _ = _subcircuits_parser(
+                subcircuit_gates=subcircuit_gates, circuit=qc
+            )
+            self.assertEqual(
+                [len(vertices) for vertices in partition],
+                [
+                    sum(len(instruction.qubits) == 2 for instruction in subcircuit.data)
+                    for subcircuit in subcircuits
+                ],
+            )
+
+    def test_reconstruction_methods(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        naive_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts, method="naive"
+        )
+        contracted_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts, method="contraction"
+        )
+
+        parallel_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts, num_threads=2
+        )
+
+        np.testing.assert_allclose(naive_probabilities, contracted_probabilities)
+        np.testing.assert_allclose(contracted_probabilities, parallel_probabilities)
+
+    def test_reconstruct_dynamic_definition(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        reconstructed_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts
+        )
+
+        dd_bins = reconstruct_dynamic_definition(
+            qc,
+            subcircuit_instance_probabilities,
+            cuts,
+            max_active_qubits=2,
+            max_recursion=3,
+        )
+
+        self.assertEqual(3, len(dd_bins))
+        for recursion in dd_bins:
+            # Bin the full distribution the same way, from the highest qubit
+            probability_tensor = reconstructed_probabilities.reshape(
+                (2,) * qc.num_qubits
+            )
+            qubit_states = recursion["qubit_states"][::-1]
+            probability_tensor = probability_tensor[
+                tuple(slice(None) if isinstance(x, str) else x for x in qubit_states)
+            ]
+            merged_axes = tuple(
+                axis
+                for axis, x in enumerate(
+                    [x for x in qubit_states if isinstance(x, str)]
+                )
+                if x == "merged"
+            )
+            np.testing.assert_allclose(
+                probability_tensor.sum(axis=merged_axes).reshape(-1),
+                recursion["bins"],
+                atol=1e-12,
+            )
+
+    def test_reconstruct_probabilities(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+        reconstructed_probabilities = reconstruct_full_distribution(
+            qc, subcircuit_instance_probabilities, cuts
+        )
+
+        states = [0, 5, 19, 31, 5]
+        bitstrings = [format(state, "05b") for state in states]
+        np.testing.assert_allclose(
+            reconstruct_probabilities(
+                qc, subcircuit_instance_probabilities, cuts, bitstrings
+            ),
+            reconstructed_probabilities[states],
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(
+            reconstruct_probabilities(
+                qc, subcircuit_instance_probabilities, cuts, states
+            ),
+            reconstructed_probabilities[states],
+            atol=1e-12,
+        )
+        with self.assertRaises(ValueError):
+            reconstruct_probabilities(
+                qc, subcircuit_instance_probabilities, cuts, ["0102"]
+            )
+
+    def test_reconstruct_expectation_values(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        observables = ["ZZZZZ", "IIIII", "XIYZI", "IZIIX", "YYIXZ"]
+        expectation_values = reconstruct_expectation_values(cuts, observables)
+
+        statevector = Statevector(qc)
+        np.testing.assert_allclose(
+            expectation_values,
+            [
+                statevector.expectation_value(Pauli(observable)).real
+                for observable in observables
+            ],
+            atol=1e-8,
+        )
+
+        # A single backend name is put in a list, like in evaluate_subcircuits
+        with mock.patch(
+            "circuit_knitting_toolbox.circuit_cutting.wire_cutting.wire_cutting."
+            "run_subcircuit_instances",
+            wraps=wire_cutting_evaluation.run_subcircuit_instances,
+        ) as run_subcircuit_instances:
+            reconstruct_expectation_values(
+                cuts,
+                observables,
+                backend_names="ibmq_qasm_simulator",
+                options=Options(),
+            )
+        self.assertEqual(
+            run_subcircuit_instances.call_args.kwargs["backend_names"],
+            ["ibmq_qasm_simulator"],
+        )
+
+    def test_generate_summation_arrays(self):
+        qc = self.circuit
+
+        for subcircuit_vertices in [[[0, 1], [2, 3]], [[0], [1, 2], [3]]]:
+            cuts = cut_circuit_wires(
+                circuit=qc, method="manual", subcircuit_vertices=subcircuit_vertices
+            )
+            (
+                summation_terms,
+                subcircuit_entries,
+                subcircuit_instances,
+            ) = generate_summation_terms(
+                cuts["subcircuits"], cuts["complete_path_map"], cuts["num_cuts"]
+            )
+            self.assertEqual(
+                (summation_terms, subcircuit_entries, subcircuit_instances),
+                _generate_summation_terms_per_label(
+                    cuts["subcircuits"], cuts["complete_path_map"], cuts["num_cuts"]
+                ),
+            )
+
+            summation_array, entry_arrays, instances = generate_summation_arrays(
+                cuts["subcircuits"], cuts["complete_path_map"], cuts["num_cuts"]
+            )
+            self.assertEqual(subcircuit_instances, instances)
+            self.assertEqual(
+                (4 ** cuts["num_cuts"], len(cuts["subcircuits"])),
+                summation_array.shape,
+            )
+            for summation_term, summation_row in zip(summation_terms, summation_array):
+                for subcircuit_idx, subcircuit_entry_idx in summation_term.items():
+                    self.assertEqual(
+                        subcircuit_entry_idx, summation_row[subcircuit_idx]
+                    )
+            for subcircuit_idx, entries in subcircuit_entries.items():
+                indptr = entry_arrays[subcircuit_idx]["indptr"]
+                for subcircuit_entry_idx, kronecker_term in entries.values():
+                    terms = slice(
+                        indptr[subcircuit_entry_idx], indptr[subcircuit_entry_idx + 1]
+                    )
+                    self.assertEqual(
+                        list(kronecker_term),
+                        list(
+                            zip(
+                                entry_arrays[subcircuit_idx]["coefficients"][terms],
+                                entry_arrays[subcircuit_idx]["instances"][terms],
+                            )
+                        ),
+                    )
+
+            # The metadata is cached without being stored on the cuts
+            metadata = _generate_metadata(cuts)
+            self.assertNotIn("metadata", cuts)
+            self.assertIs(metadata[1], _generate_metadata(dict(cuts))[1])
+            self.assertFalse(metadata[1][0]["coefficients"].flags.writeable)
+            self.assertEqual(instances, metadata[2])
+            np.testing.assert_array_equal(summation_array, metadata[0])
+
+        # Cuts reused for another cut solution get the metadata of that solution
+        cuts.update(
+            cut_circuit_wires(
+                circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+            )
+        )
+        summation_array, _, instances = generate_summation_arrays(
+            cuts["subcircuits"], cuts["complete_path_map"], cuts["num_cuts"]
+        )
+        metadata = _generate_metadata(cuts)
+        self.assertEqual(instances, metadata[2])
+        np.testing.assert_array_equal(summation_array, metadata[0])
+
+    def test_transpile_subcircuits_cache(self):
+        qc = self.circuit.copy()
+        qc.measure_all()
+
+        transpiled = _transpile_subcircuits([qc, qc.copy()], FakeManila())
+        self.assertIs(transpiled[0], transpiled[1])
+        self.assertIs(transpiled[0], _transpile_subcircuits([qc], FakeManila())[0])
+
+        # Without options, the circuits are compiled as with the default options
+        with mock.patch.object(
+            wire_cutting_evaluation, "_transpile_cache", OrderedDict()
+        ), mock.patch.object(
+            wire_cutting_evaluation, "transpile", return_value=qc
+        ) as transpile:
+            _transpile_subcircuits([qc], FakeManila())
+        self.assertEqual(
+            Options().optimization_level,
+            transpile.call_args.kwargs["optimization_level"],
+        )
+
+        # Custom gates sharing a name are not mistaken for each other
+        circuits = []
+        for angle in [0.1, 2.0]:
+            block = QuantumCircuit(1, name="blk")
+            block.rx(angle, 0)
+            circuit = QuantumCircuit(1)
+            circuit.append(block.to_gate(), [0])
+            circuit.measure_all()
+            circuits.append(circuit)
+        transpiled = _transpile_subcircuits(circuits, FakeManila())
+        self.assertIsNot(transpiled[0], transpiled[1])
+
+        # The scheduler threads share the cache while it evicts circuits
+        circuits = []
+        for num_gates in range(6):
+            circuit = QuantumCircuit(2)
+            for _ in range(num_gates):
+                circuit.cx(0, 1)
+            circuit.measure_all()
+            circuits.append(circuit)
+        with mock.patch.object(wire_cutting_evaluation, "_TRANSPILE_CACHE_SIZE", 2):
+            with ThreadPool(4) as pool:
+                results = pool.map(
+                    lambda circuit: _transpile_subcircuits([circuit], FakeManila()),
+                    circuits * 4,
+                )
+            self.assertEqual(24, len(results))
+            self.assertLessEqual(len(wire_cutting_evaluation._transpile_cache), 2)
+
+    def test_evaluate_subcircuits_cache(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            subcircuit_instance_probabilities = evaluate_subcircuits(
+                cuts, cache_dir=cache_dir
+            )
+            self.assertGreater(len(os.listdir(cache_dir)), 0)
+
+            with mock.patch.object(
+                wire_cutting_evaluation, "simulate_subcircuits"
+            ) as simulate:
+                cached_probabilities = evaluate_subcircuits(cuts, cache_dir=cache_dir)
+            simulate.assert_not_called()
+
+            for (
+                subcircuit_idx,
+                instance_probs,
+            ) in subcircuit_instance_probabilities.items():
+                for instance_idx, prob in instance_probs.items():
+                    np.testing.assert_array_equal(
+                        prob, cached_probabilities[subcircuit_idx][instance_idx]
+                    )
+
+            evaluate_subcircuits(cuts, cache_dir=cache_dir, max_cache_size=0)
+            self.assertEqual(0, len(os.listdir(cache_dir)))
+
+            # Only the options affecting the results are part of the cache key
+            run = mock.Mock(return_value=[np.ones(4) / 4])
+            options = Options()
+            for callback, shots, num_runs in [
+                (None, 100, 1),
+                (print, 100, 1),
+                (None, 200, 2),
+            ]:
+                options.environment.callback = callback
+                options.execution.shots = shots
+                wire_cutting_evaluation._run_cached(
+                    run,
+                    cuts["subcircuits"][:1],
+                    [[]],
+                    cache_dir=cache_dir,
+                    backend_name="ibmq_qasm_simulator",
+                    options=options,
+                )
+                self.assertEqual(num_runs, run.call_count)
+
+            # Custom gates sharing a name are told apart by their definitions, and
+            # conditioned gates by their conditions
+            circuits = []
+            for angle in [0.1, 2.0]:
+                block = QuantumCircuit(1, name="blk")
+                block.rx(angle, 0)
+                circuit = QuantumCircuit(1, 1)
+                circuit.append(block.to_gate(), [0])
+                circuits.append(circuit)
+            for condition in [False, True]:
+                circuit = QuantumCircuit(1, 1)
+                gate = circuit.x(0)
+                if condition:
+                    gate.c_if(0, 1)
+                circuits.append(circuit)
+            run = mock.Mock(
+                side_effect=lambda circuits, _: [np.ones(2) / 2] * len(circuits)
+            )
+            wire_cutting_evaluation._run_cached(
+                run, circuits[::2], [[]] * 2, cache_dir=cache_dir
+            )
+            wire_cutting_evaluation._run_cached(
+                run, circuits, [[]] * 4, cache_dir=cache_dir
+            )
+            self.assertEqual(circuits[1::2], run.call_args[0][0])
+
+    def test_evaluate_subcircuits_resume(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            subcircuit_instance_probabilities = evaluate_subcircuits(
+                cuts, checkpoint_dir=checkpoint_dir
+            )
+
+            with mock.patch.object(
+                wire_cutting_evaluation, "simulate_subcircuits"
+            ) as simulate:
+                resumed_probabilities = evaluate_subcircuits(
+                    cuts, checkpoint_dir=checkpoint_dir, resume=True
+                )
+            simulate.assert_not_called()
+
+            for (
+                subcircuit_idx,
+                instance_probs,
+            ) in subcircuit_instance_probabilities.items():
+                for instance_idx, prob in instance_probs.items():
+                    np.testing.assert_array_equal(
+                        prob, resumed_probabilities[subcircuit_idx][instance_idx]
+                    )
+
+            other_cuts = cut_circuit_wires(
+                circuit=qc, method="manual", subcircuit_vertices=[[0, 1, 2], [3]]
+            )
+            with self.assertRaises(ValueError):
+                evaluate_subcircuits(
+                    other_cuts, checkpoint_dir=checkpoint_dir, resume=True
+                )
+
+            # A changed circuit with the same cuts has the same instance index maps
+            changed_qc = qc.copy()
+            changed_qc.rz(0.3, 4)
+            changed_cuts = cut_circuit_wires(
+                circuit=changed_qc,
+                method="manual",
+                subcircuit_vertices=[[0, 1], [2, 3]],
+            )
+            with self.assertRaises(ValueError):
+                evaluate_subcircuits(
+                    changed_cuts, checkpoint_dir=checkpoint_dir, resume=True
+                )
+
+        # The circuits of the finished jobs are kept when the execution fails midway
+        service = mock.Mock()
+        service.backend.return_value = mock.Mock(max_circuits=3)
+        executed = []
+        max_jobs = [2]
+
+        def run_subcircuits(subcircuits, **kwargs):
+            if len(executed) == max_jobs[0]:
+                raise RuntimeError("The job failed.")
+            executed.append(len(subcircuits))
+            return wire_cutting_evaluation.simulate_subcircuits(
+                subcircuits, kwargs["parameter_values"]
+            )
+
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            with mock.patch.object(
+                wire_cutting_evaluation, "run_subcircuits", side_effect=run_subcircuits
+            ):
+                with self.assertRaises(RuntimeError):
+                    evaluate_subcircuits(
+                        cuts,
+                        service=service,
+                        backend_names="backend",
+                        options=Options(),
+                        checkpoint_dir=checkpoint_dir,
+                    )
+                self.assertEqual(2, len(executed))
+                max_jobs[0] = None
+                resumed_probabilities = evaluate_subcircuits(
+                    cuts,
+                    service=service,
+                    backend_names="backend",
+                    options=Options(),
+                    checkpoint_dir=checkpoint_dir,
+                    resume=True,
+                )
+            # Every circuit was executed once across the two runs
+            _, _, subcircuit_instances = generate_summation_terms(
+                cuts["subcircuits"], cuts["complete_path_map"], cuts["num_cuts"]
+            )
+            self.assertEqual(
+                sum(
+                    len(wire_cutting_evaluation._get_batch_instances(instances))
+                    for instances in subcircuit_instances.values()
+                ),
+                sum(executed),
+            )
+            self.assertEqual(
+                ["subcircuit_0.npz", "subcircuit_1.npz"],
+                sorted(os.listdir(checkpoint_dir)),
+            )
+            # The checkpoints were written for other options
+            other_options = Options()
+            other_options.execution.shots = 100
+            with self.assertRaises(ValueError):
+                evaluate_subcircuits(
+                    cuts,
+                    service=service,
+                    backend_names="backend",
+                    options=other_options,
+                    checkpoint_dir=checkpoint_dir,
+                    resume=True,
+                )
+            for (
+                subcircuit_idx,
+                instance_probs,
+            ) in subcircuit_instance_probabilities.items():
+                for instance_idx, prob in instance_probs.items():
+                    np.testing.assert_allclose(
+                        prob, resumed_probabilities[subcircuit_idx][instance_idx]
+                    )
+
+    def test_evaluate_subcircuits_async(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+
+        async def collect():
+            streamed_probabilities = {}
+            async for subcircuit_idx, instance_idx, prob in evaluate_subcircuits_async(
+                cuts, max_in_flight=2, batch_size=2
+            ):
+                streamed_probabilities.setdefault(subcircuit_idx, {})[
+                    instance_idx
+                ] = prob
+            return streamed_probabilities
+
+        with mock.patch.object(
+            wire_cutting_evaluation,
+            "simulate_subcircuits",
+            wraps=wire_cutting_evaluation.simulate_subcircuits,
+        ) as simulate:
+            streamed_probabilities = asyncio.run(collect())
+        # The jobs in flight do not each start a process pool
+        for call in simulate.call_args_list:
+            self.assertEqual(1, call.kwargs["num_processes"])
+
+        self.assertEqual(
+            streamed_probabilities.keys(), subcircuit_instance_probabilities.keys()
+        )
+        for subcircuit_idx, instance_probs in subcircuit_instance_probabilities.items():
+            self.assertEqual(
+                streamed_probabilities[subcircuit_idx].keys(), instance_probs.keys()
+            )
+            for instance_idx, prob in instance_probs.items():
+                np.testing.assert_allclose(
+                    prob, streamed_probabilities[subcircuit_idx][instance_idx]
+                )
+
+    def test_evaluate_subcircuits_scheduler(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        subcircuit_instance_probabilities = evaluate_subcircuits(cuts)
+
+        service = mock.Mock()
+        service.backend.return_value = mock.Mock(max_circuits=3)
+        jobs = []
+
+        def run_subcircuits(subcircuits, **kwargs):
+            jobs.append((kwargs["backend_name"], len(subcircuits)))
+            return wire_cutting_evaluation.simulate_subcircuits(
+                subcircuits, kwargs["parameter_values"]
+            )
+
+        with mock.patch.object(
+            wire_cutting_evaluation, "run_subcircuits", side_effect=run_subcircuits
+        ):
+            scheduled_probabilities = evaluate_subcircuits(
+                cuts, service=service, backend_names=["backend_1", "backend_2"]
+            )
+
+        self.assertTrue(all(num_circuits <= 3 for _, num_circuits in jobs))
+        self.assertTrue(
+            {backend_name for backend_name, _ in jobs} <= {"backend_1", "backend_2"}
+        )
+        for subcircuit_idx, instance_probs in subcircuit_instance_probabilities.items():
+            for instance_idx, prob in instance_probs.items():
+                np.testing.assert_allclose(
+                    prob, scheduled_probabilities[subcircuit_idx][instance_idx]
+                )
+
+    def test_plan_shots(self):
+        qc = self.circuit
+
+        cuts = cut_circuit_wires(
+            circuit=qc, method="manual", subcircuit_vertices=[[0, 1], [2, 3]]
+        )
+        shots = plan_shots(cuts, shot_budget=10000, min_shots=10)
+        all_shots = [
+            circuit_shots
+            for instance_shots in shots.values()
+            for circuit_shots in instance_shots.values()
+        ]
+        self.assertEqual(sum(all_shots), 10000)
+        self.assertTrue(all(circuit_shots >= 10 for circuit_shots in all_shots))
+        with self.assertRaises(ValueError):
+            plan_shots(cuts, shot_budget=len(all_shots) - 1)
+
+        pilot_probabilities = evaluate_subcircuits(cuts)
+        pilot_shots = plan_shots(
+            cuts,
+            shot_budget=10000,
+            subcircuit_instance_probabilities=pilot_probabilities,
+            min_shots=10,
+        )
+        self.assertEqual(pilot_shots.keys(), shots.keys())
+        all_pilot_shots = [
+            circuit_shots
+            for instance_shots in pilot_shots.values()
+            for circuit_shots in instance_shots.values()
+        ]
+        self.assertEqual(sum(all_pilot_shots), 10000)
+        self.assertTrue(all(circuit_shots >= 10 for circuit_shots in all_pilot_shots))
+
+        # The instances of the second subcircuit have no shot noise in this pilot, so
+        # its circuits only get the minimum shots, and the noisier first subcircuit
+        # the rest of the budget
+        noiseless_probabilities = {
+            0: pilot_probabilities[0],
+            1: {
+                instance_idx: np.eye(len(prob))[0]
+                for instance_idx, prob in pilot_probabilities[1].items()
+            },
+        }
+        noiseless_shots = plan_shots(
+            cuts,
+            shot_budget=10000,
+            subcircuit_instance_probabilities=noiseless_probabilities,
+            min_shots=10,
+        )
+        self.assertEqual(
+            sum(noiseless_shots[0].values()), 10000 - 10 * len(noiseless_shots[1])
+        )
+        self.assertTrue(
+            all(circuit_shots == 10 for circuit_shots in noiseless_shots[1].values())
+        )
+        self.assertGreater(
+            sum(noiseless_shots[0].values()), sum(pilot_shots[0].values())
+        )
+
+        service = mock.Mock()
+        service.backend.return_value = mock.Mock(max_circuits=None)
+        runs = []
+
+        def run_subcircuits(subcircuits, **kwargs):
+            runs.append((kwargs["options"].execution.shots, len(subcircuits)))
+            return wire_cutting_evaluation.simulate_subcircuits(
+                subcircuits, kwargs["parameter_values"]
+            )
+
+        with mock.patch.object(
+            wire_cutting_evaluation, "run_subcircuits", side_effect=run_subcircuits
+        ):
+            evaluate_subcircuits(cuts, service=service, shots=shots)
+
+        self.assertEqual(
+            sum(run_shots * num_circuits for run_shots, num_circuits in runs), 10000
+        )